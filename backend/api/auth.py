@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from backend.db.session import get_db
+from backend.models.user import User
 from backend.schemas.auth import (
     RegisterSchema,
     LoginSchema,
@@ -46,7 +47,8 @@ def upgrade_to_creator(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User is already a creator"
         )
 
-    # Update user to creator
+    # Update user to creator (current_user is a cached snapshot, not the row)
+    current_user = db.get(User, current_user.id)
     current_user.is_creator = True
     db.commit()
     db.refresh(current_user)
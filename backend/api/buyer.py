@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from backend.db.session import get_db
+from backend.db.replicas import get_async_read_db, get_read_db
 from backend.models.product import ProductCategory
 from backend.schemas.product import (
     ProductSearchParams,
@@ -9,10 +10,10 @@ from backend.schemas.product import (
     ProductResponse,
 )
 from backend.services.product_service import (
-    search_products,
+    search_products_async,
     get_product_categories,
     get_products_by_category,
-    get_product_by_id,
+    get_product_by_id_async,
     get_creator_products,
 )
 from backend.services.analytics import get_creator_public_stats
@@ -21,7 +22,7 @@ router = APIRouter()
 
 
 @router.get("/products", response_model=ProductSearchResponse)
-def get_products(
+async def get_products(
     query: Optional[str] = Query(
         None, description="Search in title, description, tags, or creator name"
     ),
@@ -29,14 +30,23 @@ def get_products(
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
     creator_name: Optional[str] = Query(None, description="Filter by creator name"),
-    tags: Optional[str] = Query(None, description="Filter by tags (comma-separated)"),
+    tags: Optional[str] = Query(
+        None, description="Filter by tags (comma-separated, any of them)"
+    ),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; replaces page"
+    ),
+    include_total: Optional[bool] = Query(
+        None, description="Count all matches (default: only for page requests)"
+    ),
     sort_by: str = Query(
-        "created_at", description="Sort by: created_at, price, title, category"
+        "created_at",
+        description="Sort by: created_at, price, title, category, relevance",
     ),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Search and browse products with filtering, sorting, and pagination"""
     search_params = ProductSearchParams(
@@ -48,22 +58,24 @@ def get_products(
         tags=tags,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
         sort_by=sort_by,
         sort_order=sort_order,
     )
-    return search_products(db, search_params)
+    return await search_products_async(db, search_params)
 
 
 @router.get("/products/categories")
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(db: Session = Depends(get_read_db)):
     """Get all available product categories with product counts"""
     return get_product_categories(db)
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific product by ID"""
-    product = get_product_by_id(db, product_id)
+    product = await get_product_by_id_async(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -74,19 +86,23 @@ def get_products_by_category_endpoint(
     category: ProductCategory,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get products filtered by category"""
     return get_products_by_category(db, category, page, page_size)
 
 
 @router.get("/creator/{creator_id}/products", response_model=List[ProductResponse])
-def get_creator_products_public(creator_id: int, db: Session = Depends(get_db)):
+def get_creator_products_public(
+    creator_id: int, db: Session = Depends(get_read_db)
+):
     """Get all active products for a specific creator (public endpoint)"""
     return get_creator_products(db, creator_id)
 
 
 @router.get("/creator/{creator_id}/stats")
-def get_creator_stats_public(creator_id: int, db: Session = Depends(get_db)):
+def get_creator_stats_public(
+    creator_id: int, db: Session = Depends(get_read_db)
+):
     """Get public statistics for a specific creator (no revenue information)"""
     return get_creator_public_stats(db, creator_id)
@@ -1,17 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Optional
 from backend.db.session import get_db
+from backend.db.replicas import get_read_db
 from backend.core.security import require_creator
 from backend.models.user import User
 from backend.models.product import ProductCategory
 from backend.schemas.product import ProductCreate, ProductResponse
-from backend.services.product_service import create_product, get_creator_products
+from backend.schemas.file_upload import UploadSessionInit, UploadSessionResponse
+from backend.services.product_service import (
+    create_product,
+    create_product_from_stored_file,
+    get_creator_products,
+)
+from backend.services.resumable_upload_service import resumable_upload_service
 from backend.services.analytics import (
     get_creator_stats,
     get_recent_sales,
     get_sales_analytics,
 )
+from backend.services.sales_series import get_sales_series
 
 router = APIRouter()
 
@@ -57,6 +66,86 @@ def upload_product(
     return product
 
 
+@router.post("/uploads", response_model=UploadSessionResponse)
+def init_resumable_upload(
+    upload: UploadSessionInit,
+    current_user: User = Depends(require_creator),
+):
+    """
+    Start a resumable upload for a large product file
+
+    Send each part with PUT /creator/uploads/{upload_id}/parts/{n}, then call
+    /complete with the product details. If the connection drops, GET the
+    session to see which parts are still missing and only re-send those.
+    """
+    return resumable_upload_service.init_upload(
+        current_user.id, upload.filename, upload.total_size, upload.part_size
+    )
+
+
+@router.put(
+    "/uploads/{upload_id}/parts/{part_number}", response_model=UploadSessionResponse
+)
+def upload_part(
+    upload_id: str,
+    part_number: int,
+    file: UploadFile = File(...),
+    current_user: User = Depends(require_creator),
+):
+    """Upload (or re-upload) one part of a resumable upload"""
+    return resumable_upload_service.upload_part(
+        upload_id, current_user.id, part_number, file
+    )
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(require_creator),
+):
+    """Get received and missing parts for a resumable upload"""
+    return resumable_upload_service.get_status(upload_id, current_user.id)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=ProductResponse)
+def complete_resumable_upload(
+    upload_id: str,
+    title: str = Form(..., min_length=3, max_length=200),
+    description: Optional[str] = Form(None),
+    price: float = Form(..., gt=0, le=10000),
+    category: ProductCategory = Form(default=ProductCategory.OTHER),
+    tags: Optional[str] = Form(None),
+    image: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_creator),
+):
+    """Join all uploaded parts and publish the product"""
+    # Validate product data before doing the (potentially large) join
+    product_data = ProductCreate(
+        title=title,
+        description=description,
+        price=price,
+        category=category,
+        tags=tags,
+        creator_name=current_user.display_name or current_user.email,
+    )
+
+    stored_file = resumable_upload_service.complete_upload(upload_id, current_user.id)
+    return create_product_from_stored_file(
+        db, product_data, stored_file, current_user.id, image
+    )
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(require_creator),
+):
+    """Discard a resumable upload and its parts"""
+    resumable_upload_service.abort_upload(upload_id, current_user.id)
+    return {"message": "Upload aborted"}
+
+
 @router.get("/products", response_model=List[ProductResponse])
 def get_my_products(
     db: Session = Depends(get_db), current_user: User = Depends(require_creator)
@@ -67,7 +156,7 @@ def get_my_products(
 
 @router.get("/stats")
 def get_creator_statistics(
-    db: Session = Depends(get_db), current_user: User = Depends(require_creator)
+    db: Session = Depends(get_read_db), current_user: User = Depends(require_creator)
 ):
     """Total sales, earnings, per-product breakdown"""
     return get_creator_stats(db, current_user.id)
@@ -75,7 +164,7 @@ def get_creator_statistics(
 
 @router.get("/analytics")
 def get_creator_analytics(
-    db: Session = Depends(get_db), current_user: User = Depends(require_creator)
+    db: Session = Depends(get_read_db), current_user: User = Depends(require_creator)
 ):
     """Comprehensive analytics data for dashboard"""
     return get_creator_stats(db, current_user.id)
@@ -84,7 +173,7 @@ def get_creator_analytics(
 @router.get("/sales")
 def get_creator_sales(
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_creator),
 ):
     """Get recent sales for creator"""
@@ -93,7 +182,27 @@ def get_creator_sales(
 
 @router.get("/sales/analytics")
 def get_creator_sales_analytics(
-    db: Session = Depends(get_db), current_user: User = Depends(require_creator)
+    db: Session = Depends(get_read_db), current_user: User = Depends(require_creator)
 ):
     """Get sales analytics for charts"""
     return get_sales_analytics(db, current_user.id)
+
+
+@router.get("/sales/series")
+def get_creator_sales_series(
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_creator),
+):
+    """
+    Sales and revenue per hour, day, week or month between start and end
+
+    Times are UTC; start defaults to 48 hours, 30 days, 12 weeks or a year
+    before end (default: now). Buckets without sales are returned as zeros.
+    """
+    return get_sales_series(
+        db, current_user.id, granularity, start, end, product_id=product_id
+    )
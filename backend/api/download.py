@@ -1,24 +1,112 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.db.session import get_db
-from backend.core.security import get_current_user
+from backend.db.async_session import get_async_db
+from backend.core.security import get_current_user, get_current_user_async
 from backend.models.user import User
 from backend.models.product import Product
 from backend.models.purchase import Purchase, PaymentStatus
-from backend.services.storage_service import storage_service
+from backend.schemas.download import (
+    BatchDownloadRequest,
+    BatchDownloadResponse,
+    BatchDownloadItem,
+)
+from backend.services.purchase_service import PurchaseService
 
 router = APIRouter()
 
 
-@router.get("/{product_id}")
-def download_product(
-    product_id: int,
+def masked_access_url(product_id: int) -> str:
+    """Masked /api/access-file link: the client appends its auth token, and each
+    access re-checks the purchase before a 10-second storage URL is minted"""
+    return f"http://localhost:8000/api/access-file?product_id={product_id}"
+
+
+@router.post("/batch", response_model=BatchDownloadResponse)
+def download_batch(
+    request: BatchDownloadRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+):
+    """Masked download links for a list of products, or the whole library (all=true)
+
+    Same links as GET /download/{product_id}: storage URLs are never handed
+    out, so a leaked link is useless without the buyer's auth token.
+    """
+    if not request.all and not request.product_ids:
+        raise HTTPException(
+            status_code=400, detail="Provide product_ids or set all to true"
+        )
+
+    # One query decides access for every product: owned or purchased
+    purchased = (
+        db.query(Purchase.id)
+        .filter(
+            Purchase.product_id == Product.id,
+            Purchase.user_id == current_user.id,
+            Purchase.payment_status == PaymentStatus.COMPLETED,
+        )
+        .exists()
+    )
+    query = db.query(
+        Product.id,
+        Product.title,
+        Product.file_url,
+        Product.file_type,
+        Product.file_size,
+        Product.creator_id,
+    ).filter(Product.file_url.isnot(None))
+
+    if request.all:
+        query = query.filter(purchased)
+    else:
+        access = purchased
+        if current_user.is_creator:
+            access = or_(Product.creator_id == current_user.id, purchased)
+        query = query.filter(Product.id.in_(request.product_ids), access)
+
+    rows = query.order_by(Product.id).all()
+    if not request.all:
+        # Answer in the order the products were asked for
+        position = {product_id: i for i, product_id in enumerate(request.product_ids)}
+        rows.sort(key=lambda row: position[row.id])
+
+    items = [
+        BatchDownloadItem(
+            product_id=row.id,
+            product_title=row.title,
+            download_url=masked_access_url(row.id),
+            access_type=(
+                "owner"
+                if current_user.is_creator and row.creator_id == current_user.id
+                else "purchased"
+            ),
+            file_type=row.file_type,
+            file_size=row.file_size,
+        )
+        for row in rows
+    ]
+
+    granted = {item.product_id for item in items}
+    return BatchDownloadResponse(
+        items=items,
+        denied_product_ids=[
+            product_id for product_id in request.product_ids if product_id not in granted
+        ],
+    )
+
+
+@router.get("/{product_id}")
+async def download_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Download product - requires either purchase or ownership (creator)"""
     # Get product details first
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -27,24 +115,16 @@ def download_product(
 
     if not is_creator_owner:
         # If not the creator, check if user has completed purchase of the product
-        purchase = (
-            db.query(Purchase)
-            .filter(
-                Purchase.user_id == current_user.id,
-                Purchase.product_id == product_id,
-                Purchase.payment_status == PaymentStatus.COMPLETED,
-            )
-            .first()
-        )
-
-        if not purchase:
+        if not await PurchaseService.has_purchased_product_async(
+            db, current_user.id, product_id
+        ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You must complete the purchase of this product before downloading",
             )
 
     # Generate simple masked access URL (clean approach)
-    access_url = f"http://localhost:8000/api/access-file?product_id={product_id}"
+    access_url = masked_access_url(product_id)
 
     return {
         "download_url": access_url,
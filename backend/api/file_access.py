@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
-from backend.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from backend.db.async_session import get_async_db
 from backend.core.security import verify_token
 from backend.models.user import User
 from backend.models.product import Product
-from backend.models.purchase import Purchase, PaymentStatus
-from backend.services.storage_service import storage_service
+from backend.services.purchase_service import PurchaseService
+from backend.services.storage_service import storage_service, BLOB_PREFIX
 import logging
 
 router = APIRouter()
@@ -14,10 +15,10 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/access-file")
-def access_file(
+async def access_file(
     product_id: int = Query(..., description="Product ID to access"),
     token: str = Query(..., description="Auth token for same-tab access"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     SIMPLE MASKED FILE ACCESS - Works in same tab with token
@@ -35,14 +36,14 @@ def access_file(
     # STEP 1: Verify token and get user
     try:
         user_id = verify_token(token)
-        current_user = db.query(User).filter(User.id == user_id).first()
+        current_user = await db.get(User, int(user_id))
         if not current_user:
             raise HTTPException(status_code=401, detail="User not found")
-    except HTTPException:
+    except (HTTPException, ValueError):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
     # STEP 2: Get product details
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         logger.warning(
             f"Product not found: product_id={product_id}, user_id={current_user.id}"
@@ -54,17 +55,9 @@ def access_file(
 
     if not is_creator_owner:
         # Check if user has completed purchase
-        purchase = (
-            db.query(Purchase)
-            .filter(
-                Purchase.user_id == current_user.id,
-                Purchase.product_id == product_id,
-                Purchase.payment_status == PaymentStatus.COMPLETED,
-            )
-            .first()
-        )
-
-        if not purchase:
+        if not await PurchaseService.has_purchased_product_async(
+            db, current_user.id, product_id
+        ):
             logger.warning(
                 f"Unauthorized access attempt: user_id={current_user.id}, product_id={product_id}"
             )
@@ -75,7 +68,13 @@ def access_file(
 
     # STEP 4: Generate very short-lived Supabase signed URL (10 seconds only)
     try:
-        signed_url = storage_service.get_signed_url(product.file_url, expires_in=10)
+        if product.file_url.startswith(BLOB_PREFIX):
+            signed_url = storage_service.get_signed_url(product.file_url, expires_in=10)
+        else:
+            # Legacy paths need an existence check against the store first
+            signed_url = await run_in_threadpool(
+                storage_service.get_signed_url, product.file_url, 10
+            )
 
         # Log successful access
         access_type = "owner" if is_creator_owner else "purchased"
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from pathlib import Path
 import time
-import hashlib
 import logging
 from backend.db.session import get_db
 from backend.core.security import get_current_user
@@ -11,6 +10,14 @@ from backend.models.user import User
 from backend.models.product import Product
 from backend.models.purchase import Purchase, PaymentStatus
 from backend.core.config import settings
+from backend.core.signing import url_signer, FILE_LINK
+from backend.services.storage_service import storage_service
+from backend.services.blob_service import file_metadata
+from backend.core.file_delivery import (
+    deliver_file,
+    LinkAuthorizationCache,
+    guess_media_type,
+)
 
 # Setup logging for security monitoring
 logger = logging.getLogger(__name__)
@@ -18,6 +25,9 @@ logger = logging.getLogger(__name__)
 # In-memory rate limiting (for production, use Redis)
 download_attempts = {}
 
+# Links a user has already been authorized for (one check per link, not per range)
+authorized_links = LinkAuthorizationCache()
+
 router = APIRouter()
 
 
@@ -45,32 +55,18 @@ def check_rate_limit(user_id: int, file_path: str) -> bool:
 
 def verify_file_token(file_path: str, token: str, expires: int) -> bool:
     """Verify that the file token is valid and hasn't expired"""
-    current_time = int(time.time())
-
-    # Check if token has expired
-    if current_time > expires:
-        return False
-
-    # Recreate the expected token
-    token_data = f"{file_path}:{expires}:{settings.JWT_SECRET}"
-    expected_token = hashlib.md5(token_data.encode()).hexdigest()
-
-    return token == expected_token
+    return url_signer.verify(FILE_LINK, file_path, token, expires)
 
 
-@router.get("/{file_path}")
-async def serve_file(
+def _authorize_file_access(
+    db: Session,
+    current_user: User,
     file_path: str,
-    request: Request,
-    token: str = Query(...),
-    expires: int = Query(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Serve files securely with token and user verification"""
-
-    client_ip = request.client.host
-
+    token: str,
+    expires: int,
+    client_ip: str,
+) -> Product:
+    """Run the full rate limit, token and ownership checks for a link"""
     # Rate limiting check
     if not check_rate_limit(current_user.id, file_path):
         logger.warning(
@@ -128,16 +124,56 @@ async def serve_file(
         f"File accessed: user_id={current_user.id}, ip={client_ip}, product_id={product.id}, file={file_path}"
     )
 
-    # Serve the file
+    return product
+
+
+@router.get("/{file_path:path}")
+async def serve_file(
+    file_path: str,
+    request: Request,
+    token: str = Query(...),
+    expires: int = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Serve files securely with token and user verification"""
+
+    client_ip = request.client.host
+
+    # Range requests for a link this user was already authorized for skip the
+    # rate limit, token and purchase checks
+    link_key = (current_user.id, file_path, token, expires)
+    cached = authorized_links.get(link_key)
+
+    if cached is None:
+        product = _authorize_file_access(
+            db, current_user, file_path, token, expires, client_ip
+        )
+        cached = (product.title, product.file_type, file_metadata(product.file_blob))
+        authorized_links.set(link_key, cached, expires)
+    product_title, file_type, metadata = cached
+
+    # Content-addressed keys carry no extension; name the download after the
+    # product and take the type from the extension recorded at upload
+    filename = f"{product_title}.{file_type}" if file_type else product_title
+
+    # Object stores serve the bytes (and ranges) themselves
+    if not storage_service.backend.is_local:
+        return RedirectResponse(
+            url=storage_service.backend.presigned_url(file_path, expires_in=60)
+        )
+
+    # Serve the file; indexed files skip the existence check
     file_location = Path(settings.UPLOAD_FOLDER) / file_path
 
-    if not file_location.exists():
+    if metadata is None and not file_location.exists():
         raise HTTPException(status_code=404, detail="File not found on disk")
 
-    return FileResponse(
-        path=file_location,
-        filename=product.title,
-        media_type="application/octet-stream",
+    return deliver_file(
+        file_path,
+        filename=filename,
+        media_type=guess_media_type(filename),
+        metadata=metadata,
         headers={
             "Cache-Control": "no-cache, no-store, must-revalidate",
             "Pragma": "no-cache",
@@ -2,8 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse, HTMLResponse
 from sqlalchemy.orm import Session
 from typing import Optional
-import time
-import hashlib
 import logging
 from backend.db.session import get_db
 from backend.core.security import get_current_user_optional, verify_token
@@ -11,7 +9,7 @@ from backend.models.user import User
 from backend.models.product import Product
 from backend.models.purchase import Purchase, PaymentStatus
 from backend.services.storage_service import storage_service
-from backend.core.config import settings
+from backend.core.signing import url_signer, MASKED_ACCESS_LINK
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,17 +17,7 @@ logger = logging.getLogger(__name__)
 
 def verify_access_token(product_id: str, token: str, expires: int) -> bool:
     """Verify that the file access token is valid and hasn't expired"""
-    current_time = int(time.time())
-
-    # Check if token has expired
-    if current_time > expires:
-        return False
-
-    # Recreate the expected token
-    token_data = f"{product_id}:{expires}:{settings.JWT_SECRET}"
-    expected_token = hashlib.md5(token_data.encode()).hexdigest()
-
-    return token == expected_token
+    return url_signer.verify(MASKED_ACCESS_LINK, product_id, token, expires)
 
 
 @router.get("/{token}")
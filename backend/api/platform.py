@@ -2,31 +2,49 @@
 Platform statistics and public information endpoints
 """
 
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from backend.db.session import get_db
+from backend.db.replicas import get_read_db
 from backend.services.platform_analytics import (
-    get_popular_products,
-    get_category_stats,
+    POPULAR_PRODUCTS_KEPT,
     get_recent_products,
 )
+from backend.services.platform_snapshot import platform_snapshot
 
 router = APIRouter()
 
 
+@router.get("/stats")
+def get_platform_statistics():
+    """Platform totals: products, creators, buyers, purchases, revenue
+
+    total_purchases and total_revenue come from the sales rollup: completed
+    purchases only, summed at the amount paid. (They used to count purchases
+    of any status and sum each product's current price.)
+    """
+    snapshot = platform_snapshot.get()
+    return {
+        **snapshot.stats,
+        "as_of": datetime.fromtimestamp(snapshot.computed_at, timezone.utc),
+    }
+
+
 @router.get("/popular")
-def get_popular_products_endpoint(limit: int = 10, db: Session = Depends(get_db)):
-    """Get most popular products by sales"""
-    return get_popular_products(db, limit)
+def get_popular_products_endpoint(limit: int = 10):
+    """Get most popular products by sales (at most POPULAR_PRODUCTS_KEPT)"""
+    return platform_snapshot.get().popular[: min(max(limit, 0), POPULAR_PRODUCTS_KEPT)]
 
 
 @router.get("/recent")
-def get_recent_products_endpoint(limit: int = 10, db: Session = Depends(get_db)):
+def get_recent_products_endpoint(
+    limit: int = 10, db: Session = Depends(get_read_db)
+):
     """Get recently added products"""
     return get_recent_products(db, limit)
 
 
 @router.get("/categories/stats")
-def get_category_statistics(db: Session = Depends(get_db)):
+def get_category_statistics():
     """Get statistics by product category"""
-    return get_category_stats(db)
+    return platform_snapshot.get().categories
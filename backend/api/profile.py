@@ -113,8 +113,8 @@ def delete_my_account(
         for product in products:
             product.is_active = False
 
-    # Delete the user
-    db.delete(current_user)
+    # Delete the user (current_user is a cached snapshot, not the row)
+    db.delete(db.get(User, current_user.id))
     db.commit()
 
     return {"message": "Account deleted successfully"}
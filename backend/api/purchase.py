@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from backend.db.session import get_db
-from backend.core.security import get_current_user
+from backend.db.async_session import get_async_db
+from backend.db.replicas import pin_client
+from backend.core.security import get_current_user, get_current_user_async
 from backend.models.user import User
 from backend.models.product import Product
 from backend.models.purchase import Purchase, PaymentStatus
@@ -96,6 +100,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
 @router.get("/session/{session_id}", response_model=PurchaseResponse)
 def get_purchase_by_session(
     session_id: str,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -110,26 +115,30 @@ def get_purchase_by_session(
     if purchase.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    if purchase.payment_status == PaymentStatus.COMPLETED:
+        # Their library and downloads must show it on every worker
+        pin_client(response, current_user.id)
+
     return purchase
 
 
 @router.get("/mypurchases", response_model=List[PurchaseWithProduct])
-def get_my_purchases(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+async def get_my_purchases(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Get user's completed purchases with product details"""
 
-    purchases = (
-        db.query(Purchase, Product, User)
+    purchases = await db.execute(
+        select(Purchase, Product, User)
         .join(Product, Purchase.product_id == Product.id)
         .join(User, Product.creator_id == User.id)
-        .filter(
+        .where(
             Purchase.user_id == current_user.id,
             Purchase.payment_status == PaymentStatus.COMPLETED,
             Product.is_active == True,
         )
         .order_by(Purchase.completed_at.desc())
-        .all()
     )
 
     return [
@@ -203,6 +212,7 @@ def get_purchase_stats(
 @router.post("/verify/{session_id}", response_model=PurchaseResponse)
 def verify_payment_status(
     session_id: str,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -219,8 +229,9 @@ def verify_payment_status(
         if purchase.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied")
 
-        # If already completed, return as is
+        # If already completed (e.g. by the webhook), return as is
         if purchase.payment_status == PaymentStatus.COMPLETED:
+            pin_client(response, current_user.id)
             return purchase
 
         # Check Stripe session status
@@ -235,6 +246,7 @@ def verify_payment_status(
                 session_id=session_id,
                 payment_intent_id=stripe_session.payment_intent,
             )
+            pin_client(response, current_user.id)
             logger.info(f"Manually verified and completed purchase {purchase.id}")
         elif stripe_session.payment_status == "unpaid":
             # Payment failed or expired
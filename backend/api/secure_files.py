@@ -1,25 +1,35 @@
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 import time
-import hashlib
 from backend.core.config import settings
+from backend.core.signing import url_signer, FILE_LINK
+from backend.core.file_delivery import deliver_file, LinkAuthorizationCache
+from backend.db.async_session import get_async_db
+from backend.models.product import Product
+from backend.services.blob_service import get_file_metadata_async
 
 router = APIRouter()
 
+# Links that already passed validation, so range requests skip re-validation
+authorized_links = LinkAuthorizationCache()
+
 
 @router.get("/files/{file_path:path}")
 async def serve_secure_file(
     file_path: str,
     token: str = Query(..., description="Security token"),
     expires: int = Query(..., description="Expiration timestamp"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Secure file serving with time-limited access
+    Secure file serving with time-limited access (local storage backend;
+    object stores hand out their own presigned URLs instead)
     
     - Validates token matches file_path + expires + secret
     - Checks if link has expired
-    - Streams file if valid
+    - Streams file if valid, honouring Range / If-Range (206 partial content)
     - Returns 403 if token invalid or expired
     """
     
@@ -31,33 +41,63 @@ async def serve_secure_file(
             detail="Download link has expired. Please request a new download link."
         )
     
-    # STEP 2: Validate token
-    expected_token_data = f"{file_path}:{expires}:{settings.JWT_SECRET}"
-    expected_token = hashlib.md5(expected_token_data.encode()).hexdigest()
-    
-    if token != expected_token:
-        raise HTTPException(
-            status_code=403,
-            detail="Invalid download token"
-        )
-    
-    # STEP 3: Check if file exists
-    upload_folder = Path(settings.UPLOAD_FOLDER)
-    full_file_path = upload_folder / file_path
-    
-    if not full_file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # STEP 4: Verify file is within uploads directory (security check)
-    try:
-        full_file_path.resolve().relative_to(upload_folder.resolve())
-    except ValueError:
-        # File is outside uploads directory - potential path traversal attack
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    # STEP 5: Stream the file
-    return FileResponse(
-        path=str(full_file_path),
-        filename=file_path.split("/")[-1],
-        media_type="application/octet-stream"
+    link_key = (file_path, token, expires)
+    cached = authorized_links.get(link_key)
+
+    if cached is None:
+        # STEP 2: Validate token
+        if not url_signer.verify(FILE_LINK, file_path, token, expires):
+            raise HTTPException(
+                status_code=403,
+                detail="Invalid download token"
+            )
+        
+        # STEP 3: Look the file up in the metadata index. Indexed keys were
+        # written by us (blobs/ab/cd/<sha256>), so they need neither an
+        # existence check nor a path traversal check on the volume.
+        metadata = await get_file_metadata_async(db, file_path)
+
+        if metadata is None:
+            # Not indexed (uploaded before the index existed)
+            upload_folder = Path(settings.UPLOAD_FOLDER)
+            full_file_path = upload_folder / file_path
+
+            if not full_file_path.exists():
+                raise HTTPException(status_code=404, detail="File not found")
+
+            # STEP 4: Verify file is within uploads directory (security check)
+            try:
+                full_file_path.resolve().relative_to(upload_folder.resolve())
+            except ValueError:
+                # File is outside uploads directory - potential path traversal attack
+                raise HTTPException(status_code=403, detail="Access denied")
+
+        # Parallel range requests for this link are authorized from here on
+        cached = (metadata, await _download_filename(db, file_path))
+        authorized_links.set(link_key, cached, expires)
+
+    # STEP 5: Stream the file (or the requested byte ranges), or hand the
+    # transfer to the front proxy depending on FILE_DELIVERY_MODE
+    metadata, filename = cached
+    return deliver_file(file_path, filename=filename, metadata=metadata)
+
+
+async def _download_filename(db: AsyncSession, file_path: str) -> str:
+    """Name the download after the product, as files.py does
+
+    Content-addressed keys carry no extension, so the type comes from the
+    extension recorded at upload. Identical files uploaded as several
+    products share a key; the oldest product names it.
+    """
+    result = await db.execute(
+        select(Product.title, Product.file_type)
+        .where(Product.file_url == file_path)
+        .order_by(Product.id)
+        .limit(1)
     )
+    row = result.first()
+    if row is None:
+        # Product images, and files no product points at any more
+        return file_path.split("/")[-1]
+    title, file_type = row
+    return f"{title}.{file_type}" if file_type else title
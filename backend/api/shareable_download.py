@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from typing import Optional
-import time
-import hashlib
 import logging
 from backend.db.session import get_db
 from backend.core.security import get_current_user_optional
@@ -11,25 +10,26 @@ from backend.models.user import User
 from backend.models.product import Product
 from backend.models.purchase import Purchase, PaymentStatus
 from backend.services.storage_service import storage_service
-from backend.core.config import settings
+from backend.core.signing import url_signer, SHARE_LINK
+from backend.core.http_client import get_http_client
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Upstream headers relayed to the client as-is
+PASSTHROUGH_HEADERS = (
+    "content-length",
+    "content-range",
+    "content-encoding",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+)
+
 
 def verify_shareable_token(product_id: str, token: str, expires: int) -> bool:
     """Verify that the shareable download token is valid and hasn't expired"""
-    current_time = int(time.time())
-
-    # Check if token has expired
-    if current_time > expires:
-        return False
-
-    # Recreate the expected token
-    token_data = f"{product_id}:{expires}:{settings.JWT_SECRET}"
-    expected_token = hashlib.md5(token_data.encode()).hexdigest()
-
-    return token == expected_token
+    return url_signer.verify(SHARE_LINK, product_id, token, expires)
 
 
 @router.get("/{token}")
@@ -265,41 +265,42 @@ async def shareable_download(
                 status_code=403,
             )
 
-    # STEP 5: All checks passed - Serve file securely (don't expose Supabase URLs)
+    # STEP 5: All checks passed - Stream file securely (don't expose storage URLs)
     try:
-        # Get fresh Supabase signed URL for internal use only (not exposed to client)
+        # Get fresh signed URL for internal use only (not exposed to client)
         internal_signed_url = storage_service.get_signed_url(
             product_obj.file_url, expires_in=300
         )
 
-        # Fetch file from Supabase internally
-        import httpx
+        # Forward Range/If-Range so resumed downloads and seeks stay partial
+        upstream_headers = {
+            name: request.headers[name]
+            for name in ("range", "if-range")
+            if name in request.headers
+        }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(internal_signed_url)
+        client = get_http_client()
+        upstream = await client.send(
+            client.build_request("GET", internal_signed_url, headers=upstream_headers),
+            stream=True,
+        )
 
-            if response.status_code != 200:
+        # The StreamingResponse closes the upstream once the body is relayed;
+        # until it owns the stream, any failure has to release it here
+        try:
+            if upstream.status_code not in (200, 206, 416):
                 logger.error(
-                    f"Failed to fetch file from Supabase: {response.status_code}"
+                    f"Failed to fetch file from storage: {upstream.status_code}"
                 )
                 raise HTTPException(status_code=500, detail="File download failed")
 
-            # Stream the file content directly (never expose Supabase URLs)
-            file_content = response.content
-
-        # Log successful access
-        access_type = "owner" if is_creator_owner else "purchased"
-        logger.info(
-            f"Shareable link download: user_id={current_user.id}, ip={client_ip}, product={product}, access_type={access_type}"
-        )
-
-        # Return file as direct download with security headers
-        from fastapi import Response
+            # Log successful access
+            access_type = "owner" if is_creator_owner else "purchased"
+            logger.info(
+                f"Shareable link download: user_id={current_user.id}, ip={client_ip}, product={product}, access_type={access_type}"
+            )
 
-        return Response(
-            content=file_content,
-            media_type="application/octet-stream",
-            headers={
+            response_headers = {
                 "Content-Disposition": f'attachment; filename="{product_obj.title}.{product_obj.file_type}"',
                 "Cache-Control": "no-cache, no-store, must-revalidate",
                 "Pragma": "no-cache",
@@ -307,8 +308,23 @@ async def shareable_download(
                 "X-Content-Type-Options": "nosniff",
                 "X-Frame-Options": "DENY",
                 "X-Anti-Piracy": "Account-bound download",
-            },
-        )
+            }
+            for name in PASSTHROUGH_HEADERS:
+                if name in upstream.headers:
+                    response_headers[name] = upstream.headers[name]
+
+            # Relay upstream chunks as they arrive: each send waits for the client
+            # to drain, so memory per download stays at roughly one chunk
+            return StreamingResponse(
+                upstream.aiter_raw(),
+                status_code=upstream.status_code,
+                media_type="application/octet-stream",
+                headers=response_headers,
+                background=BackgroundTask(upstream.aclose),
+            )
+        except BaseException:
+            await upstream.aclose()
+            raise
 
     except Exception as e:
         logger.error(
@@ -7,4 +7,8 @@ echo "📦 Installing Python dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt
 
+echo "🗄️  Migrating database..."
+python -m backend.manage migrate
+python -m backend.manage seed
+
 echo "✅ Build completed successfully!"
@@ -8,6 +8,40 @@ load_dotenv()
 class Settings:
     # Database Configuration
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./creators_platform.db")
+    # Async driver URL for the async routes; empty derives it from
+    # DATABASE_URL (sqlite+aiosqlite / postgresql+asyncpg)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Read replicas for catalog and analytics reads (comma-separated URLs,
+    # empty: everything reads from the primary), see backend/db/replicas.py
+    DATABASE_REPLICA_URLS: List[str] = [
+        url.strip()
+        for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    # Replicas further behind than this are skipped (reads go elsewhere)
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+    # How often replica lag is measured (and the primary heartbeat bumped)
+    REPLICA_LAG_CHECK_SECONDS: float = float(
+        os.getenv("REPLICA_LAG_CHECK_SECONDS", "5")
+    )
+    # A user who just made a purchase reads from the primary for this long;
+    # keep it above REPLICA_MAX_LAG_SECONDS
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "30"))
+    # What a worker does on boot when the database is not at the latest
+    # migration: "error" (refuse to start), "warn" or "off"
+    DB_SCHEMA_CHECK: str = os.getenv("DB_SCHEMA_CHECK", "error").lower()
+    # Connection pool (per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    # Replace connections older than this (-1 never); keeps them below
+    # server / load balancer idle limits
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # Test each connection on checkout so stale ones (e.g. after a failover)
+    # are replaced instead of failing the request
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Longest a single statement may run (0 disables)
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
 
     # JWT Configuration
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your_jwt_secret_here")
@@ -15,6 +49,27 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
+    # "jose" (python-jose) or "pyjwt" (PyJWT), see backend/core/jwt_backend.py
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose").lower()
+    # Verified tokens whose claims are kept until they expire (0 disables)
+    JWT_CACHE_MAX_ENTRIES: int = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+    # Authenticated users are cached per worker; other workers see profile
+    # changes and deletions within this many seconds (0 disables the cache)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30")
+    )
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000")
+    )
+
+    # Password hashing (see backend/core/password_pool.py). Existing hashes
+    # are upgraded to BCRYPT_ROUNDS the next time their user logs in.
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(
+        os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    # Password jobs allowed to wait for a worker before logins get a 429
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "16"))
 
     # Stripe Configuration
     STRIPE_SECRET_KEY: str = os.getenv("STRIPE_SECRET_KEY", "")
@@ -32,6 +87,78 @@ class Settings:
     # No file type restrictions - creators have complete freedom
     ALLOWED_FILE_TYPES: List[str] = ["*"]  # Accept all file types
     UPLOAD_FOLDER: str = os.getenv("UPLOAD_FOLDER", "uploads")
+    # Uploads are copied to disk in chunks of this size so memory use stays flat
+    UPLOAD_CHUNK_SIZE_KB: int = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "1024"))
+    # Resumable (multipart) uploads
+    UPLOAD_PART_MAX_MB: int = int(os.getenv("UPLOAD_PART_MAX_MB", "64"))
+    UPLOAD_PART_DEFAULT_MB: int = int(os.getenv("UPLOAD_PART_DEFAULT_MB", "8"))
+    UPLOAD_SESSION_TTL_HOURS: int = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+    # Unreferenced blobs and abandoned temp uploads younger than this are kept
+    BLOB_GC_GRACE_HOURS: int = int(os.getenv("BLOB_GC_GRACE_HOURS", "24"))
+
+    # File Delivery Configuration
+    # "app": stream from the worker in chunks
+    # "x-accel-redirect": nginx serves the bytes from an internal location
+    # "x-sendfile": Apache/lighttpd serve the bytes from the absolute path
+    FILE_DELIVERY_MODE: str = os.getenv("FILE_DELIVERY_MODE", "app").lower()
+    # Internal nginx location that maps onto UPLOAD_FOLDER
+    ACCEL_REDIRECT_PREFIX: str = os.getenv("ACCEL_REDIRECT_PREFIX", "/protected-files/")
+
+    # Signed download links (HMAC-SHA256). Keys are "id:secret" pairs separated
+    # by commas; links are signed with URL_SIGNING_KEY_ID and verified with any
+    # listed key, so a new key can be added before the old one is retired.
+    # Empty: a single key derived from JWT_SECRET.
+    URL_SIGNING_KEYS: str = os.getenv("URL_SIGNING_KEYS", "")
+    URL_SIGNING_KEY_ID: str = os.getenv("URL_SIGNING_KEY_ID", "")
+    # Library download links (POST /download/batch)
+    MAX_BATCH_DOWNLOAD_ITEMS: int = int(os.getenv("MAX_BATCH_DOWNLOAD_ITEMS", "500"))
+
+    # Storage backend: "local" (UPLOAD_FOLDER) or "s3" (any S3-compatible store)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local").lower()
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: str = os.getenv("S3_REGION", "us-east-1")
+    S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID", "")
+    S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+    S3_ADDRESSING_STYLE: str = os.getenv("S3_ADDRESSING_STYLE", "path")
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50"))
+
+    # Supabase Configuration
+    SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
+    SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
+    SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+    # Outbound HTTP (shared pooled client)
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    HTTP_READ_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "60"))
+
+    # Product text search: "database" (FTS5 / tsvector, see search_index.py)
+    # or "memory" (in-process BM25 index, see memory_search.py)
+    SEARCH_ENGINE: str = os.getenv("SEARCH_ENGINE", "database").lower()
+    # SEARCH_ENGINE=memory: full rebuild this often, the bound on how stale the
+    # index can be for changes it was not told about (0 disables)
+    SEARCH_MEMORY_REFRESH_SECONDS: float = float(
+        os.getenv("SEARCH_MEMORY_REFRESH_SECONDS", "300")
+    )
+
+    # Public platform stats (see backend/services/platform_snapshot.py):
+    # recomputed this often, this long after a change, and never served older
+    # than PLATFORM_SNAPSHOT_MAX_AGE_SECONDS
+    PLATFORM_SNAPSHOT_REFRESH_SECONDS: float = float(
+        os.getenv("PLATFORM_SNAPSHOT_REFRESH_SECONDS", "60")
+    )
+    PLATFORM_SNAPSHOT_DEBOUNCE_SECONDS: float = float(
+        os.getenv("PLATFORM_SNAPSHOT_DEBOUNCE_SECONDS", "2")
+    )
+    PLATFORM_SNAPSHOT_MAX_AGE_SECONDS: float = float(
+        os.getenv("PLATFORM_SNAPSHOT_MAX_AGE_SECONDS", "300")
+    )
+    # Most frequent tags returned with every product search (0 disables)
+    SEARCH_TAG_FACETS: int = int(os.getenv("SEARCH_TAG_FACETS", "20"))
 
     # Pagination Configuration
     DEFAULT_PAGE_SIZE: int = int(os.getenv("DEFAULT_PAGE_SIZE", "10"))
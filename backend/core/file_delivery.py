@@ -0,0 +1,413 @@
+"""
+File delivery helpers shared by the secure download endpoints
+
+- RangeFileResponse serves a file with Range / If-Range support (single and
+  multi-range 206 responses) so resumed downloads and video seeks only
+  transfer the bytes that were asked for.
+- FileMetadata carries the size, modification time, ETag and MIME type
+  recorded at upload (see backend/services/blob_service.py), so responses
+  can be answered without stat()ing the file first.
+- LinkAuthorizationCache remembers signed links that already passed their
+  checks, so the parallel range requests a download manager or video player
+  makes for one link are authorized once, not once per request.
+- deliver_file picks the transfer path from settings.FILE_DELIVERY_MODE: the
+  app can either stream the bytes itself in chunks, or only authorize and
+  hand the transfer to the front proxy, which sends the file with sendfile()
+  and frees the worker. The proxy modes are the way to offload large
+  downloads in production:
+
+      # nginx, FILE_DELIVERY_MODE=x-accel-redirect
+      location /protected-files/ {
+          internal;
+          alias /srv/vaulture/uploads/;
+      }
+"""
+
+import mimetypes
+import os
+import secrets
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Hashable, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+import anyio
+from starlette.responses import JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+from backend.core.config import settings
+
+
+class FileMetadata(NamedTuple):
+    """Indexed facts about a stored file, known without touching the disk"""
+
+    size: int
+    modified_at: float  # Unix timestamp
+    etag: str  # Quoted strong validator
+    media_type: Optional[str] = None
+
+
+def guess_media_type(filename: str) -> str:
+    """Best-effort MIME type so browsers can play media inline"""
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def content_disposition(filename: str, disposition_type: str = "attachment") -> str:
+    """Content-Disposition value, RFC 5987-encoded for non-ASCII names"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition_type}; filename*=utf-8''{quoted}"
+    return f'{disposition_type}; filename="{filename}"'
+
+
+def parse_range_header(
+    range_header: str, file_size: int, max_ranges: int
+) -> Optional[List[Tuple[int, int]]]:
+    """Parse a bytes Range header into sorted, merged [start, end) pairs.
+
+    Returns None when the header should be ignored (malformed, not bytes,
+    too many ranges) and an empty list when no range is satisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_text, sep, end_text = part.partition("-")
+        if not sep:
+            return None
+        try:
+            if start_text == "":
+                # Suffix range: the last N bytes
+                suffix = int(end_text)
+                if suffix <= 0:
+                    continue
+                start, end = max(file_size - suffix, 0), file_size
+            else:
+                start = int(start_text)
+                if end_text and int(end_text) < start:
+                    return None
+                end = min(int(end_text) + 1, file_size) if end_text else file_size
+        except ValueError:
+            return None
+
+        if start < file_size:
+            ranges.append((start, end))
+
+    if len(ranges) > max_ranges:
+        return None
+
+    # Coalesce overlapping and adjacent ranges
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFileResponse(Response):
+    """FileResponse replacement with Range / If-Range support"""
+
+    chunk_size = 64 * 1024
+    max_ranges = 16
+
+    def __init__(
+        self,
+        path: str,
+        filename: Optional[str] = None,
+        media_type: Optional[str] = None,
+        headers: Optional[dict] = None,
+        content_disposition_type: str = "attachment",
+        metadata: Optional[FileMetadata] = None,
+    ):
+        self.path = str(path)
+        self.filename = filename
+        self.metadata = metadata
+        self.status_code = 200
+        self.media_type = (
+            media_type
+            or (metadata.media_type if metadata else None)
+            or guess_media_type(filename or self.path)
+        )
+        self.background = None
+        self.init_headers(headers)
+        self.headers.setdefault("accept-ranges", "bytes")
+
+        if filename is not None:
+            self.headers.setdefault(
+                "content-disposition",
+                content_disposition(filename, content_disposition_type),
+            )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.metadata is not None:
+            # Indexed at upload: no syscall until the bytes are read
+            file_size = self.metadata.size
+            modified_at = self.metadata.modified_at
+            etag = self.metadata.etag
+        else:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                await self._send_not_found(scope, receive, send)
+                return
+            file_size = stat_result.st_size
+            modified_at = stat_result.st_mtime
+            etag = f'"{int(modified_at):x}-{file_size:x}"'
+        self.headers.setdefault("last-modified", formatdate(modified_at, usegmt=True))
+        self.headers.setdefault("etag", etag)
+
+        request_headers = {
+            key.decode("latin-1").lower(): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        send_body = scope.get("method", "GET") != "HEAD"
+
+        if self._not_modified(request_headers):
+            # The client's copy is current, so send no body (and open no file)
+            for header in ("content-disposition", "content-type"):
+                if header in self.headers:
+                    del self.headers[header]
+            await self._send_start(send, 304)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        ranges = None
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(request_headers.get("if-range")):
+            ranges = parse_range_header(range_header, file_size, self.max_ranges)
+
+        if ranges == []:
+            self.headers["content-range"] = f"bytes */{file_size}"
+            self.headers["content-length"] = "0"
+            await self._send_start(send, 416)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # Open before any header goes out: a file deleted or garbage-collected
+        # after its link was authorized (or indexed) is then a clean 404
+        try:
+            file = await anyio.open_file(self.path, mode="rb")
+        except FileNotFoundError:
+            await self._send_not_found(scope, receive, send)
+            return
+
+        async with file:
+            if ranges is None:
+                self.headers["content-length"] = str(file_size)
+                await self._send_start(send, 200)
+                if send_body:
+                    await self._send_ranges(send, file, [(0, file_size)])
+                else:
+                    await send({"type": "http.response.body", "body": b""})
+            elif len(ranges) == 1:
+                start, end = ranges[0]
+                self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+                self.headers["content-length"] = str(end - start)
+                await self._send_start(send, 206)
+                if send_body:
+                    await self._send_ranges(send, file, ranges)
+                else:
+                    await send({"type": "http.response.body", "body": b""})
+            else:
+                await self._send_multipart(send, file, ranges, file_size, send_body)
+
+    def _not_modified(self, request_headers: dict) -> bool:
+        """Conditional GET: If-None-Match, or If-Modified-Since without it"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.headers["etag"].removeprefix("W/") in tags
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(
+                self.headers["last-modified"]
+            )
+        except (TypeError, ValueError):
+            return False
+
+    def _if_range_matches(self, if_range: Optional[str]) -> bool:
+        """If-Range: only honour Range when the validator still matches"""
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            # Weak validators never match for range requests
+            return if_range == self.headers["etag"]
+        try:
+            # Strong date validation: the file must not have changed at all
+            return parsedate_to_datetime(if_range) == parsedate_to_datetime(
+                self.headers["last-modified"]
+            )
+        except (TypeError, ValueError):
+            return False
+
+    async def _send_start(self, send: Send, status_code: int) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+    async def _send_not_found(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse({"detail": "File not found"}, status_code=404)
+        await response(scope, receive, send)
+
+    async def _send_ranges(
+        self, send: Send, file, ranges: List[Tuple[int, int]]
+    ) -> None:
+        for start, end in ranges:
+            await self._send_file_range(send, file, start, end)
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _send_file_range(self, send: Send, file, start: int, end: int) -> None:
+        await file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = await file.read(min(self.chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def _send_multipart(
+        self,
+        send: Send,
+        file,
+        ranges: List[Tuple[int, int]],
+        file_size: int,
+        send_body: bool,
+    ) -> None:
+        boundary = secrets.token_hex(16)
+        part_headers = [
+            (
+                f"--{boundary}\r\n"
+                f"Content-Type: {self.media_type}\r\n"
+                f"Content-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n"
+            ).encode("latin-1")
+            for start, end in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        content_length = (
+            sum(len(header) for header in part_headers)
+            + sum(end - start for start, end in ranges)
+            + 2 * (len(ranges) - 1)  # CRLF between parts
+            + len(closing)
+        )
+
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(content_length)
+        await self._send_start(send, 206)
+        if not send_body:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        for index, (start, end) in enumerate(ranges):
+            prefix = part_headers[index] if index == 0 else b"\r\n" + part_headers[index]
+            await send({"type": "http.response.body", "body": prefix, "more_body": True})
+            await self._send_file_range(send, file, start, end)
+        await send({"type": "http.response.body", "body": closing})
+
+
+DELIVERY_MODES = ("app", "x-accel-redirect", "x-sendfile")
+
+
+def check_delivery_mode(name: str) -> str:
+    """Reject an unknown FILE_DELIVERY_MODE at startup rather than guessing"""
+    if name not in DELIVERY_MODES:
+        raise RuntimeError(
+            f"Unknown FILE_DELIVERY_MODE {name!r} "
+            f"(expected one of: {', '.join(DELIVERY_MODES)})"
+        )
+    return name
+
+
+check_delivery_mode(settings.FILE_DELIVERY_MODE)
+
+
+def deliver_file(
+    file_path: str,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+    headers: Optional[dict] = None,
+    metadata: Optional[FileMetadata] = None,
+) -> Response:
+    """Build the response for an already-authorized download.
+
+    file_path is relative to UPLOAD_FOLDER. In the proxy modes the worker only
+    sends headers and the front proxy does the transfer (including Range),
+    so no request handler is tied up for the length of the download. Pass the
+    file's indexed metadata to skip the stat() in app mode.
+    """
+    if media_type is None and metadata is not None:
+        media_type = metadata.media_type
+    mode = settings.FILE_DELIVERY_MODE
+    absolute_path = os.path.abspath(os.path.join(settings.UPLOAD_FOLDER, file_path))
+
+    if mode in ("x-accel-redirect", "x-sendfile"):
+        response_headers = dict(headers or {})
+        if filename is not None:
+            response_headers["Content-Disposition"] = content_disposition(filename)
+
+        if mode == "x-accel-redirect":
+            prefix = settings.ACCEL_REDIRECT_PREFIX.rstrip("/")
+            response_headers["X-Accel-Redirect"] = f"{prefix}/{quote(file_path)}"
+        else:
+            response_headers["X-Sendfile"] = absolute_path
+
+        return Response(
+            status_code=200,
+            media_type=media_type or guess_media_type(filename or file_path),
+            headers=response_headers,
+        )
+
+    return RangeFileResponse(
+        path=absolute_path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        metadata=metadata,
+    )
+
+
+class LinkAuthorizationCache:
+    """Remember signed links that already passed authorization until they expire"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.time() > expires_at:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    # Still full: drop the oldest insertion
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (expires_at, value)
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        for key in [k for k, (exp, _) in self._entries.items() if now > exp]:
+            del self._entries[key]
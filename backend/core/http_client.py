@@ -0,0 +1,38 @@
+"""
+Process-wide pooled async HTTP client
+
+Creating an httpx.AsyncClient per request throws away its connection pool
+(and TLS sessions) every time. Every outbound call goes through this shared
+client instead; it is closed when the application shuts down.
+"""
+
+from typing import Optional
+import httpx
+from backend.core.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_READ_TIMEOUT_SECONDS,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (called on application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,134 @@
+"""
+JWT encoding/decoding and the verified-claims cache
+
+Every authenticated request verifies its token (get_current_user, and the
+replica router's request_user_id). verify_token in backend/core/security.py
+now decodes through ClaimsCache: an LRU keyed by the token's SHA-256 digest
+holding the claims of tokens that already passed signature and expiry checks,
+until their `exp`. A token is decoded once per worker instead of once per
+request; tokens that fail verification are never cached.
+
+JWT_BACKEND picks the library behind encode_token / decode_token:
+
+- "jose"  python-jose (default)
+- "pyjwt" PyJWT (pip install PyJWT), a smaller pure-Python implementation
+
+Both produce and accept the same HS256 tokens, so switching backends does
+not invalidate issued tokens. scripts/bench_jwt.py compares them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from backend.core.config import settings
+
+
+class TokenError(Exception):
+    """Token is malformed, badly signed or expired (for either backend)"""
+
+
+def _jose_backend():
+    from jose import JWTError, jwt
+
+    def encode(claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+    def decode(token: str) -> Dict[str, Any]:
+        try:
+            return jwt.decode(
+                token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+            )
+        except JWTError as e:
+            raise TokenError(str(e))
+
+    return encode, decode
+
+
+def _pyjwt_backend():
+    try:
+        import jwt
+    except ImportError:
+        raise RuntimeError("JWT_BACKEND=pyjwt requires PyJWT (pip install PyJWT)")
+
+    def encode(claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+    def decode(token: str) -> Dict[str, Any]:
+        try:
+            return jwt.decode(
+                token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+            )
+        except jwt.PyJWTError as e:
+            raise TokenError(str(e))
+
+    return encode, decode
+
+
+BACKENDS = {"jose": _jose_backend, "pyjwt": _pyjwt_backend}
+
+
+def load_backend(name: str):
+    """(encode, decode) functions for a JWT_BACKEND name"""
+    if name not in BACKENDS:
+        raise RuntimeError(
+            f"Unknown JWT_BACKEND {name!r} (expected one of: {', '.join(BACKENDS)})"
+        )
+    return BACKENDS[name]()
+
+
+encode_token, decode_token = load_backend(settings.JWT_BACKEND)
+
+
+class ClaimsCache:
+    """LRU of verified claims keyed by token digest, kept until `exp`"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        expires_at = claims.get("exp")
+        # Tokens without a numeric expiry are verified every time
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+claims_cache = ClaimsCache(settings.JWT_CACHE_MAX_ENTRIES)
+
+
+def verified_claims(token: str) -> Dict[str, Any]:
+    """Claims of a valid token, from the cache or a full decode; raises
+    TokenError. Treat the returned dict as read-only, it is shared."""
+    claims = claims_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        claims_cache.set(token, claims)
+    return claims
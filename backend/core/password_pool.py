@@ -0,0 +1,180 @@
+"""
+Bounded process pool for bcrypt
+
+bcrypt is deliberately slow (~250 ms at cost 12). Hashing inline on the
+request thread let a burst of logins use up every CPU and the thread pool
+that serves all the other sync routes. Login, registration and password
+changes now go through password_pool, which:
+
+- hashes and verifies in PASSWORD_HASH_WORKERS separate processes, so
+  password work never takes more than that many cores
+- accepts at most PASSWORD_HASH_QUEUE_SIZE jobs waiting for a worker and
+  answers 429 (Retry-After) beyond that, instead of piling up request
+  threads behind an ever-growing queue
+- records submitted/rejected jobs, queue depth and latency for
+  GET /health/password-pool
+
+PASSWORD_HASH_WORKERS=0 runs the work on the calling thread (with the same
+queue limit), e.g. on single-core instances. Scripts call
+get_password_hash / verify_password in backend/core/security.py directly.
+Workers are started with "spawn", which re-imports the main module: a
+script that serves the app itself needs an `if __name__ == "__main__"`
+guard (uvicorn and gunicorn entry points already have one).
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Dict, Optional
+import bcrypt
+from fastapi import HTTPException, status
+from backend.core.config import settings
+
+# Job latencies (queue wait + hashing) kept for the percentiles
+LATENCY_SAMPLES = 1024
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """bcrypt hash of password at the given cost factor"""
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds))
+    return hashed.decode("utf-8")
+
+
+def check_password(password: str, hashed_password: str) -> bool:
+    """Whether password matches a bcrypt hash"""
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError as e:
+        # Malformed hash in the database
+        print(f"Password verification error: {e}")
+        return False
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor a bcrypt hash was made with ("$2b$12$..." -> 12)"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordPool:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def capacity(self) -> int:
+        """Jobs accepted at once: one per worker plus the queue"""
+        return max(self.workers, 1) + self.queue_size
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app never starts processes.
+        # "spawn" because forking a process that already runs threads (the
+        # server, database drivers) can deadlock the child.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=get_context("spawn")
+                )
+            return self._executor
+
+    def run(self, fn, *args):
+        """fn(*args) on a worker process; 429 when the queue is full"""
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                full = True
+            else:
+                full = False
+                self.in_flight += 1
+                self.submitted += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if full:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many sign-in attempts right now, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                result = fn(*args)
+            else:
+                result = self._get_executor().submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool
+            with self._lock:
+                self.failed += 1
+                self._executor = None
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password service unavailable, please retry",
+            )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        with self._lock:
+            self.completed += 1
+            self._latencies.append(time.perf_counter() - started)
+        return result
+
+    def hash(self, password: str) -> str:
+        return self.run(hash_password, password, settings.BCRYPT_ROUNDS)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.run(check_password, password, hashed_password)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queue_depth": max(self.in_flight - max(self.workers, 1), 0),
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            }
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(fraction * len(latencies)))
+            return round(latencies[index] * 1000, 3)
+
+        counters["job_ms"] = {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "samples": len(latencies),
+        }
+        return counters
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE
+)
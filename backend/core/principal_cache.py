@@ -0,0 +1,105 @@
+"""
+Principal cache: the authenticated user without a database round trip
+
+get_current_user used to load the User row on every authenticated request.
+It now reads a UserSnapshot (the few immutable fields routes use to
+authorize and label a request) from a TTL + LRU cache keyed by user id.
+
+Snapshots are dropped as soon as a commit in this process changes or
+deletes the user (profile update, password change, creator upgrade, account
+deletion; see backend/db/events.py). Other worker processes notice within
+PRINCIPAL_CACHE_TTL_SECONDS. Routes that modify the user load the row
+itself with db.get(User, current_user.id).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+from backend.core.config import settings
+from backend.db.events import on_commit
+from backend.models.user import User
+
+
+class UserSnapshot(NamedTuple):
+    """Read-only copy of the User fields request handling needs"""
+
+    id: int
+    email: str
+    is_creator: bool
+    display_name: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_creator=bool(user.is_creator),
+            display_name=user.display_name,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """LRU of UserSnapshots that expire PRINCIPAL_CACHE_TTL_SECONDS after loading"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, see set()
+        self.generation = 0
+
+    def get(self, user_id: int) -> Optional[UserSnapshot]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if time.monotonic() > expires_at:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def set(self, snapshot: UserSnapshot, generation: int) -> None:
+        """Cache a snapshot loaded when self.generation was `generation`
+
+        A row read before a concurrent commit invalidated the user would
+        otherwise be cached stale for a whole TTL.
+        """
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[snapshot.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids: int) -> None:
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+
+def _invalidate_users(upserted_ids, deleted_ids):
+    principal_cache.invalidate(*upserted_ids, *deleted_ids)
+
+
+on_commit(User, _invalidate_users)
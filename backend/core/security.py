@@ -1,51 +1,55 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.core.config import settings
+from backend.core.jwt_backend import TokenError, encode_token, verified_claims
+from backend.core.password_pool import check_password, hash_password, hash_rounds
+from backend.core.principal_cache import UserSnapshot, principal_cache
 from backend.db.session import get_db
+from backend.db.async_session import get_async_db
 from backend.models.user import User
 
 security = HTTPBearer()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a bcrypt hash"""
+    """Verify a password against a bcrypt hash (on the calling thread;
+    request handlers use password_pool.verify)"""
     try:
-        # Convert to bytes if needed
-        if isinstance(plain_password, str):
-            plain_password = plain_password.encode('utf-8')
-        if isinstance(hashed_password, str):
-            hashed_password = hashed_password.encode('utf-8')
-        
-        # bcrypt handles truncation automatically
-        return bcrypt.checkpw(plain_password, hashed_password)
+        # Convert to str if needed
+        if isinstance(plain_password, bytes):
+            plain_password = plain_password.decode('utf-8')
+        if isinstance(hashed_password, bytes):
+            hashed_password = hashed_password.decode('utf-8')
+
+        return check_password(plain_password, hashed_password)
     except Exception as e:
         print(f"Password verification error: {e}")
         return False
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using bcrypt at BCRYPT_ROUNDS (on the calling thread;
+    request handlers use password_pool.hash)"""
     try:
-        # Convert to bytes if needed
-        if isinstance(password, str):
-            password = password.encode('utf-8')
-        
-        # Generate salt and hash
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password, salt)
-        
-        # Return as string
-        return hashed.decode('utf-8')
+        # Convert to str if needed
+        if isinstance(password, bytes):
+            password = password.decode('utf-8')
+
+        return hash_password(password, settings.BCRYPT_ROUNDS)
     except Exception as e:
         print(f"Password hashing error: {e}")
         raise
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with a cost factor other than BCRYPT_ROUNDS"""
+    return hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -55,17 +59,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
-    )
+    encoded_jwt = encode_token(to_encode)
     return encoded_jwt
 
 
 def verify_token(token: str):
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
+        # Decoded once per token and worker, see backend/core/jwt_backend.py
+        payload = verified_claims(token)
         user_id: int = payload.get("sub")
         if user_id is None:
             raise HTTPException(
@@ -74,7 +75,7 @@ def verify_token(token: str):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         return user_id
-    except JWTError:
+    except TokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -82,36 +83,96 @@ def verify_token(token: str):
         )
 
 
-def get_current_user_optional(request):
-    """Get current user if authenticated, otherwise return None"""
+def request_token(request) -> Optional[str]:
+    """Bearer token from the Authorization header, cookie or query string"""
+    token = None
+
+    # Try to get token from Authorization header first
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+
+    # If no header, try to get from cookies (for browser requests)
+    if not token:
+        token = request.cookies.get("vaulture_token")
+
+    # If no cookie, try query parameter (as fallback)
+    if not token:
+        token = request.query_params.get("token")
+
+    return token
+
+
+def request_user_id(request) -> Optional[int]:
+    """Id of the user a request is authenticated as, without a database
+    lookup; None for anonymous requests or invalid tokens"""
+    token = request_token(request)
+    if not token:
+        return None
     try:
-        token = None
+        user_id = verify_token(token)
+    except HTTPException:
+        return None
+    return int(user_id) if str(user_id).isdigit() else None
 
-        # Try to get token from Authorization header first
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
 
-        # If no header, try to get from cookies (for browser requests)
-        if not token:
-            token = request.cookies.get("vaulture_token")
+def _user_id(token: str) -> Optional[int]:
+    """User id a valid token was issued for (None if it is not a user id)"""
+    user_id = verify_token(token)
+    # asyncpg will not coerce the token's string subject to an integer
+    return int(user_id) if str(user_id).isdigit() else None
 
-        # If no cookie, try query parameter (as fallback)
-        if not token:
-            token = request.query_params.get("token")
 
+def load_principal(db: Session, user_id: Optional[int]) -> Optional[UserSnapshot]:
+    """Snapshot of the user, from the principal cache or the database"""
+    if user_id is None:
+        return None
+    snapshot = principal_cache.get(user_id)
+    if snapshot is None:
+        generation = principal_cache.generation
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        principal_cache.set(snapshot, generation)
+    return snapshot
+
+
+async def load_principal_async(
+    db: AsyncSession, user_id: Optional[int]
+) -> Optional[UserSnapshot]:
+    """load_principal for an AsyncSession"""
+    if user_id is None:
+        return None
+    snapshot = principal_cache.get(user_id)
+    if snapshot is None:
+        generation = principal_cache.generation
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        principal_cache.set(snapshot, generation)
+    return snapshot
+
+
+def get_current_user_optional(request) -> Optional[UserSnapshot]:
+    """Get current user if authenticated, otherwise return None"""
+    try:
+        token = request_token(request)
         if not token:
             return None
 
-        user_id = verify_token(token)
+        user_id = _user_id(token)
+        snapshot = principal_cache.get(user_id) if user_id is not None else None
+        if snapshot is not None:
+            return snapshot
 
         # Get database session
         from backend.db.session import SessionLocal
 
         db = SessionLocal()
         try:
-            user = db.query(User).filter(User.id == user_id).first()
-            return user
+            return load_principal(db, user_id)
         finally:
             db.close()
     except:
@@ -121,10 +182,24 @@ def get_current_user_optional(request):
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-):
-    token = credentials.credentials
-    user_id = verify_token(token)
-    user = db.query(User).filter(User.id == user_id).first()
+) -> UserSnapshot:
+    """The authenticated user, as a read-only UserSnapshot; routes that
+    modify the user load the row with db.get(User, current_user.id)"""
+    user = load_principal(db, _user_id(credentials.credentials))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    return user
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    """get_current_user for async routes (shares the request's AsyncSession)"""
+    user = await load_principal_async(db, _user_id(credentials.credentials))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
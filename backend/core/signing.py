@@ -0,0 +1,136 @@
+"""
+Signed download links
+
+Every file endpoint signs and verifies its links through url_signer:
+
+    token = url_signer.sign(FILE_LINK, file_path, expires)
+    url_signer.verify(FILE_LINK, file_path, token, expires)
+
+Tokens are "<key id>.<hex HMAC-SHA256>" over purpose, subject and expiry.
+The purpose keeps a token minted for one endpoint from being accepted by
+another. Each key's padded inner and outer SHA-256 states are computed once
+and copied per signature, verification is constant-time, and the key id in
+the token
+lets several keys be accepted at once while signing keys are rotated
+(settings.URL_SIGNING_KEYS / URL_SIGNING_KEY_ID).
+"""
+
+import hashlib
+import hmac
+import time
+from typing import Dict, Iterable, List, Optional
+from backend.core.config import settings
+
+# Link purposes
+FILE_LINK = "file"  # /files/{path} (secure_files.py, files.py)
+MASKED_ACCESS_LINK = "masked"  # masked_file_access.py
+SHARE_LINK = "share"  # shareable_download.py
+PRIMARY_PIN = "primary-pin"  # read-your-writes cookie (db/replicas.py)
+
+DEFAULT_KEY_ID = "k0"
+
+
+class _HmacKey:
+    """HMAC-SHA256 (RFC 2104) with the key-derived hash states precomputed"""
+
+    __slots__ = ("inner", "outer")
+
+    def __init__(self, secret: bytes):
+        block_size = hashlib.sha256().block_size
+        if len(secret) > block_size:
+            secret = hashlib.sha256(secret).digest()
+        secret = secret.ljust(block_size, b"\0")
+        self.inner = hashlib.sha256(bytes(b ^ 0x36 for b in secret))
+        self.outer = hashlib.sha256(bytes(b ^ 0x5C for b in secret))
+
+    def hexdigest(self, inner) -> str:
+        """Finish an inner state that already holds the message"""
+        outer = self.outer.copy()
+        outer.update(inner.digest())
+        return outer.hexdigest()
+
+
+class UrlSigner:
+    """HMAC-SHA256 link signer with precomputed key schedules and key ids"""
+
+    def __init__(self, keys: Dict[str, bytes], active_key_id: str):
+        if active_key_id not in keys:
+            raise RuntimeError(f"Unknown URL signing key id: {active_key_id}")
+        for key_id in keys:
+            if not key_id or "." in key_id:
+                raise RuntimeError(f"Invalid URL signing key id: {key_id!r}")
+
+        self._keys = {key_id: _HmacKey(secret) for key_id, secret in keys.items()}
+        self.active_key_id = active_key_id
+
+    @classmethod
+    def from_settings(cls) -> "UrlSigner":
+        if not settings.URL_SIGNING_KEYS:
+            # Derived, so the link key differs from the JWT signing key
+            secret = hmac.new(
+                settings.JWT_SECRET.encode(), b"url-signing", hashlib.sha256
+            ).digest()
+            return cls({DEFAULT_KEY_ID: secret}, DEFAULT_KEY_ID)
+
+        keys = {}
+        for entry in settings.URL_SIGNING_KEYS.split(","):
+            key_id, sep, secret = entry.strip().partition(":")
+            if not sep or not secret:
+                raise RuntimeError("URL_SIGNING_KEYS entries must look like id:secret")
+            keys[key_id] = secret.encode()
+        active_key_id = settings.URL_SIGNING_KEY_ID or next(iter(keys))
+        return cls(keys, active_key_id)
+
+    def _signature(
+        self, key: _HmacKey, purpose: str, subject: str, expires: int
+    ) -> str:
+        inner = key.inner.copy()
+        inner.update(f"{purpose}\0{subject}\0{int(expires)}".encode())
+        return key.hexdigest(inner)
+
+    def sign(self, purpose: str, subject: str, expires: int) -> str:
+        """Token for one (purpose, subject, expiry)"""
+        key = self._keys[self.active_key_id]
+        signature = self._signature(key, purpose, subject, expires)
+        return f"{self.active_key_id}.{signature}"
+
+    def sign_many(
+        self, purpose: str, subjects: Iterable[str], expires: int
+    ) -> List[str]:
+        """Tokens for many subjects sharing a purpose and expiry"""
+        key = self._keys[self.active_key_id]
+        # The purpose is hashed once for the whole batch
+        prefix = key.inner.copy()
+        prefix.update(f"{purpose}\0".encode())
+        suffix = f"\0{int(expires)}".encode()
+        key_prefix = f"{self.active_key_id}."
+
+        tokens = []
+        for subject in subjects:
+            inner = prefix.copy()
+            inner.update(subject.encode() + suffix)
+            tokens.append(key_prefix + key.hexdigest(inner))
+        return tokens
+
+    def verify(
+        self,
+        purpose: str,
+        subject: str,
+        token: str,
+        expires: int,
+        now: Optional[float] = None,
+    ) -> bool:
+        """True if the token is unexpired and was signed by any known key"""
+        if (now if now is not None else time.time()) > expires:
+            return False
+
+        key_id, sep, signature = token.partition(".")
+        key = self._keys.get(key_id) if sep else None
+        if key is None:
+            return False
+
+        expected = self._signature(key, purpose, subject, expires)
+        return hmac.compare_digest(expected.encode(), signature.encode())
+
+
+url_signer = UrlSigner.from_settings()
@@ -1,12 +1,15 @@
+from functools import lru_cache
 from supabase import create_client, Client
 from backend.core.config import settings
 
 
+@lru_cache(maxsize=1)
 def get_supabase_client() -> Client:
-    """Get Supabase client instance with anon key"""
+    """Get Supabase client instance with anon key (one per process)"""
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 
+@lru_cache(maxsize=1)
 def get_supabase_admin_client() -> Client:
-    """Get Supabase client instance with service role key for admin operations"""
+    """Get Supabase client instance with service role key for admin operations (one per process)"""
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
@@ -0,0 +1,53 @@
+"""
+Async engine and sessions for the DB-bound read paths
+
+Sync routes hold an anyio worker thread for as long as they wait on the
+database, so concurrency is capped by the thread limiter (40 by default).
+Routes that depend on get_async_db instead await their queries on the event
+loop through asyncpg / aiosqlite and hold no thread at all.
+
+The async engine uses the same database, pool settings and statement
+timeout as the sync one (backend/db/pool.py); ORM events registered on
+Session (tag sync, commit hooks) apply to AsyncSession as well.
+"""
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from backend.core.config import settings
+from backend.db.base import DATABASE_URL
+from backend.db.pool import engine_options, install_statement_timeout
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """The same database URL with its asyncio driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "sslmode" in url.query:
+        # asyncpg takes ssl=, not libpq's sslmode=
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+    return url.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, asynchronous=True)
+)
+install_statement_timeout(async_engine.sync_engine)
+
+# Objects stay readable after commit; there is no lazy loading on await
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,16 +3,15 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from backend.db.pool import engine_options, install_statement_timeout
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./creators_platform.db")
 
-# For SQLite compatibility in development
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Pool sizing, pre-ping, recycle and statement timeout come from settings
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+install_statement_timeout(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
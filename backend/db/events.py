@@ -0,0 +1,84 @@
+"""
+Commit hooks for in-process caches and indexes
+
+    on_commit(Product, callback)
+
+calls callback(upserted_ids, deleted_ids) after every commit that inserted,
+changed or deleted Product rows through the ORM. Changes are collected at
+flush time and dropped on rollback, so listeners only ever see committed
+data. Bulk query.update()/delete() and raw SQL bypass the ORM unit of work
+and are not reported.
+"""
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+CommitCallback = Callable[[Set, Set], None]
+
+_listeners: Dict[type, List[CommitCallback]] = defaultdict(list)
+
+_CHANGES_KEY = "committed_model_changes"
+
+
+def on_commit(model: type, callback: CommitCallback) -> None:
+    """Call callback(upserted_ids, deleted_ids) after commits touching model"""
+    _listeners[model].append(callback)
+
+
+def _changes(session: Session) -> Dict[type, Tuple[Set, Set]]:
+    return session.info.setdefault(_CHANGES_KEY, {})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    if not _listeners:
+        return
+    changes = _changes(session)
+    for instances, deleted in (
+        (session.new, False),
+        (session.dirty, False),
+        (session.deleted, True),
+    ):
+        for instance in instances:
+            model = type(instance)
+            if model not in _listeners:
+                continue
+            state = inspect(instance)
+            # New rows get their identity key only after this event
+            identity = state.identity or state.mapper.primary_key_from_instance(
+                instance
+            )
+            if identity is None or None in identity:
+                continue
+            key = identity[0] if len(identity) == 1 else identity
+            upserted, removed = changes.setdefault(model, (set(), set()))
+            if deleted:
+                upserted.discard(key)
+                removed.add(key)
+            else:
+                upserted.add(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session):
+    # Also fired when a savepoint is released; wait for the real COMMIT
+    if session.in_nested_transaction():
+        return
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    for model, (upserted, deleted) in changes.items():
+        for callback in _listeners[model]:
+            try:
+                callback(upserted, deleted)
+            except Exception as e:
+                # A stale cache must never fail a committed request
+                print(f"Commit listener {callback.__qualname__} failed: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_CHANGES_KEY, None)
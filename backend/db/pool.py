@@ -0,0 +1,237 @@
+"""
+Database connection pool configuration and metrics
+
+Every engine is built from engine_options(): pool size/overflow/timeout,
+pre-ping (a stale connection left behind by a database failover is replaced
+on checkout instead of failing the request), recycle, and a statement
+timeout applied to each connection, so no statement a request sends can run
+longer than DB_STATEMENT_TIMEOUT_MS:
+
+- PostgreSQL: the server's statement_timeout, set when the connection opens
+- SQLite:     a progress handler that interrupts the running statement
+
+The async engine (backend/db/async_session.py) gets the same options for
+asyncpg / aiosqlite. Pooled engines use InstrumentedQueuePool (or its
+asyncio variant), which records checkouts, waits for
+a free connection, checkout latency and timeouts. GET /health/pool reports
+them next to the pool's current state so it can be sized against real load.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from backend.core.config import settings
+
+# Checkout latencies kept for the percentiles
+LATENCY_SAMPLES = 1024
+
+# SQLite runs the progress handler every this many VM instructions
+SQLITE_PROGRESS_STEPS = 10000
+
+
+class PoolMetrics:
+    """Counters and recent checkout latencies for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def record_checkout(self, seconds: float, waited: bool, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._latencies.append(seconds)
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(fraction * len(latencies)))
+            return round(latencies[index] * 1000, 3)
+
+        counters["checkout_ms"] = {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(latencies[-1] * 1000, 3) if latencies else None,
+            "samples": len(latencies),
+        }
+        return counters
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout latency, waits and new connections"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        # No idle connection and no overflow left: this checkout has to wait
+        waited = (
+            self._max_overflow > -1
+            and self._pool.empty()
+            and self._overflow >= self._max_overflow
+        )
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(
+            time.perf_counter() - started, waited, self.checkedout()
+        )
+        return connection
+
+    def _create_connection(self):
+        self.metrics.record_connect()
+        return super()._create_connection()
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; the counters carry over
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for asyncio drivers"""
+
+
+def engine_options(url: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """create_engine() / create_async_engine() keyword arguments for a URL"""
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        if not asynchronous:
+            # aiosqlite keeps each connection on its own thread already
+            options["connect_args"] = {"check_same_thread": False}
+        if make_url(url).database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection
+            return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if asynchronous:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": timeout}
+            }
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def install_statement_timeout(engine: Engine) -> None:
+    """Interrupt SQLite statements that run past DB_STATEMENT_TIMEOUT_MS
+    (PostgreSQL enforces it server-side, see engine_options). Pass
+    async_engine.sync_engine for the async engine."""
+    if engine.dialect.name != "sqlite" or settings.DB_STATEMENT_TIMEOUT_MS <= 0:
+        return
+    limit = settings.DB_STATEMENT_TIMEOUT_MS / 1000
+
+    @event.listens_for(engine, "connect")
+    def set_progress_handler(dbapi_connection, connection_record):
+        info = connection_record.info
+
+        def interrupt():
+            # Non-zero aborts the statement with "interrupted"
+            started = info.get("statement_started")
+            timeout = info.get("statement_timeout", limit)
+            return (
+                started is not None
+                and timeout > 0
+                and time.monotonic() - started > timeout
+            )
+
+        if hasattr(dbapi_connection, "run_async"):
+            # aiosqlite: the handler runs on the connection's own thread
+            dbapi_connection.run_async(
+                lambda driver: driver.set_progress_handler(
+                    interrupt, SQLITE_PROGRESS_STEPS
+                )
+            )
+        else:
+            dbapi_connection.set_progress_handler(interrupt, SQLITE_PROGRESS_STEPS)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        # Kept until the next statement so fetching the rows is covered too
+        conn.info["statement_started"] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def clear_statement(dbapi_connection, connection_record):
+        connection_record.info.pop("statement_started", None)
+        connection_record.info.pop("statement_timeout", None)
+
+
+def set_statement_timeout(connection: Connection, milliseconds: int) -> None:
+    """Override the statement timeout for the current transaction (0 disables
+    it), e.g. for migrations and backfills that legitimately run long"""
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(milliseconds)}")
+    elif connection.dialect.name == "sqlite":
+        # Until the connection goes back to the pool
+        connection.info["statement_timeout"] = milliseconds / 1000
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Current pool state plus the metrics recorded so far"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,265 @@
+"""
+Read-replica routing for catalog and analytics reads
+
+Routes that only read (catalog browsing, creator and platform analytics)
+depend on get_read_db / get_async_read_db instead of get_db / get_async_db.
+Those sessions go to one of DATABASE_REPLICA_URLS, round robin, unless:
+
+- no replica is configured, reachable and within REPLICA_MAX_LAG_SECONDS;
+  reads then fall back to the primary
+- the request's user made a purchase in the last READ_YOUR_WRITES_SECONDS,
+  so they see their own purchase straight away (see pins below)
+
+Lag is measured with a heartbeat row (replication_heartbeat): every
+REPLICA_LAG_CHECK_SECONDS a worker compares the primary's beat with each
+replica's copy and bumps the primary's beat if it is older than that
+interval. It works the same for PostgreSQL streaming replicas and, for
+local testing, a SQLite file copied from the primary with
+`python -m backend.manage copy-replicas`.
+
+Pins: PurchaseService.complete_purchase pins the buyer in the worker that
+completed the purchase, often the one handling Stripe's webhook rather
+than any of the buyer's requests. The purchase endpoints the buyer calls
+after checkout (/purchase/verify, /purchase/session) therefore also call
+pin_client, which sets a short-lived cookie signed for the user id
+(PIN_COOKIE), so whichever worker serves their next request reads from the
+primary. Clients that do not send cookies only get the per-worker pin.
+"""
+
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import anyio
+from fastapi import Request, Response
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.config import settings
+from backend.core.security import request_user_id
+from backend.core.signing import PRIMARY_PIN, url_signer
+from backend.db.async_session import AsyncSessionLocal, async_database_url
+from backend.db.base import SessionLocal, engine
+from backend.db.pool import engine_options, install_statement_timeout, pool_status
+from backend.models.replication import ReplicationHeartbeat
+
+HEARTBEAT_ID = 1
+
+# "<expires>.<token>", token signed for (PRIMARY_PIN, user id, expires)
+PIN_COOKIE = "primary_pin"
+
+
+class Replica:
+    """Sync and async engines for one replica, plus its last measured lag"""
+
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_engine(url, **engine_options(url))
+        install_statement_timeout(self.engine)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+
+        async_url = async_database_url(url)
+        self.async_engine = create_async_engine(
+            async_url, **engine_options(async_url, asynchronous=True)
+        )
+        install_statement_timeout(self.async_engine.sync_engine)
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+        # None until measured, or when the replica cannot be read
+        self.lag: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.lag is not None and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._round_robin = itertools.count()
+        self._pins: Dict[int, float] = {}
+        self._pins_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._checked_at = 0.0
+
+    def pin(self, user_id: int) -> None:
+        """Send user_id's reads to the primary for READ_YOUR_WRITES_SECONDS"""
+        if not self.replicas:
+            return
+        expires_at = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+        with self._pins_lock:
+            self._pins[user_id] = expires_at
+            # Drop expired pins now and then so the map stays small
+            if len(self._pins) > 1000:
+                now = time.monotonic()
+                self._pins = {
+                    uid: until for uid, until in self._pins.items() if until > now
+                }
+
+    def is_pinned(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        with self._pins_lock:
+            expires_at = self._pins.get(user_id)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def refresh_due(self) -> bool:
+        return bool(self.replicas) and (
+            time.monotonic() - self._checked_at >= settings.REPLICA_LAG_CHECK_SECONDS
+        )
+
+    def refresh(self) -> None:
+        """Measure every replica's lag (one worker at a time; others keep
+        routing on the previous measurement meanwhile)"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if not self.refresh_due():
+                return
+            try:
+                primary_beat = self.heartbeat()
+            except Exception as e:
+                # Lag cannot be measured; read from the primary meanwhile
+                print(f"Replication heartbeat failed: {e}")
+                primary_beat = None
+            for replica in self.replicas:
+                previous = replica.healthy
+                replica.lag = (
+                    None if primary_beat is None else self._lag(replica, primary_beat)
+                )
+                if replica.healthy != previous:
+                    state = "back in rotation" if replica.healthy else "out of rotation"
+                    lag = "unknown" if replica.lag is None else f"{replica.lag:.1f}s"
+                    print(f"Replica {replica.name} {state} (lag {lag})")
+            self._checked_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def _lag(self, replica: Replica, primary_beat: float) -> Optional[float]:
+        try:
+            with replica.engine.connect() as connection:
+                beat = connection.execute(
+                    select(ReplicationHeartbeat.beat_at).where(
+                        ReplicationHeartbeat.id == HEARTBEAT_ID
+                    )
+                ).scalar()
+        except Exception as e:
+            print(f"Replica {replica.name} check failed: {e}")
+            return None
+        return None if beat is None else max(primary_beat - beat, 0.0)
+
+    def heartbeat(self) -> float:
+        """The primary's heartbeat, bumped when older than the check interval"""
+        table = ReplicationHeartbeat.__table__
+        now = time.time()
+        with engine.begin() as connection:
+            beat = connection.execute(
+                select(table.c.beat_at).where(table.c.id == HEARTBEAT_ID)
+            ).scalar()
+            if beat is None:
+                connection.execute(
+                    table.insert().values(id=HEARTBEAT_ID, beat_at=now)
+                )
+            elif now - beat >= settings.REPLICA_LAG_CHECK_SECONDS:
+                connection.execute(
+                    table.update()
+                    .where(table.c.id == HEARTBEAT_ID)
+                    .values(beat_at=now)
+                )
+        # Lag is measured against the beat replicas could already have
+        return now if beat is None else beat
+
+    def choose(self, user_id: Optional[int]) -> Optional[Replica]:
+        """Replica to read from, or None for the primary"""
+        if not self.replicas or self.is_pinned(user_id):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "replica": replica.name,
+                "lag_seconds": replica.lag,
+                "healthy": replica.healthy,
+                "sync": pool_status(replica.engine),
+                "async": pool_status(replica.async_engine.sync_engine),
+            }
+            for replica in self.replicas
+        ]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+            await replica.async_engine.dispose()
+
+
+replica_set = ReplicaSet(settings.DATABASE_REPLICA_URLS)
+
+
+def pin_client(response: Response, user_id: int) -> None:
+    """Pin user_id to the primary in this worker and, through a signed
+    cookie, in every worker the client's next requests reach"""
+    replica_set.pin(user_id)
+    if not replica_set.replicas:
+        return
+    expires = int(time.time() + settings.READ_YOUR_WRITES_SECONDS)
+    token = url_signer.sign(PRIMARY_PIN, str(user_id), expires)
+    response.set_cookie(
+        PIN_COOKIE,
+        f"{expires}.{token}",
+        max_age=int(settings.READ_YOUR_WRITES_SECONDS),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def _has_pin_cookie(request: Request, user_id: Optional[int]) -> bool:
+    value = request.cookies.get(PIN_COOKIE)
+    if user_id is None or not value:
+        return False
+    expires, _, token = value.partition(".")
+    if not expires.isdigit():
+        return False
+    return url_signer.verify(PRIMARY_PIN, str(user_id), token, int(expires))
+
+
+def _choose_replica(request: Request) -> Optional[Replica]:
+    if not replica_set.replicas:
+        return None
+    user_id = request_user_id(request)
+    if _has_pin_cookie(request, user_id):
+        return None
+    return replica_set.choose(user_id)
+
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a replica when one is fit to serve"""
+    if replica_set.refresh_due():
+        replica_set.refresh()
+    replica = _choose_replica(request)
+    db = (replica.SessionLocal if replica else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """get_read_db for async routes"""
+    if replica_set.refresh_due():
+        # The lag check uses the sync engines; keep it off the event loop
+        await anyio.to_thread.run_sync(replica_set.refresh)
+    replica = _choose_replica(request)
+    async with (replica.AsyncSessionLocal if replica else AsyncSessionLocal)() as db:
+        yield db
@@ -0,0 +1,75 @@
+"""
+Schema revision check and migration runner
+
+Schema changes are made once per deploy by `python -m backend.manage
+migrate` (Alembic, scripts in backend/migrations). API workers only compare
+the revision stored in alembic_version with the newest script on boot, one
+small SELECT, so they start fast and never race each other on DDL.
+"""
+
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from backend.core.config import settings
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision a database built by create_all (before migrations) is stamped at;
+# later revisions tolerate objects create_all already made
+BASELINE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def check_schema_revision(engine: Engine) -> bool:
+    """Compare the database with the newest migration (DB_SCHEMA_CHECK decides
+    whether a mismatch stops the worker)"""
+    if settings.DB_SCHEMA_CHECK == "off":
+        return True
+
+    current, head = current_revision(engine), head_revision()
+    if current == head:
+        return True
+
+    message = (
+        f"Database schema is at revision {current or 'none'}, expected {head}. "
+        "Run: python -m backend.manage migrate"
+    )
+    if settings.DB_SCHEMA_CHECK == "warn":
+        print(f"Warning: {message}")
+        return False
+    raise RuntimeError(message)
+
+
+def upgrade_database(engine: Engine) -> None:
+    """Bring the database to the newest migration, adopting pre-migration databases"""
+    from backend.services.search_index import search_index
+
+    config = alembic_config()
+    current = current_revision(engine)
+    if current is None and inspect(engine).has_table("products"):
+        print(f"Existing database without migration history; stamping {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+
+    # Full-text objects depend on the database build (FTS5 may be missing),
+    # so search_index manages them rather than a migration
+    search_index.ensure_schema(engine)
+    print(f"Database is at revision {current_revision(engine)}")
@@ -1,7 +1,7 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
-import os
 from backend.api import (
     auth,
     creator,
@@ -13,25 +13,46 @@ from backend.api import (
     file_access,
     secure_files,
 )
-from backend.db.base import engine, Base
+from backend.db.base import engine, SessionLocal
+from backend.db.schema import check_schema_revision
+from backend.db.pool import pool_status
+from backend.db.async_session import async_engine
+from backend.db.replicas import replica_set
+from backend.core.config import settings
+from backend.core.http_client import close_http_client
+from backend.core.password_pool import password_pool
+from backend.services.search_index import search_index
+from backend.services.memory_search import memory_search_index
+from backend.services.platform_snapshot import platform_snapshot
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Schema changes and seeding run once per deploy
+# (python -m backend.manage migrate / seed); workers only check the revision
+check_schema_revision(engine)
+# Full-text search index (FTS5 / tsvector), LIKE until migrate has created it
+search_index.check_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SEARCH_ENGINE == "memory":
+        # Searches use the database until the first build has finished
+        memory_search_index.start(SessionLocal)
+    platform_snapshot.start()
+    yield
+    platform_snapshot.stop()
+    memory_search_index.stop()
+    # Release pooled outbound connections
+    await close_http_client()
+    await async_engine.dispose()
+    await replica_set.dispose()
+    password_pool.shutdown()
 
-# Run startup script to seed database (only on first deployment)
-try:
-    is_production = os.getenv("DATABASE_URL", "").startswith("postgresql")
-    if is_production:
-        print("Running startup initialization...")
-        from backend.startup import main as startup_main
-        startup_main()
-except Exception as e:
-    print(f"Startup script failed (this is okay if DB is already seeded): {e}")
 
 app = FastAPI(
     title="Creators Platform API",
     description="Digital Content Platform with Secure File Delivery",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -69,3 +90,19 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+def pool_health():
+    """Database connection pool state, checkout latency and waits"""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+        "replicas": replica_set.status(),
+    }
+
+
+@app.get("/health/password-pool")
+def password_pool_health():
+    """Password hashing workers, queue depth and load shed so far"""
+    return password_pool.status()
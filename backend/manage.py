@@ -0,0 +1,210 @@
+"""
+Maintenance commands
+
+Usage:
+    python -m backend.manage <command> [options]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+backend_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(backend_dir.parent))
+
+
+def gc_uploads(args):
+    """Remove resumable upload sessions that have gone idle"""
+    from backend.services.resumable_upload_service import resumable_upload_service
+
+    max_age = args.max_age_hours * 3600 if args.max_age_hours is not None else None
+    removed = resumable_upload_service.collect_stale_uploads(max_age)
+    print(f"Removed {removed} stale upload session(s)")
+
+
+def gc_blobs(args):
+    """Remove stored blobs no product references any more"""
+    from backend.db.base import SessionLocal
+    from backend.services.blob_service import collect_orphan_blobs
+
+    db = SessionLocal()
+    try:
+        collect_orphan_blobs(db, grace_hours=args.grace_hours, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+
+def adopt_files(args):
+    """Move files uploaded before content addressing into the blob store"""
+    from backend.db.base import SessionLocal
+    from backend.services.blob_service import adopt_legacy_files
+
+    db = SessionLocal()
+    try:
+        adopt_legacy_files(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+
+def migrate(args):
+    """Upgrade the database schema to the newest migration"""
+    from backend.db.base import engine
+    from backend.db.schema import upgrade_database
+
+    upgrade_database(engine)
+
+
+def seed(args):
+    """Add the demo creator, products and purchases to an empty database"""
+    from backend.startup import seed_database
+
+    seed_database()
+
+
+def copy_replicas(args):
+    """Copy the primary SQLite database over each SQLite replica (local testing)"""
+    import sqlite3
+    from sqlalchemy.engine import make_url
+    from backend.core.config import settings
+    from backend.db.base import DATABASE_URL
+    from backend.db.replicas import replica_set
+
+    primary = make_url(DATABASE_URL)
+    if primary.get_backend_name() != "sqlite":
+        print("The primary is not SQLite; replicas are kept up to date by replication")
+        return
+    # The copies need the heartbeat row for their lag to be measured
+    replica_set.heartbeat()
+
+    source = sqlite3.connect(primary.database)
+    try:
+        for url in settings.DATABASE_REPLICA_URLS:
+            replica = make_url(url)
+            if replica.get_backend_name() != "sqlite":
+                print(f"Skipping {replica.render_as_string(hide_password=True)}")
+                continue
+            destination = sqlite3.connect(replica.database)
+            try:
+                source.backup(destination)
+            finally:
+                destination.close()
+            print(f"Copied {primary.database} to {replica.database}")
+    finally:
+        source.close()
+
+
+def rebuild_rollups(args):
+    """Recompute the creator sales rollups (daily and hourly) from purchases"""
+    from backend.db.base import SessionLocal
+    from backend.services.platform_snapshot import platform_snapshot
+    from backend.services.sales_rollup import rebuild_sales_rollups
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_sales_rollups(db, creator_id=args.creator_id)
+        db.commit()
+    finally:
+        db.close()
+    # Platform stats are read from the rollup. Snapshots live per process, so
+    # running workers pick this up on their next PLATFORM_SNAPSHOT_REFRESH_SECONDS
+    platform_snapshot.mark_stale()
+    scope = "all creators" if args.creator_id is None else f"creator {args.creator_id}"
+    print(f"Rebuilt {rows} daily sales rollup row(s) for {scope}")
+
+
+def index_advisor(args):
+    """EXPLAIN the app's hot queries and fail on full table scans"""
+    from backend.db.base import engine
+    from backend.services.index_advisor import run_index_advisor
+    from backend.services.search_index import search_index
+
+    # Same search objects migrate creates
+    search_index.ensure_schema(engine)
+    findings = run_index_advisor(engine, verbose=args.verbose)
+    if findings:
+        sys.exit(1)
+
+
+def check_pagination(args):
+    """Walk every page of each product sort and fail on repeated or skipped rows"""
+    from backend.db.base import SessionLocal
+    from backend.models import user  # noqa: F401 (register every mapper)
+    from backend.services.product_service import check_cursor_pagination
+
+    db = SessionLocal()
+    try:
+        problems = check_cursor_pagination(db, page_size=args.page_size)
+    finally:
+        db.close()
+    for problem in problems:
+        print(f"Cursor pagination broken: {problem}")
+    if problems:
+        sys.exit(1)
+    print("Cursor pagination visits every product once in every sort")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vaulture maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gc_uploads_parser = commands.add_parser("gc-uploads", help=gc_uploads.__doc__)
+    gc_uploads_parser.add_argument(
+        "--max-age-hours",
+        type=int,
+        default=None,
+        help="Idle time before a session is removed (default: UPLOAD_SESSION_TTL_HOURS)",
+    )
+    gc_uploads_parser.set_defaults(func=gc_uploads)
+
+    gc_blobs_parser = commands.add_parser("gc-blobs", help=gc_blobs.__doc__)
+    gc_blobs_parser.add_argument(
+        "--grace-hours",
+        type=int,
+        default=None,
+        help="Minimum age of an orphan before it is removed (default: BLOB_GC_GRACE_HOURS)",
+    )
+    gc_blobs_parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be removed"
+    )
+    gc_blobs_parser.set_defaults(func=gc_blobs)
+
+    adopt_files_parser = commands.add_parser("adopt-files", help=adopt_files.__doc__)
+    adopt_files_parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be moved"
+    )
+    adopt_files_parser.set_defaults(func=adopt_files)
+
+    commands.add_parser("migrate", help=migrate.__doc__).set_defaults(func=migrate)
+    commands.add_parser("seed", help=seed.__doc__).set_defaults(func=seed)
+    commands.add_parser("copy-replicas", help=copy_replicas.__doc__).set_defaults(
+        func=copy_replicas
+    )
+
+    rebuild_rollups_parser = commands.add_parser(
+        "rebuild-rollups", help=rebuild_rollups.__doc__
+    )
+    rebuild_rollups_parser.add_argument(
+        "--creator-id", type=int, default=None, help="Only this creator's rows"
+    )
+    rebuild_rollups_parser.set_defaults(func=rebuild_rollups)
+
+    index_advisor_parser = commands.add_parser("index-advisor", help=index_advisor.__doc__)
+    index_advisor_parser.add_argument(
+        "--verbose", action="store_true", help="Print every statement and its plan"
+    )
+    index_advisor_parser.set_defaults(func=index_advisor)
+
+    check_pagination_parser = commands.add_parser(
+        "check-pagination", help=check_pagination.__doc__
+    )
+    check_pagination_parser.add_argument(
+        "--page-size", type=int, default=10, help="Products per page (1-100)"
+    )
+    check_pagination_parser.set_defaults(func=check_pagination)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Alembic environment
+
+Migrates the database in DATABASE_URL (backend/db/base.py). Databases created
+by Base.metadata.create_all before migrations existed are at revision 0001;
+mark them once with
+
+    alembic stamp 0001
+
+and then upgrade as usual.
+"""
+
+from logging.config import fileConfig
+from alembic import context
+from backend.db.base import Base, engine, DATABASE_URL
+from backend.db.pool import set_statement_timeout
+
+# Register every table on Base.metadata (autogenerate compares against it)
+from backend.models import (  # noqa: F401
+    file_blob,
+    product,
+    purchase,
+    replication,
+    sales_rollup,
+    tag,
+    user,
+)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Full-text search objects are managed by search_index.ensure_schema()
+SEARCH_INDEX_OBJECTS = ("products_fts", "search_vector", "ix_products_search_vector")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping objects that are not in Base.metadata"""
+    return not (reflected and name and name.startswith(SEARCH_INDEX_OBJECTS))
+
+
+# SQLite cannot ALTER most constraints; batch mode recreates the table instead
+render_as_batch = DATABASE_URL.startswith("sqlite")
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running it (alembic upgrade --sql)"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=render_as_batch,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=render_as_batch,
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            # Backfills and index builds may exceed DB_STATEMENT_TIMEOUT_MS
+            set_statement_timeout(connection, 0)
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,91 @@
+"""Baseline: the schema Base.metadata.create_all built before migrations
+
+Users, products and purchases, as the app created them before any of the
+later tables existed (file_blobs is added by 0008). The full-text search
+objects (products_fts / search_vector) are not part of it;
+search_index.ensure_schema() manages those.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+PRODUCT_CATEGORIES = (
+    "DIGITAL_ART",
+    "PHOTOGRAPHY",
+    "MUSIC",
+    "VIDEO",
+    "EBOOKS",
+    "SOFTWARE",
+    "TEMPLATES",
+    "COURSES",
+    "FONTS",
+    "GRAPHICS",
+    "OTHER",
+)
+PAYMENT_STATUSES = ("PENDING", "COMPLETED", "FAILED", "REFUNDED")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("is_creator", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("display_name", sa.String(50)),
+        sa.Column("bio", sa.Text()),
+        sa.Column("website", sa.String(200)),
+        sa.Column("social_links", sa.JSON()),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("creator_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("creator_name", sa.String()),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("category", sa.Enum(*PRODUCT_CATEGORIES, name="productcategory")),
+        sa.Column("tags", sa.String()),
+        sa.Column("file_url", sa.String()),
+        sa.Column("image_url", sa.String()),
+        sa.Column("image_urls", sa.JSON()),
+        sa.Column("file_size", sa.Integer()),
+        sa.Column("file_type", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "purchases",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id")),
+        sa.Column("stripe_payment_intent_id", sa.String(), unique=True),
+        sa.Column("stripe_session_id", sa.String(), unique=True),
+        sa.Column("amount_paid", sa.Float()),
+        sa.Column("currency", sa.String()),
+        sa.Column("payment_status", sa.Enum(*PAYMENT_STATUSES, name="paymentstatus")),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+
+
+def downgrade():
+    op.drop_table("purchases")
+    op.drop_table("products")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
+    sa.Enum(name="paymentstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="productcategory").drop(op.get_bind(), checkfirst=True)
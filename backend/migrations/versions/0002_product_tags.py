@@ -0,0 +1,129 @@
+"""Normalized tags: tags and product_tags, backfilled from products.tags
+
+The comma-separated products.tags column stays (it is what the API returns
+and what the full-text index reads); product_tags is the indexed copy used
+for tag filters and facets, kept in sync on flush (backend/models/tag.py).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _parse_tags(value):
+    # Same rules as backend.models.tag.parse_tags, frozen for this revision
+    names = []
+    for name in (value or "").split(","):
+        name = name.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # The app's create_all may already have made (empty) tables on boot
+    if not inspector.has_table("tags"):
+        op.create_table(
+            "tags",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+        )
+        op.create_index("ix_tags_name", "tags", ["name"], unique=True)
+    if not inspector.has_table("product_tags"):
+        op.create_table(
+            "product_tags",
+            sa.Column(
+                "product_id",
+                sa.Integer(),
+                sa.ForeignKey("products.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column(
+                "tag_id",
+                sa.Integer(),
+                sa.ForeignKey("tags.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+        )
+        op.create_index(
+            "ix_product_tags_tag_id_product_id", "product_tags", ["tag_id", "product_id"]
+        )
+
+    backfill_product_tags(bind)
+
+
+def backfill_product_tags(bind):
+    """Link every product that has tags but no product_tags rows yet"""
+    products = sa.table(
+        "products", sa.column("id", sa.Integer), sa.column("tags", sa.String)
+    )
+    tags = sa.table("tags", sa.column("id", sa.Integer), sa.column("name", sa.String))
+    links = sa.table(
+        "product_tags",
+        sa.column("product_id", sa.Integer),
+        sa.column("tag_id", sa.Integer),
+    )
+
+    tag_ids = {
+        name: tag_id for tag_id, name in bind.execute(sa.select(tags.c.id, tags.c.name))
+    }
+    linked = sa.select(links.c.product_id).where(links.c.product_id == products.c.id)
+    last_id = 0
+    linked_products = 0
+    while True:
+        rows = bind.execute(
+            sa.select(products.c.id, products.c.tags)
+            .where(
+                products.c.id > last_id,
+                products.c.tags.isnot(None),
+                ~sa.exists(linked),
+            )
+            .order_by(products.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        parsed = [(row.id, _parse_tags(row.tags)) for row in rows]
+        new_names = sorted(
+            {name for _, names in parsed for name in names} - tag_ids.keys()
+        )
+        if new_names:
+            bind.execute(tags.insert(), [{"name": name} for name in new_names])
+            tag_ids.update(
+                (name, tag_id)
+                for tag_id, name in bind.execute(
+                    sa.select(tags.c.id, tags.c.name).where(tags.c.name.in_(new_names))
+                )
+            )
+
+        batch = [
+            {"product_id": product_id, "tag_id": tag_ids[name]}
+            for product_id, names in parsed
+            for name in names
+        ]
+        if batch:
+            bind.execute(links.insert(), batch)
+            linked_products += sum(1 for _, names in parsed if names)
+
+    print(f"Linked tags for {linked_products} product(s)")
+
+
+def downgrade():
+    op.drop_index("ix_product_tags_tag_id_product_id", table_name="product_tags")
+    op.drop_table("product_tags")
+    op.drop_index("ix_tags_name", table_name="tags")
+    op.drop_table("tags")
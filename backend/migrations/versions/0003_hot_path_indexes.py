@@ -0,0 +1,68 @@
+"""Composite and partial indexes for the hot query shapes
+
+Storefront listing and keyset sorts read active products only, so those
+indexes are partial (WHERE is_active) and end in id. Purchases get the
+(user, status, product) lookup behind every download check and a
+(product, status) index for creator analytics. `python -m backend.manage
+index-advisor` checks that the app's queries use them.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("is_active")
+
+# (name, table, columns, partial on active products)
+INDEXES = [
+    ("ix_products_creator_id_is_active", "products", ["creator_id", "is_active"], False),
+    ("ix_products_file_url", "products", ["file_url"], False),
+    ("ix_products_active_created_at", "products", ["created_at", "id"], True),
+    (
+        "ix_products_active_category_created_at",
+        "products",
+        ["category", "created_at", "id"],
+        True,
+    ),
+    ("ix_products_active_price", "products", ["price", "id"], True),
+    ("ix_products_active_title", "products", ["title", "id"], True),
+    (
+        "ix_purchases_user_id_status_product_id",
+        "purchases",
+        ["user_id", "payment_status", "product_id"],
+        False,
+    ),
+    ("ix_purchases_product_id_status", "purchases", ["product_id", "payment_status"], False),
+]
+
+
+def upgrade():
+    # SQLite stores booleans as 0/1; the index predicate must match the
+    # "is_active = 1" the ORM emits or the planner will not use it
+    bind = op.get_bind()
+    active = sa.text("is_active = 1") if bind.dialect.name == "sqlite" else ACTIVE
+    existing = {
+        index["name"]
+        for table in ("products", "purchases")
+        for index in sa.inspect(bind).get_indexes(table)
+    }
+    for name, table, columns, partial in INDEXES:
+        # The app's create_all may have built them already
+        if name in existing:
+            continue
+        where = active if partial else None
+        op.create_index(
+            name, table, columns, sqlite_where=where, postgresql_where=where
+        )
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
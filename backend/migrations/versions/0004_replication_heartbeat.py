@@ -0,0 +1,27 @@
+"""Replication heartbeat row used to measure read-replica lag
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("replication_heartbeat"):
+        return
+    op.create_table(
+        "replication_heartbeat",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("beat_at", sa.Float(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("replication_heartbeat")
@@ -0,0 +1,64 @@
+"""Creator sales rollup (creator_sales_daily), backfilled from purchases
+
+One row per product and day with that day's completed sales and revenue;
+creator analytics read it instead of aggregating every purchase
+(backend/services/sales_rollup.py keeps it up to date).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("creator_sales_daily"):
+        op.create_table(
+            "creator_sales_daily",
+            sa.Column("product_id", sa.Integer(), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("creator_id", sa.Integer(), nullable=False),
+            sa.Column("sales_count", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Float(), nullable=False),
+        )
+        op.create_index(
+            "ix_creator_sales_daily_creator_id_day",
+            "creator_sales_daily",
+            ["creator_id", "day"],
+        )
+
+    backfill_creator_sales_daily(bind)
+
+
+def backfill_creator_sales_daily(bind):
+    """Rebuild every row from completed purchases (same rules as
+    backend.services.sales_rollup.rebuild_sales_rollups, frozen here)"""
+    bind.execute(sa.text("DELETE FROM creator_sales_daily"))
+    bind.execute(
+        sa.text(
+            "INSERT INTO creator_sales_daily"
+            " (product_id, day, creator_id, sales_count, revenue)"
+            " SELECT purchases.product_id, date(purchases.created_at),"
+            " products.creator_id, count(purchases.id),"
+            " coalesce(sum(purchases.amount_paid), 0.0)"
+            " FROM purchases JOIN products ON purchases.product_id = products.id"
+            " WHERE purchases.payment_status = 'COMPLETED'"
+            " AND purchases.created_at IS NOT NULL"
+            " GROUP BY purchases.product_id, date(purchases.created_at),"
+            " products.creator_id"
+        )
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_creator_sales_daily_creator_id_day", table_name="creator_sales_daily"
+    )
+    op.drop_table("creator_sales_daily")
@@ -0,0 +1,67 @@
+"""Hourly creator sales rollup (creator_sales_hourly), backfilled
+
+creator_sales_daily at hour resolution, for hour-granularity sales series
+(backend/services/sales_series.py).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("creator_sales_hourly"):
+        op.create_table(
+            "creator_sales_hourly",
+            sa.Column("product_id", sa.Integer(), primary_key=True),
+            sa.Column("hour", sa.DateTime(), primary_key=True),
+            sa.Column("creator_id", sa.Integer(), nullable=False),
+            sa.Column("sales_count", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Float(), nullable=False),
+        )
+        op.create_index(
+            "ix_creator_sales_hourly_creator_id_hour",
+            "creator_sales_hourly",
+            ["creator_id", "hour"],
+        )
+
+    backfill_creator_sales_hourly(bind)
+
+
+def backfill_creator_sales_hourly(bind):
+    """Rebuild every row from completed purchases (same rules as
+    backend.services.sales_rollup.rebuild_sales_rollups, frozen here)"""
+    if bind.dialect.name == "sqlite":
+        # The format SQLAlchemy's DateTime stores on sqlite
+        hour = "strftime('%Y-%m-%d %H:00:00.000000', purchases.created_at)"
+    else:
+        hour = "date_trunc('hour', purchases.created_at)"
+    bind.execute(sa.text("DELETE FROM creator_sales_hourly"))
+    bind.execute(
+        sa.text(
+            "INSERT INTO creator_sales_hourly"
+            " (product_id, hour, creator_id, sales_count, revenue)"
+            f" SELECT purchases.product_id, {hour},"
+            " products.creator_id, count(purchases.id),"
+            " coalesce(sum(purchases.amount_paid), 0.0)"
+            " FROM purchases JOIN products ON purchases.product_id = products.id"
+            " WHERE purchases.payment_status = 'COMPLETED'"
+            " AND purchases.created_at IS NOT NULL"
+            f" GROUP BY purchases.product_id, {hour}, products.creator_id"
+        )
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_creator_sales_hourly_creator_id_hour", table_name="creator_sales_hourly"
+    )
+    op.drop_table("creator_sales_hourly")
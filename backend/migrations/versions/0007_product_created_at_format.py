@@ -0,0 +1,37 @@
+"""Store every products.created_at on SQLite with microseconds
+
+SQLite keeps DateTime as text. Rows created with the old CURRENT_TIMESTAMP
+default read '2026-10-17 05:36:49', while bound datetimes (keyset cursors)
+render '2026-10-17 05:36:49.000000', so cursor pages on created_at never
+advanced past such rows. Product.created_at is now set in Python; this
+brings the existing rows to the same form. Other databases store real
+timestamps and are left alone.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    bind.execute(
+        sa.text(
+            "UPDATE products SET created_at = created_at || '.000000'"
+            " WHERE length(created_at) = 19"
+        )
+    )
+
+
+def downgrade():
+    # Both forms read back as the same datetime
+    pass
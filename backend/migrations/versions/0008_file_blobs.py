@@ -0,0 +1,50 @@
+"""Content-addressed blob index (file_blobs)
+
+Used to be created by 0001, so databases built before migrations existed
+(stamped at 0001 without running it) never got it. Databases that already
+have the table keep it; one created by create_all before the download
+metadata columns existed gets those columns added.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+METADATA_COLUMNS = (
+    ("mime_type", sa.String),
+    ("etag", sa.String),
+    ("modified_at", sa.Float),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("file_blobs"):
+        op.create_table(
+            "file_blobs",
+            sa.Column("sha256", sa.String(64), primary_key=True),
+            sa.Column("storage_key", sa.String(), nullable=False, unique=True),
+            sa.Column("size", sa.BigInteger(), nullable=False),
+            sa.Column("mime_type", sa.String()),
+            sa.Column("etag", sa.String()),
+            sa.Column("modified_at", sa.Float()),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+        return
+
+    existing = {column["name"] for column in inspector.get_columns("file_blobs")}
+    for name, column_type in METADATA_COLUMNS:
+        if name not in existing:
+            op.add_column("file_blobs", sa.Column(name, column_type()))
+
+
+def downgrade():
+    op.drop_table("file_blobs")
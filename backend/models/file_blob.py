@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, func
+from backend.db.base import Base
+
+
+class FileBlob(Base):
+    """Content-addressed stored file, shared by every product that uses it"""
+
+    __tablename__ = "file_blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # Hex digest of the content
+    storage_key = Column(String, unique=True, nullable=False)  # blobs/ab/cd/<sha256>
+    size = Column(BigInteger, nullable=False)
+    # Download metadata recorded at upload, so serving a file needs no stat()
+    mime_type = Column(String)
+    etag = Column(String)  # Quoted, "<sha256>" (content never changes)
+    modified_at = Column(Float)  # Unix timestamp the blob was written
+    # Number of Product.file_url / Product.image_url values pointing here
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=func.now())
@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlalchemy import (
     Column,
     Integer,
@@ -6,13 +7,15 @@ from sqlalchemy import (
     Float,
     DateTime,
     ForeignKey,
-    func,
     Enum as SQLEnum,
     Boolean,
     JSON,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from backend.db.base import Base
+from backend.models.file_blob import FileBlob  # noqa: F401 (Product.file_blob)
+from backend.models.tag import product_tags
 import enum
 
 
@@ -40,14 +43,63 @@ class Product(Base):
     description = Column(Text)
     price = Column(Float, nullable=False)
     category = Column(SQLEnum(ProductCategory), default=ProductCategory.OTHER)
-    tags = Column(String)  # Comma-separated tags for search
+    tags = Column(String)  # Comma-separated tags, as entered (see tag_entries)
     file_url = Column(String)  # Storage path for main file
     image_url = Column(String)  # Storage path for product image/thumbnail (main image)
     image_urls = Column(JSON)  # JSON array of additional product images for gallery
     file_size = Column(Integer)  # File size in bytes
     file_type = Column(String)  # File extension/type
     is_active = Column(Boolean, default=True)  # For soft deletion
-    created_at = Column(DateTime, default=func.now())
+    # Set in Python so every row is stored in the form the keyset cursors bind
+    # (SQLite keeps DateTime as text; CURRENT_TIMESTAMP drops the
+    # microseconds). Migration 0007 brought older rows to the same form.
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Storefront queries only ever read active products, so their indexes are
+    # partial; each ends in id to serve keyset pagination (product_service.py).
+    # Keep in sync with migration 0003.
+    __table_args__ = (
+        Index("ix_products_creator_id_is_active", "creator_id", "is_active"),
+        Index("ix_products_file_url", "file_url"),
+        Index(
+            "ix_products_active_created_at",
+            "created_at",
+            "id",
+            sqlite_where=is_active == True,
+            postgresql_where=is_active == True,
+        ),
+        Index(
+            "ix_products_active_category_created_at",
+            "category",
+            "created_at",
+            "id",
+            sqlite_where=is_active == True,
+            postgresql_where=is_active == True,
+        ),
+        Index(
+            "ix_products_active_price",
+            "price",
+            "id",
+            sqlite_where=is_active == True,
+            postgresql_where=is_active == True,
+        ),
+        Index(
+            "ix_products_active_title",
+            "title",
+            "id",
+            sqlite_where=is_active == True,
+            postgresql_where=is_active == True,
+        ),
+    )
 
     creator = relationship("User", back_populates="products")
     purchases = relationship("Purchase", back_populates="product")
+    # Indexed size / mtime / ETag / MIME type of the main file
+    file_blob = relationship(
+        "FileBlob",
+        primaryjoin="foreign(Product.file_url) == FileBlob.storage_key",
+        viewonly=True,
+        uselist=False,
+    )
+    # Normalized tags, synced from the tags column on flush (models/tag.py)
+    tag_entries = relationship("Tag", secondary=product_tags, order_by="Tag.name")
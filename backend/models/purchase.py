@@ -7,6 +7,7 @@ from sqlalchemy import (
     String,
     Float,
     Enum as SQLEnum,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from backend.db.base import Base
@@ -34,5 +35,17 @@ class Purchase(Base):
     created_at = Column(DateTime, default=func.now())
     completed_at = Column(DateTime, nullable=True)
 
+    # "Has this user bought this product?", a buyer's library, and per-product
+    # sales for creator analytics. Keep in sync with migration 0003.
+    __table_args__ = (
+        Index(
+            "ix_purchases_user_id_status_product_id",
+            "user_id",
+            "payment_status",
+            "product_id",
+        ),
+        Index("ix_purchases_product_id_status", "product_id", "payment_status"),
+    )
+
     user = relationship("User", back_populates="purchases")
     product = relationship("Product", back_populates="purchases")
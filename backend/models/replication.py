@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, Float
+from backend.db.base import Base
+
+
+class ReplicationHeartbeat(Base):
+    """Single row bumped on the primary; how far behind a replica's copy is
+    shows how far that replica lags (backend/db/replicas.py)"""
+
+    __tablename__ = "replication_heartbeat"
+
+    id = Column(Integer, primary_key=True)
+    beat_at = Column(Float, nullable=False)  # Unix timestamp of the last beat
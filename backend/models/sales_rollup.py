@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer
+from backend.db.base import Base
+
+
+class CreatorSalesDaily(Base):
+    """Completed sales per product and day, the source of creator analytics
+
+    Derived from purchases: PurchaseService.complete_purchase adds each sale
+    in the same transaction, and `python -m backend.manage rebuild-rollups`
+    recomputes it from scratch (backend/services/sales_rollup.py). No foreign
+    keys, so it can be dropped and rebuilt at any time.
+    """
+
+    __tablename__ = "creator_sales_daily"
+
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)  # Date of Purchase.created_at
+    creator_id = Column(Integer, nullable=False)
+    sales_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)  # Sum of amount_paid
+
+    # A creator's dashboard; keep in sync with migration 0005
+    __table_args__ = (
+        Index("ix_creator_sales_daily_creator_id_day", "creator_id", "day"),
+    )
+
+
+class CreatorSalesHourly(Base):
+    """CreatorSalesDaily at hour resolution, for short-range charts
+    (backend/services/sales_series.py); maintained the same way"""
+
+    __tablename__ = "creator_sales_hourly"
+
+    product_id = Column(Integer, primary_key=True)
+    hour = Column(DateTime, primary_key=True)  # Purchase.created_at, truncated
+    creator_id = Column(Integer, nullable=False)
+    sales_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+    # Keep in sync with migration 0006
+    __table_args__ = (
+        Index("ix_creator_sales_hourly_creator_id_hour", "creator_id", "hour"),
+    )
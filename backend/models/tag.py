@@ -0,0 +1,94 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Table, event, inspect, select
+from sqlalchemy.orm import Session
+from backend.db.base import Base
+
+# Many-to-many link between products and their tags. The primary key serves
+# "tags of a product"; the reverse index serves "products with a tag".
+product_tags = Table(
+    "product_tags",
+    Base.metadata,
+    Column(
+        "product_id",
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Index("ix_product_tags_tag_id_product_id", "tag_id", "product_id"),
+)
+
+
+class Tag(Base):
+    """A normalized tag name, shared by every product that uses it"""
+
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True, nullable=False)  # Lower-cased
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Tag names of a comma-separated string: lower-cased, trimmed, unique"""
+    names = []
+    for name in (value or "").split(","):
+        name = name.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _insert_missing_tags(connection, names: Iterable[str]) -> None:
+    """Create tag rows that do not exist yet, tolerating concurrent inserts"""
+    rows = [{"name": name} for name in names]
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        connection.execute(
+            insert(Tag.__table__).on_conflict_do_nothing(index_elements=["name"]), rows
+        )
+        return
+
+    existing = set(
+        connection.scalars(select(Tag.name).where(Tag.name.in_(list(names))))
+    )
+    missing = [row for row in rows if row["name"] not in existing]
+    if missing:
+        connection.execute(Tag.__table__.insert(), missing)
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_product_tags(session, flush_context, instances):
+    """Keep product_tags in line with Product.tags for new and edited products"""
+    from backend.models.product import Product
+
+    changed = [
+        product
+        for product in list(session.new) + list(session.dirty)
+        if isinstance(product, Product)
+        and (product in session.new or inspect(product).attrs.tags.history.has_changes())
+    ]
+    if not changed:
+        return
+
+    wanted = {id(product): parse_tags(product.tags) for product in changed}
+    names = {name for product_names in wanted.values() for name in product_names}
+    tags_by_name = {}
+    if names:
+        # Core statements on the session's connection: no autoflush here
+        connection = session.connection()
+        _insert_missing_tags(connection, names)
+        with session.no_autoflush:
+            tags_by_name = {
+                tag.name: tag
+                for tag in session.scalars(select(Tag).where(Tag.name.in_(names)))
+            }
+
+    with session.no_autoflush:
+        for product in changed:
+            product.tag_entries = [tags_by_name[name] for name in wanted[id(product)]]
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
+from backend.core.config import settings
+
+
+class BatchDownloadRequest(BaseModel):
+    """Request schema for download links to many products at once"""
+
+    product_ids: List[int] = Field(
+        default_factory=list, description="Products to get download URLs for"
+    )
+    all: bool = Field(False, description="Every product the user has purchased")
+
+    @validator("product_ids")
+    def validate_product_ids(cls, v):
+        if len(v) > settings.MAX_BATCH_DOWNLOAD_ITEMS:
+            raise ValueError(
+                f"At most {settings.MAX_BATCH_DOWNLOAD_ITEMS} products per request"
+            )
+        # Keep the caller's order, drop repeats
+        return list(dict.fromkeys(v))
+
+
+class BatchDownloadItem(BaseModel):
+    product_id: int
+    product_title: str
+    download_url: str
+    access_type: str  # "owner" or "purchased"
+    file_type: Optional[str]
+    file_size: Optional[int]
+
+
+class BatchDownloadResponse(BaseModel):
+    items: List[BatchDownloadItem]
+    denied_product_ids: List[int] = Field(
+        ..., description="Requested products that are missing or not owned"
+    )
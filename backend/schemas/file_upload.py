@@ -68,6 +68,41 @@ class ImageUploadSchema(BaseModel):
         return v
 
 
+class UploadSessionInit(BaseModel):
+    """Request schema for starting a resumable upload"""
+
+    filename: str = Field(..., description="Original filename")
+    total_size: int = Field(..., ge=1, description="Total file size in bytes")
+    part_size: Optional[int] = Field(
+        None, ge=1024 * 1024, description="Part size in bytes (min 1MB)"
+    )
+
+    @validator("filename")
+    def validate_filename(cls, v):
+        if not v or not v.strip():
+            raise ValueError("Filename cannot be empty")
+
+        # Same security-only checks as single-request uploads
+        dangerous_patterns = ["../", ".\\", "<script", "<?php"]
+        if any(pattern in v.lower() for pattern in dangerous_patterns):
+            raise ValueError("Filename contains potentially dangerous content")
+
+        return v
+
+
+class UploadSessionResponse(BaseModel):
+    """State of a resumable upload session"""
+
+    upload_id: str
+    filename: str
+    total_size: int
+    part_size: int
+    part_count: int
+    missing_parts: List[int]
+    is_complete: bool
+    expires_at: int
+
+
 def validate_upload_file(file: UploadFile, is_image: bool = False) -> None:
     """
     Validate an uploaded file
@@ -81,17 +81,26 @@ class ProductSearchParams(BaseModel):
     min_price: Optional[float] = Field(None, ge=0, description="Minimum price filter")
     max_price: Optional[float] = Field(None, ge=0, description="Maximum price filter")
     creator_name: Optional[str] = Field(None, description="Filter by creator name")
-    tags: Optional[str] = Field(None, description="Filter by tags (comma-separated)")
+    tags: Optional[str] = Field(
+        None, description="Filter by tags (comma-separated, any of them)"
+    )
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(10, ge=1, le=100, description="Number of items per page")
+    cursor: Optional[str] = Field(
+        None, description="next_cursor of the previous page (page is then ignored)"
+    )
+    include_total: Optional[bool] = Field(
+        None,
+        description="Count all matches (default: yes for page, no for cursor requests)",
+    )
     sort_by: Optional[str] = Field(
-        "created_at", description="Sort field: created_at, price, title"
+        "created_at", description="Sort field: created_at, price, title, relevance"
     )
     sort_order: Optional[str] = Field("desc", description="Sort order: asc or desc")
 
     @validator("sort_by")
     def validate_sort_by(cls, v):
-        allowed_fields = ["created_at", "price", "title", "category"]
+        allowed_fields = ["created_at", "price", "title", "category", "relevance"]
         if v not in allowed_fields:
             raise ValueError(f"sort_by must be one of: {allowed_fields}")
         return v
@@ -103,11 +112,18 @@ class ProductSearchParams(BaseModel):
         return v.lower()
 
 
+class TagFacet(BaseModel):
+    tag: str
+    count: int  # Matching products carrying the tag
+
+
 class ProductSearchResponse(BaseModel):
     products: List[ProductListResponse]
-    total: int
+    total: Optional[int]  # None when not counted (see include_total)
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page
+    tag_facets: List[TagFacet] = []  # Most common tags among all matches
@@ -2,25 +2,45 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from backend.models.product import Product
 from backend.models.purchase import Purchase
+from backend.models.sales_rollup import CreatorSalesDaily
 from backend.models.user import User
+from backend.services.sales_series import get_sales_series
 from datetime import datetime, timedelta
 
 
-def get_creator_stats(db: Session, creator_id: int):
-    """Get analytics/stats for a creator"""
-    # Get total sales and revenue
-    stats = (
+def _product_totals(db: Session, creator_id: int, active_only: bool = False):
+    """A creator's products with their all-time sales and revenue, from the
+    sales rollup (backend/services/sales_rollup.py)"""
+    totals = (
+        db.query(
+            CreatorSalesDaily.product_id,
+            func.sum(CreatorSalesDaily.sales_count).label("sales"),
+            func.sum(CreatorSalesDaily.revenue).label("revenue"),
+        )
+        .filter(CreatorSalesDaily.creator_id == creator_id)
+        .group_by(CreatorSalesDaily.product_id)
+        .subquery()
+    )
+    query = (
         db.query(
             Product.id,
             Product.title,
-            func.count(Purchase.id).label("sales"),
-            func.sum(Product.price).label("revenue"),
+            Product.is_active,
+            func.coalesce(totals.c.sales, 0).label("sales"),
+            func.coalesce(totals.c.revenue, 0.0).label("revenue"),
         )
-        .join(Purchase, Product.id == Purchase.product_id, isouter=True)
+        .outerjoin(totals, totals.c.product_id == Product.id)
         .filter(Product.creator_id == creator_id)
-        .group_by(Product.id, Product.title)
-        .all()
     )
+    if active_only:
+        query = query.filter(Product.is_active == True)
+    return query.order_by(Product.id).all()
+
+
+def get_creator_stats(db: Session, creator_id: int):
+    """Get analytics/stats for a creator"""
+    # Get total sales and revenue
+    stats = _product_totals(db, creator_id)
 
     # Calculate totals
     total_sales = sum(stat.sales for stat in stats)
@@ -43,35 +63,17 @@ def get_creator_stats(db: Session, creator_id: int):
 
 def get_creator_public_stats(db: Session, creator_id: int):
     """Get public analytics/stats for a creator (no revenue information)"""
-    # Get total products and sales count
-    total_products = (
-        db.query(Product)
-        .filter(Product.creator_id == creator_id, Product.is_active == True)
-        .count()
-    )
-
-    total_sales = (
-        db.query(Purchase)
-        .join(Product, Purchase.product_id == Product.id)
-        .filter(Product.creator_id == creator_id)
-        .count()
-    )
-
-    # Get products with sales count but no revenue
-    product_stats = (
-        db.query(Product.id, Product.title, func.count(Purchase.id).label("sales"))
-        .join(Purchase, Product.id == Purchase.product_id, isouter=True)
-        .filter(Product.creator_id == creator_id, Product.is_active == True)
-        .group_by(Product.id, Product.title)
-        .all()
-    )
+    # One pass over the creator's products: sales of retired products still
+    # count towards the total
+    stats = _product_totals(db, creator_id)
+    active = [stat for stat in stats if stat.is_active]
 
     return {
-        "total_products": total_products,
-        "total_sales": total_sales,
+        "total_products": len(active),
+        "total_sales": sum(stat.sales for stat in stats),
         "product_breakdown": [
             {"product_id": stat.id, "product_title": stat.title, "sales": stat.sales}
-            for stat in product_stats
+            for stat in active
         ],
     }
 
@@ -111,42 +113,28 @@ def get_recent_sales(db: Session, creator_id: int, limit: int = 10):
 
 def get_sales_analytics(db: Session, creator_id: int):
     """Get sales analytics for charts and insights"""
-    # Get sales over last 7 days
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=7)
-
-    daily_sales = (
-        db.query(
-            func.date(Purchase.created_at).label("sale_date"),
-            func.sum(Purchase.amount_paid).label("revenue"),
-            func.count(Purchase.id).label("sales_count"),
-        )
-        .join(Product, Purchase.product_id == Product.id)
-        .filter(
-            Product.creator_id == creator_id,
-            Purchase.created_at >= start_date,
-            Purchase.payment_status == "COMPLETED",
-        )
-        .group_by(func.date(Purchase.created_at))
-        .all()
-    )
+    # Sales over the last 7 days, one point per day (zero on days without)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    daily_sales = get_sales_series(
+        db,
+        creator_id,
+        "day",
+        start=today - timedelta(days=6),
+        end=today + timedelta(days=1),
+    )["buckets"]
 
     # Get top products by sales
-    top_products = (
-        db.query(Product.title, func.count(Purchase.id).label("sales"))
-        .join(Purchase, Product.id == Purchase.product_id, isouter=True)
-        .filter(Product.creator_id == creator_id, Product.is_active == True)
-        .group_by(Product.id, Product.title)
-        .order_by(desc("sales"))
-        .limit(5)
-        .all()
-    )
+    top_products = sorted(
+        _product_totals(db, creator_id, active_only=True),
+        key=lambda product: product.sales,
+        reverse=True,
+    )[:5]
 
     return {
         "daily_revenue": [
             {
-                "name": sale.sale_date.strftime("%b %d"),
-                "value": float(sale.revenue or 0),
+                "name": sale["start"].strftime("%b %d"),
+                "value": float(sale["revenue"]),
             }
             for sale in daily_sales
         ],
@@ -1,10 +1,7 @@
 from sqlalchemy.orm import Session
 from backend.models.user import User
-from backend.core.security import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
-)
+from backend.core.password_pool import password_pool
+from backend.core.security import create_access_token, password_needs_rehash
 from backend.core.config import settings
 from backend.schemas.auth import RegisterSchema, LoginSchema
 from fastapi import HTTPException, status
@@ -20,7 +17,7 @@ def create_user(db: Session, user_data: RegisterSchema, is_creator: bool = False
         )
 
     # Create new user with profile information
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = password_pool.hash(user_data.password)
     user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -62,12 +59,22 @@ def create_user(db: Session, user_data: RegisterSchema, is_creator: bool = False
 def authenticate_user(db: Session, email: str, password: str):
     """Authenticate user and return JWT token with expiration info"""
     user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not password_pool.verify(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
+    # BCRYPT_ROUNDS changed since this hash was made: upgrade it while we
+    # have the plain password
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = password_pool.hash(password)
+            db.commit()
+        except HTTPException:
+            # Pool busy; the hash is upgraded on a later login
+            pass
+
     access_token = create_access_token(
         data={"sub": str(user.id), "is_creator": user.is_creator}
     )
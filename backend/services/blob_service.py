@@ -0,0 +1,234 @@
+"""
+Reference counting and garbage collection for content-addressed blobs
+
+StorageService.store_stream puts every file at blobs/ab/cd/<sha256>, so
+identical uploads share one object. Each product that points at a blob
+(Product.file_url or Product.image_url) holds one reference on its
+FileBlob row; the counter is updated in the same transaction as the
+product. Products are only ever deactivated, never deleted or given a new
+file (buyers keep their downloads), so nothing drops a reference in the
+request path; if product rows are removed by hand, the recount below
+brings the counters back down.
+
+collect_orphan_blobs recounts references from the products table (the
+source of truth), then deletes blobs nobody references and abandoned tmp/
+uploads, once they are older than the grace period. The grace period
+covers uploads that are stored but whose product row is not committed yet.
+
+FileBlob also records size, mtime, MIME type and ETag at upload, so the
+download endpoints answer existence, validators and Content-Length from the
+database (get_file_metadata) instead of stat()ing a network volume.
+adopt_legacy_files moves files uploaded before this layout into it.
+"""
+
+import time
+from typing import Iterator, Optional
+from sqlalchemy import func, union_all, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+from backend.core.file_delivery import FileMetadata
+from backend.models.file_blob import FileBlob
+from backend.models.product import Product
+from backend.services.storage_service import (
+    storage_service,
+    StoredFile,
+    BLOB_PREFIX,
+    TEMP_PREFIX,
+)
+
+
+def add_blob_reference(db: Session, stored_file: StoredFile) -> None:
+    """Count one more reference to a stored blob (caller commits)"""
+    # Atomic increment, safe against concurrent uploads of the same content
+    updated = (
+        db.query(FileBlob)
+        .filter(FileBlob.sha256 == stored_file.sha256)
+        .update(
+            {FileBlob.ref_count: FileBlob.ref_count + 1}, synchronize_session=False
+        )
+    )
+    if updated:
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(
+                FileBlob(
+                    sha256=stored_file.sha256,
+                    storage_key=stored_file.file_path,
+                    size=stored_file.file_size,
+                    mime_type=stored_file.mime_type,
+                    etag=f'"{stored_file.sha256}"',
+                    modified_at=stored_file.modified_at,
+                    ref_count=1,
+                )
+            )
+    except IntegrityError:
+        # Another request registered the same blob first
+        db.query(FileBlob).filter(FileBlob.sha256 == stored_file.sha256).update(
+            {FileBlob.ref_count: FileBlob.ref_count + 1}, synchronize_session=False
+        )
+
+
+def file_metadata(blob: Optional[FileBlob]) -> Optional[FileMetadata]:
+    """Plain, cacheable copy of a blob's download metadata"""
+    if blob is None or blob.modified_at is None:
+        return None
+    return FileMetadata(blob.size, blob.modified_at, blob.etag, blob.mime_type)
+
+
+def get_file_metadata(db: Session, storage_key: str) -> Optional[FileMetadata]:
+    """Indexed metadata for a storage key, or None for unindexed files"""
+    blob = db.query(FileBlob).filter(FileBlob.storage_key == storage_key).first()
+    return file_metadata(blob)
+
+
+async def get_file_metadata_async(
+    db: AsyncSession, storage_key: str
+) -> Optional[FileMetadata]:
+    """get_file_metadata for async routes"""
+    result = await db.execute(
+        select(FileBlob).where(FileBlob.storage_key == storage_key)
+    )
+    return file_metadata(result.scalars().first())
+
+
+def _count_product_references(db: Session) -> dict:
+    """storage key -> number of product columns pointing at it"""
+    keys = union_all(
+        select(Product.file_url.label("key")).where(Product.file_url.isnot(None)),
+        select(Product.image_url.label("key")).where(Product.image_url.isnot(None)),
+    ).subquery()
+    rows = db.execute(select(keys.c.key, func.count()).group_by(keys.c.key))
+    return {key: count for key, count in rows}
+
+
+def collect_orphan_blobs(
+    db: Session, grace_hours: Optional[int] = None, dry_run: bool = False
+) -> dict:
+    """Recount references and delete unreferenced blobs and stale tmp/ uploads"""
+    if grace_hours is None:
+        grace_hours = settings.BLOB_GC_GRACE_HOURS
+    cutoff = time.time() - grace_hours * 3600
+    backend = storage_service.backend
+
+    # 1. Bring the stored counters back in line with the products table
+    references = _count_product_references(db)
+    corrected = 0
+    for blob in db.query(FileBlob).yield_per(1000):
+        actual = references.get(blob.storage_key, 0)
+        if blob.ref_count != actual:
+            blob.ref_count = actual
+            corrected += 1
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+
+    # 2. Delete blobs nothing points at any more
+    deleted_blobs = 0
+    freed_bytes = 0
+    for key, modified_at in backend.list_keys(BLOB_PREFIX):
+        if references.get(key) or modified_at > cutoff:
+            continue
+        stat = backend.stat(key)
+        freed_bytes += stat.size if stat else 0
+        deleted_blobs += 1
+        if not dry_run:
+            backend.delete(key)
+            db.query(FileBlob).filter(FileBlob.storage_key == key).delete(
+                synchronize_session=False
+            )
+            db.commit()
+
+    # 3. Delete uploads that never made it out of tmp/
+    deleted_temp = 0
+    for key, modified_at in backend.list_keys(TEMP_PREFIX):
+        if modified_at > cutoff:
+            continue
+        deleted_temp += 1
+        if not dry_run:
+            backend.delete(key)
+
+    action = "Would remove" if dry_run else "Removed"
+    print(
+        f"{action} {deleted_blobs} orphaned blob(s) ({freed_bytes} bytes) and "
+        f"{deleted_temp} stale temp upload(s); corrected {corrected} ref count(s)"
+    )
+    return {
+        "corrected_ref_counts": corrected,
+        "deleted_blobs": deleted_blobs,
+        "freed_bytes": freed_bytes,
+        "deleted_temp_uploads": deleted_temp,
+        "dry_run": dry_run,
+    }
+
+
+class _ChunkReader:
+    """File-like read(size) over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def adopt_legacy_files(db: Session, dry_run: bool = False) -> dict:
+    """Move files stored under per-upload names into the blob layout.
+
+    Each file is copied (and hashed) into blobs/, the product rows are
+    repointed and committed, and only then is the old object removed, so an
+    interrupted run leaves every product pointing at an existing file.
+    """
+    backend = storage_service.backend
+    references = _count_product_references(db)
+    legacy_keys = [key for key in references if not key.startswith(BLOB_PREFIX)]
+
+    adopted = 0
+    missing = 0
+    for key in legacy_keys:
+        if backend.stat(key) is None:
+            print(f"Skipping missing file: {key}")
+            missing += 1
+            continue
+        adopted += 1
+        if dry_run:
+            continue
+
+        filename = key.rsplit("/", 1)[-1]
+        stored = storage_service.store_stream(
+            _ChunkReader(backend.open_range(key)), filename
+        )
+
+        moved = 0
+        for column in (Product.file_url, Product.image_url):
+            moved += (
+                db.query(Product)
+                .filter(column == key)
+                .update({column: stored.file_path}, synchronize_session=False)
+            )
+        add_blob_reference(db, stored)
+        if moved > 1:
+            db.query(FileBlob).filter(FileBlob.sha256 == stored.sha256).update(
+                {FileBlob.ref_count: FileBlob.ref_count + moved - 1},
+                synchronize_session=False,
+            )
+        db.commit()
+        backend.delete(key)
+
+    action = "Would adopt" if dry_run else "Adopted"
+    print(f"{action} {adopted} legacy file(s); {missing} missing")
+    return {"adopted": adopted, "missing": missing, "dry_run": dry_run}
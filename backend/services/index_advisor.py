@@ -0,0 +1,205 @@
+"""
+Index advisor: EXPLAIN the app's hot queries and flag full table scans
+
+Each workload calls the real service functions (product search, creator
+dashboards, purchase checks, ...) against the configured database while
+every SELECT they send is captured. The captured statements are then run
+through the planner with their own parameters:
+
+- SQLite:     EXPLAIN QUERY PLAN; a "SCAN <table>" step that does not use an
+              index is flagged.
+- PostgreSQL: EXPLAIN (FORMAT JSON) with enable_seqscan off, so a Seq Scan
+              that is still chosen means no usable index exists (on small
+              tables the planner would otherwise prefer seq scans anyway).
+
+Platform-wide aggregates (admin stats) scan by design and are not part of
+the workloads. `python -m backend.manage index-advisor` exits non-zero when
+anything is flagged, so it can run as a regression check.
+"""
+
+import json
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from backend.models import purchase, user  # noqa: F401 (register every mapper)
+from backend.models.product import ProductCategory
+from backend.schemas.product import ProductSearchParams
+
+# Representative ids; the tables may be empty, plans are what matter
+USER_ID = 1
+PRODUCT_ID = 1
+
+
+class Finding(NamedTuple):
+    workload: str
+    table: str
+    statement: str
+    plan: str
+
+
+def _product_searches(db: Session) -> None:
+    from backend.services.product_service import (
+        _encode_cursor,
+        get_creator_products,
+        get_product_by_id,
+        search_products,
+    )
+
+    searches = [
+        ProductSearchParams(),
+        ProductSearchParams(category=ProductCategory.PHOTOGRAPHY),
+        ProductSearchParams(sort_by="price", sort_order="asc"),
+        ProductSearchParams(sort_by="title", sort_order="asc"),
+        ProductSearchParams(tags="photo,art"),
+        ProductSearchParams(query="photo presets", sort_by="relevance"),
+    ]
+    for params in searches:
+        search_products(db, params)
+
+    # Keyset pages continue from a cursor
+    for sort_by, value in (
+        ("created_at", datetime(2025, 1, 1).isoformat()),
+        ("price", 10.0),
+        ("title", "m"),
+    ):
+        params = ProductSearchParams(sort_by=sort_by)
+        params.cursor = _encode_cursor(params, k=[value, PRODUCT_ID])
+        search_products(db, params)
+
+    get_product_by_id(db, PRODUCT_ID)
+    get_creator_products(db, USER_ID)
+
+
+def _creator_dashboard(db: Session) -> None:
+    from backend.services.analytics import (
+        get_creator_public_stats,
+        get_creator_stats,
+        get_recent_sales,
+    )
+
+    get_creator_stats(db, USER_ID)
+    get_creator_public_stats(db, USER_ID)
+    get_recent_sales(db, USER_ID)
+
+
+def _purchases(db: Session) -> None:
+    from backend.services.purchase_service import PurchaseService
+
+    PurchaseService.has_purchased_product(db, USER_ID, PRODUCT_ID)
+    PurchaseService.get_user_purchases(db, USER_ID)
+    PurchaseService.get_purchase_stats(db, USER_ID)
+
+
+def _file_delivery(db: Session) -> None:
+    from backend.models.product import Product
+    from backend.services.blob_service import get_file_metadata
+
+    key = "blobs/00/00/" + "0" * 64
+    get_file_metadata(db, key)
+    # backend/api/files.py resolves the product behind a download link
+    db.query(Product).filter(Product.file_url == key).first()
+
+
+WORKLOADS: Dict[str, Callable[[Session], None]] = {
+    "product search": _product_searches,
+    "creator dashboard": _creator_dashboard,
+    "purchases": _purchases,
+    "file delivery": _file_delivery,
+}
+
+
+def _capture(engine: Engine, session: Session, workload) -> List[Tuple[str, object]]:
+    """SELECT statements (with parameters) a workload sends to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        workload(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        session.rollback()
+    return statements
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def _sqlite_scans(connection, statement, parameters) -> Tuple[List[str], str]:
+    rows = connection.exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    ).all()
+    plan = "\n".join(row[-1] for row in rows)
+    # "SCAN t USING INDEX ..." and virtual tables (FTS5) are fine
+    tables = [
+        match.group(1)
+        for match in (_SQLITE_SCAN.match(row[-1]) for row in rows)
+        if match
+    ]
+    return tables, plan
+
+
+def _postgres_scans(connection, statement, parameters) -> Tuple[List[str], str]:
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    (document,) = connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + statement, parameters
+    ).one()
+    if isinstance(document, str):
+        document = json.loads(document)
+
+    tables = []
+
+    def walk(node):
+        if node.get("Node Type") == "Seq Scan":
+            tables.append(node.get("Relation Name"))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(document[0]["Plan"])
+    return tables, json.dumps(document[0]["Plan"], indent=2)
+
+
+def run_index_advisor(engine: Engine, verbose: bool = False) -> List[Finding]:
+    """Replay every workload and return the full table scans found"""
+    if engine.dialect.name == "sqlite":
+        explain = _sqlite_scans
+    elif engine.dialect.name == "postgresql":
+        explain = _postgres_scans
+    else:
+        raise RuntimeError(f"Index advisor does not support {engine.dialect.name}")
+
+    findings = []
+    session = Session(bind=engine)
+    try:
+        for name, workload in WORKLOADS.items():
+            seen = set()
+            for statement, parameters in _capture(engine, session, workload):
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                with engine.connect() as connection:
+                    with connection.begin():
+                        tables, plan = explain(connection, statement, parameters)
+                if verbose:
+                    print(f"[{name}] {statement}\n{plan}\n")
+                findings.extend(
+                    Finding(name, table, statement, plan) for table in tables
+                )
+    finally:
+        session.close()
+
+    for finding in findings:
+        print(f"Full scan of {finding.table} in {finding.workload}:")
+        print(f"  {' '.join(finding.statement.split())}")
+        print("  " + finding.plan.replace("\n", "\n  "))
+    print(
+        f"Index advisor: {len(findings)} full table scan(s) "
+        f"in {len(WORKLOADS)} workload(s)"
+    )
+    return findings
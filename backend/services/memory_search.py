@@ -0,0 +1,474 @@
+"""
+In-process inverted index over active products (SEARCH_ENGINE=memory)
+
+A database-independent alternative to search_index.py. Text queries run
+entirely in process:
+
+- Postings: one pair of compact arrays per term, document slots (array 'I')
+  and field-weighted term frequencies (array 'H'). Slots are handed out in
+  increasing order, so appends keep every posting list sorted.
+- Scoring: BM25 (k1=1.2, b=0.75) over field-weighted term frequencies; the
+  rarest query term is scanned first and later terms only score documents
+  that are still candidates (every term must match).
+- Filters: category, price bucket, tag and creator bitmaps, plus the live
+  bitmap, are combined with integer AND/OR into a single mask per query.
+- Facets: tag counts over every match, from each slot's tag list.
+- Prefix matching: each query word also matches vocabulary terms starting
+  with it (bounded), like the FTS5/tsvector path.
+
+The index is built in a background thread at startup and kept current by
+commit hooks (backend/db/events.py): changed products are re-read by id
+after commit. Those hooks only see ORM commits made in this process, so
+the same thread rebuilds the index every SEARCH_MEMORY_REFRESH_SECONDS:
+changes from other workers, scripts, bulk or raw SQL show up within that
+interval plus one build. Updates and deletes leave tombstones in the postings (they
+drop out of the BM25 document count, lengths and term frequencies at
+once); once they make up a quarter of the slots the index is rebuilt in
+the background while the old one keeps serving. Until the first build finishes,
+search_products keeps using the database.
+"""
+
+import heapq
+import math
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from backend.core.config import settings
+from backend.db.events import on_commit
+from backend.models.product import Product, ProductCategory
+from backend.models.tag import parse_tags
+from backend.services.search_index import query_terms, text_terms
+
+# Field weights folded into the stored term frequency
+FIELD_WEIGHTS = (("title", 4), ("tags", 3), ("creator_name", 2), ("description", 1))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Vocabulary terms a single query word may expand to by prefix
+MAX_PREFIX_EXPANSIONS = 64
+
+# Upper bounds of the price buckets (last bucket is open-ended)
+PRICE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+COMPACT_RATIO = 0.25
+BUILD_BATCH_SIZE = 5000
+
+
+def normalize_text(value: str) -> str:
+    """Lower-case and strip accents ("Café" -> "cafe")"""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _set_bit(bitmap: bytearray, slot: int) -> None:
+    index = slot >> 3
+    if index >= len(bitmap):
+        bitmap.extend(bytes(index - len(bitmap) + 1024))
+    bitmap[index] |= 1 << (slot & 7)
+
+
+def _clear_bit(bitmap: bytearray, slot: int) -> None:
+    index = slot >> 3
+    if index < len(bitmap):
+        bitmap[index] &= ~(1 << (slot & 7)) & 0xFF
+
+
+def _as_int(bitmap: bytearray) -> int:
+    return int.from_bytes(bitmap, "little")
+
+
+def _price_bucket(price: float) -> int:
+    return bisect_right(PRICE_BUCKETS, price)
+
+
+class SearchResult(NamedTuple):
+    total: int
+    product_ids: List[int]  # The requested page, in order
+    tag_facets: List[Tuple[str, int]]  # (tag, matching products), most common first
+
+
+class InMemorySearchIndex:
+    """BM25 inverted index with bitmap filters (see module docstring)"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ready = False
+        self._building = False
+        self._pending: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        # Live documents per term (postings also hold tombstoned slots)
+        self._doc_frequency: Dict[str, int] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+        # Per-slot columns
+        self._product_ids = array("I")
+        self._lengths = array("I")
+        self._prices = array("d")
+        self._created = array("d")
+        self._titles: List[str] = []
+        self._category_values: List[str] = []
+        self._slot_tags: List[Tuple[str, ...]] = []
+        self._slot_terms: List[Tuple[str, ...]] = []
+
+        self._slot_of: Dict[int, int] = {}
+        self._live = bytearray()
+        self._live_count = 0
+        self._total_length = 0
+
+        self._categories: Dict[str, bytearray] = {}
+        self._price_buckets: Dict[int, bytearray] = {}
+        self._tags: Dict[str, bytearray] = {}
+        self._creators: Dict[str, bytearray] = {}
+
+    # -- building and maintenance ---------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, session_factory) -> None:
+        """Build now, then rebuild periodically in a background thread (once
+        per worker; searches use the database until the first build is done)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(session_factory,),
+            name="memory-search-refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, session_factory) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                # A compaction rebuild already in flight counts as this one
+                busy, self._building = self._building, True
+            if not busy:
+                try:
+                    self.build(session_factory)
+                except Exception as e:
+                    print(f"In-memory search index build failed: {e}")
+            if settings.SEARCH_MEMORY_REFRESH_SECONDS <= 0:
+                return
+            self._stop.wait(settings.SEARCH_MEMORY_REFRESH_SECONDS)
+
+    def start_build(self, session_factory) -> None:
+        """Build in a background thread (searches use the old state meanwhile)"""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(
+            target=self.build,
+            args=(session_factory,),
+            name="memory-search-build",
+            daemon=True,
+        ).start()
+
+    def build(self, session_factory) -> None:
+        """(Re)build from all active products, then apply changes made meanwhile"""
+        started = time.perf_counter()
+        with self._lock:
+            self._building = True
+        try:
+            fresh = InMemorySearchIndex()
+            db = session_factory()
+            try:
+                rows = (
+                    db.query(Product)
+                    .filter(Product.is_active == True)
+                    .order_by(Product.id)
+                    .yield_per(BUILD_BATCH_SIZE)
+                )
+                for product in rows:
+                    fresh._add(product)
+            finally:
+                db.close()
+
+            with self._lock:
+                for name in _INDEX_STATE:
+                    setattr(self, name, getattr(fresh, name))
+                self.ready = True
+        finally:
+            with self._lock:
+                self._building = False
+                pending, self._pending = self._pending, set()
+
+        if pending:
+            self.refresh(session_factory, pending, set())
+        print(
+            f"Built in-memory search index: {self._live_count} products in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+    def refresh(self, session_factory, upserted: Iterable[int], deleted: Iterable[int]):
+        """Re-read changed products by id and update their postings"""
+        upserted, deleted = set(upserted), set(deleted)
+        with self._lock:
+            if self._building:
+                # The build may have read these already; re-read them after it
+                self._pending |= upserted | deleted
+                return
+            if not self.ready:
+                # The first build has not started; it will read them anyway
+                return
+
+        products = []
+        if upserted:
+            db = session_factory()
+            try:
+                products = db.query(Product).filter(Product.id.in_(upserted)).all()
+            finally:
+                db.close()
+
+        with self._lock:
+            for product_id in deleted:
+                self._remove(product_id)
+            for product in products:
+                self._remove(product.id)
+                if product.is_active:
+                    self._add(product)
+            tombstones = len(self._product_ids) - self._live_count
+
+        if tombstones > COMPACT_RATIO * len(self._product_ids):
+            self.start_build(session_factory)
+
+    def _add(self, product: Product) -> None:
+        slot = len(self._product_ids)
+        frequencies: Dict[str, int] = {}
+        length = 0
+        for field, weight in FIELD_WEIGHTS:
+            value = getattr(product, field)
+            if not value:
+                continue
+            for term in text_terms(normalize_text(value)):
+                frequencies[term] = frequencies.get(term, 0) + weight
+                length += weight
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("H"))
+                self._vocabulary_dirty = True
+            postings[0].append(slot)
+            postings[1].append(min(frequency, 0xFFFF))
+            self._doc_frequency[term] = self._doc_frequency.get(term, 0) + 1
+        self._slot_terms.append(tuple(frequencies))
+
+        created = product.created_at.timestamp() if product.created_at else 0.0
+        self._product_ids.append(product.id)
+        self._lengths.append(length)
+        self._prices.append(product.price or 0.0)
+        self._created.append(created)
+        self._titles.append((product.title or "").lower())
+        self._category_values.append(product.category.value if product.category else "")
+
+        self._slot_of[product.id] = slot
+        _set_bit(self._live, slot)
+        self._live_count += 1
+        self._total_length += length
+
+        category = self._category_values[slot]
+        _set_bit(self._categories.setdefault(category, bytearray()), slot)
+        bucket = _price_bucket(product.price or 0.0)
+        _set_bit(self._price_buckets.setdefault(bucket, bytearray()), slot)
+        tags = tuple(normalize_text(tag) for tag in parse_tags(product.tags))
+        self._slot_tags.append(tags)
+        for tag in tags:
+            _set_bit(self._tags.setdefault(tag, bytearray()), slot)
+        creator = normalize_text(product.creator_name or "")
+        _set_bit(self._creators.setdefault(creator, bytearray()), slot)
+
+    def _remove(self, product_id: int) -> None:
+        slot = self._slot_of.pop(product_id, None)
+        if slot is None:
+            return
+        # Postings keep the slot as a tombstone until the next compaction
+        _clear_bit(self._live, slot)
+        self._live_count -= 1
+        self._total_length -= self._lengths[slot]
+        # Keep BM25 statistics to live documents, like the count and length
+        for term in self._slot_terms[slot]:
+            self._doc_frequency[term] -= 1
+
+    # -- querying ---------------------------------------------------------
+
+    def _expand(self, term: str) -> List[str]:
+        """The term itself plus vocabulary terms it is a prefix of"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, term)
+        expansions = []
+        for candidate in self._vocabulary[start : start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            expansions.append(candidate)
+        return expansions
+
+    def _filter_mask(
+        self,
+        category: Optional[ProductCategory],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        tags: Optional[str],
+        creator_name: Optional[str],
+    ) -> bytes:
+        mask = _as_int(self._live)
+
+        if category is not None:
+            mask &= _as_int(self._categories.get(category.value, bytearray()))
+
+        if min_price is not None or max_price is not None:
+            low = _price_bucket(min_price) if min_price is not None else 0
+            high = _price_bucket(max_price) if max_price is not None else len(PRICE_BUCKETS)
+            buckets = 0
+            for bucket in range(low, high + 1):
+                buckets |= _as_int(self._price_buckets.get(bucket, bytearray()))
+            mask &= buckets
+
+        if tags:
+            wanted = 0
+            for tag in parse_tags(tags):
+                wanted |= _as_int(self._tags.get(normalize_text(tag), bytearray()))
+            mask &= wanted
+
+        if creator_name:
+            needle = normalize_text(creator_name)
+            creators = 0
+            for name, bitmap in self._creators.items():
+                if needle in name:
+                    creators |= _as_int(bitmap)
+            mask &= creators
+
+        return mask.to_bytes((len(self._product_ids) + 7) // 8 or 1, "little")
+
+    def search(
+        self,
+        query_text: str,
+        category: Optional[ProductCategory] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        tags: Optional[str] = None,
+        creator_name: Optional[str] = None,
+        sort_by: str = "relevance",
+        sort_order: str = "desc",
+        offset: int = 0,
+        limit: int = 10,
+        facet_limit: int = 0,
+    ) -> "SearchResult":
+        """Total matches, product ids of the requested page and top tag counts"""
+        terms = query_terms(normalize_text(query_text))
+        with self._lock:
+            if not terms or not self._live_count:
+                return SearchResult(0, [], [])
+
+            groups = [self._expand(term) for term in terms]
+            if not all(groups):
+                return SearchResult(0, [], [])
+
+            mask = self._filter_mask(category, min_price, max_price, tags, creator_name)
+            check_price = min_price is not None or max_price is not None
+            low = min_price if min_price is not None else float("-inf")
+            high = max_price if max_price is not None else float("inf")
+
+            document_count = self._live_count
+            average_length = self._total_length / document_count or 1.0
+            lengths, prices = self._lengths, self._prices
+
+            # Rarest word first, so later words only touch surviving candidates
+            groups.sort(key=lambda group: sum(len(self._postings[t][0]) for t in group))
+            scores: Optional[Dict[int, float]] = None
+            for group in groups:
+                group_scores: Dict[int, float] = {}
+                for term in group:
+                    slots, frequencies = self._postings[term]
+                    frequency_of_docs = self._doc_frequency[term]
+                    idf = math.log(
+                        1 + (document_count - frequency_of_docs + 0.5) / (frequency_of_docs + 0.5)
+                    )
+                    for slot, frequency in zip(slots, frequencies):
+                        if scores is not None and slot not in scores:
+                            continue
+                        if not mask[slot >> 3] >> (slot & 7) & 1:
+                            continue
+                        if check_price and not low <= prices[slot] <= high:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[slot] / average_length)
+                        group_scores[slot] = group_scores.get(slot, 0.0) + idf * frequency * (
+                            BM25_K1 + 1
+                        ) / (frequency + norm)
+
+                if scores is None:
+                    scores = group_scores
+                else:
+                    scores = {slot: scores[slot] + s for slot, s in group_scores.items()}
+                if not scores:
+                    return SearchResult(0, [], [])
+
+            # Partial sort: only the rows up to the requested page are ordered
+            created = self._created
+            wanted = offset + limit
+            if sort_by == "relevance":
+                ordered = heapq.nsmallest(
+                    wanted, scores, key=lambda s: (-scores[s], -created[s])
+                )
+            else:
+                column = {
+                    "created_at": created,
+                    "price": self._prices,
+                    "title": self._titles,
+                    "category": self._category_values,
+                }.get(sort_by, created)
+                select = heapq.nlargest if sort_order == "desc" else heapq.nsmallest
+                ordered = select(wanted, scores, key=column.__getitem__)
+
+            tag_facets = []
+            if facet_limit > 0:
+                slot_tags = self._slot_tags
+                counts = Counter(chain.from_iterable(slot_tags[s] for s in scores))
+                tag_facets = heapq.nsmallest(
+                    facet_limit, counts.items(), key=lambda item: (-item[1], item[0])
+                )
+
+            product_ids = self._product_ids
+            return SearchResult(
+                len(scores), [product_ids[s] for s in ordered[offset:]], tag_facets
+            )
+
+
+# Everything _reset() creates, swapped in as a whole after a rebuild
+_INDEX_STATE = tuple(
+    name
+    for name in vars(InMemorySearchIndex())
+    if name not in ("_lock", "ready", "_building", "_pending", "_stop", "_thread")
+)
+
+memory_search_index = InMemorySearchIndex()
+
+
+def _on_product_commit(upserted, deleted):
+    from backend.db.base import SessionLocal
+
+    memory_search_index.refresh(SessionLocal, upserted, deleted)
+
+
+if settings.SEARCH_ENGINE == "memory":
+    on_commit(Product, _on_product_commit)
@@ -2,100 +2,128 @@
 Product statistics and analytics service
 """
 
+import heapq
+import time
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from backend.models.product import Product, ProductCategory
-from backend.models.purchase import Purchase
+from backend.models.sales_rollup import CreatorSalesDaily
 from backend.models.user import User
-from typing import Dict, List, Any
-
-
-def get_platform_stats(db: Session) -> Dict[str, Any]:
-    """Get overall platform statistics"""
-    total_products = db.query(Product).filter(Product.is_active == True).count()
-    total_creators = db.query(User).filter(User.is_creator == True).count()
-    total_buyers = db.query(User).filter(User.is_creator == False).count()
-    total_purchases = db.query(Purchase).count()
-
-    # Calculate total revenue
-    total_revenue = (
-        db.query(func.sum(Product.price))
-        .join(Purchase, Product.id == Purchase.product_id)
-        .scalar()
-        or 0
-    )
+from typing import Dict, List, Any, NamedTuple
+
+# Most purchased products kept in the snapshot (the /platform/popular limit)
+POPULAR_PRODUCTS_KEPT = 50
 
-    return {
-        "total_products": total_products,
-        "total_creators": total_creators,
-        "total_buyers": total_buyers,
-        "total_purchases": total_purchases,
-        "total_revenue": round(total_revenue, 2),
-        "average_product_price": round(
-            db.query(func.avg(Product.price)).filter(Product.is_active == True).scalar()
-            or 0,
-            2,
-        ),
-    }
 
+class PlatformSnapshot(NamedTuple):
+    """Every platform-wide metric, computed together (platform_snapshot.py)"""
 
-def get_popular_products(db: Session, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get most popular products by purchase count"""
-    popular = (
+    stats: Dict[str, Any]
+    categories: List[Dict[str, Any]]
+    popular: List[Dict[str, Any]]  # Most purchased first, POPULAR_PRODUCTS_KEPT
+    computed_at: float  # time.time()
+
+
+def compute_platform_snapshot(db: Session) -> PlatformSnapshot:
+    """Platform stats, category stats and popular products in one pass over
+    the products and the sales rollup (two queries, instead of a count or a
+    purchases join per metric)"""
+    computed_at = time.time()
+    creators = buyers = 0
+    for is_creator, count in db.query(User.is_creator, func.count(User.id)).group_by(
+        User.is_creator
+    ):
+        if is_creator:
+            creators += count
+        else:
+            buyers += count
+
+    sales = (
+        db.query(
+            CreatorSalesDaily.product_id,
+            func.sum(CreatorSalesDaily.sales_count).label("sales"),
+            func.sum(CreatorSalesDaily.revenue).label("revenue"),
+        )
+        .group_by(CreatorSalesDaily.product_id)
+        .subquery()
+    )
+    products = (
         db.query(
             Product.id,
             Product.title,
             Product.creator_name,
             Product.price,
             Product.category,
-            func.count(Purchase.id).label("purchase_count"),
+            Product.is_active,
+            func.coalesce(sales.c.sales, 0).label("sales"),
+            func.coalesce(sales.c.revenue, 0.0).label("revenue"),
         )
-        .join(Purchase, Product.id == Purchase.product_id)
-        .filter(Product.is_active == True)
-        .group_by(Product.id)
-        .order_by(desc("purchase_count"))
-        .limit(limit)
-        .all()
+        .outerjoin(sales, sales.c.product_id == Product.id)
+        .yield_per(1000)
     )
 
-    return [
-        {
-            "id": p.id,
-            "title": p.title,
-            "creator_name": p.creator_name,
-            "price": p.price,
-            "category": p.category.value,
-            "purchase_count": p.purchase_count,
-        }
-        for p in popular
-    ]
-
-
-def get_category_stats(db: Session) -> List[Dict[str, Any]]:
-    """Get statistics by product category"""
-    stats = (
-        db.query(
-            Product.category,
-            func.count(Product.id).label("product_count"),
-            func.count(Purchase.id).label("total_sales"),
-            func.sum(Product.price).label("total_revenue"),
+    active_products = total_purchases = 0
+    total_revenue = active_price_total = 0.0
+    categories: Dict[ProductCategory, Dict[str, Any]] = {}
+    popular = []
+    for product in products:
+        total_purchases += product.sales
+        total_revenue += product.revenue
+        if not product.is_active:
+            continue
+        active_products += 1
+        active_price_total += product.price or 0
+        category = categories.setdefault(
+            product.category,
+            {"product_count": 0, "total_sales": 0, "total_revenue": 0.0},
         )
-        .outerjoin(Purchase, Product.id == Purchase.product_id)
-        .filter(Product.is_active == True)
-        .group_by(Product.category)
-        .all()
+        category["product_count"] += 1
+        category["total_sales"] += product.sales
+        category["total_revenue"] += product.revenue
+        if product.sales:
+            item = (product.sales, -product.id, product)
+            if len(popular) < POPULAR_PRODUCTS_KEPT:
+                heapq.heappush(popular, item)
+            else:
+                heapq.heappushpop(popular, item)
+
+    stats = {
+        "total_products": active_products,
+        "total_creators": creators,
+        "total_buyers": buyers,
+        "total_purchases": total_purchases,
+        "total_revenue": round(total_revenue, 2),
+        "average_product_price": round(
+            active_price_total / active_products if active_products else 0, 2
+        ),
+    }
+    return PlatformSnapshot(
+        stats=stats,
+        categories=[
+            {
+                "category": category.value,
+                "product_count": values["product_count"],
+                "total_sales": values["total_sales"],
+                "total_revenue": round(values["total_revenue"], 2),
+            }
+            for category, values in sorted(
+                categories.items(), key=lambda item: item[0].value
+            )
+        ],
+        popular=[
+            {
+                "id": p.id,
+                "title": p.title,
+                "creator_name": p.creator_name,
+                "price": p.price,
+                "category": p.category.value,
+                "purchase_count": p.sales,
+            }
+            for _, _, p in sorted(popular, key=lambda item: item[:2], reverse=True)
+        ],
+        computed_at=computed_at,
     )
 
-    return [
-        {
-            "category": stat.category.value,
-            "product_count": stat.product_count,
-            "total_sales": stat.total_sales or 0,
-            "total_revenue": round(stat.total_revenue or 0, 2),
-        }
-        for stat in stats
-    ]
-
 
 def get_recent_products(db: Session, limit: int = 10) -> List[Product]:
     """Get recently added products"""
@@ -0,0 +1,132 @@
+"""
+Platform statistics served from an in-memory snapshot
+
+The public /platform endpoints used to run their aggregate queries on
+every hit. They now read a PlatformSnapshot (compute_platform_snapshot in
+platform_analytics.py) kept per worker process:
+
+- a background thread recomputes it every PLATFORM_SNAPSHOT_REFRESH_SECONDS,
+  and PLATFORM_SNAPSHOT_DEBOUNCE_SECONDS after a product, user or completed
+  purchase commit (a burst of changes is one recompute)
+- refreshes are single-flight: one thread computes, concurrent requests
+  wait for that result instead of starting their own
+- no request is served a snapshot older than
+  PLATFORM_SNAPSHOT_MAX_AGE_SECONDS; if the background thread is not
+  running or has fallen behind, the request recomputes (single-flight). If
+  that fails, the previous snapshot is served rather than an error.
+
+Without the background thread (scripts, or an app started without its
+lifespan) a change makes the next request recompute.
+"""
+
+import threading
+import time
+from typing import Optional
+from backend.core.config import settings
+from backend.db.base import SessionLocal
+from backend.db.events import on_commit
+from backend.db.replicas import replica_set
+from backend.models.product import Product
+from backend.models.user import User
+from backend.services.platform_analytics import (
+    PlatformSnapshot,
+    compute_platform_snapshot,
+)
+
+
+class PlatformSnapshotService:
+    def __init__(self):
+        self._snapshot: Optional[PlatformSnapshot] = None
+        # Held while computing: the single flight
+        self._refresh_lock = threading.Lock()
+        self._stale = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get(self) -> PlatformSnapshot:
+        """The current snapshot, recomputed first if it is past the bound"""
+        if self._fresh(self._snapshot):
+            return self._snapshot
+        try:
+            return self.refresh(only_if_stale=True)
+        except Exception as e:
+            if self._snapshot is None:
+                raise
+            print(f"Platform snapshot refresh failed, serving the previous one: {e}")
+            return self._snapshot
+
+    def _fresh(self, snapshot: Optional[PlatformSnapshot]) -> bool:
+        if snapshot is None:
+            return False
+        if self._stale and not self.running:
+            return False
+        return time.time() - snapshot.computed_at <= (
+            settings.PLATFORM_SNAPSHOT_MAX_AGE_SECONDS
+        )
+
+    def refresh(self, only_if_stale: bool = False) -> PlatformSnapshot:
+        """Recompute the snapshot; callers arriving during a refresh wait for
+        it and (with only_if_stale) use its result"""
+        with self._refresh_lock:
+            if only_if_stale and self._fresh(self._snapshot):
+                return self._snapshot
+            # Changes committed from here on mark the new snapshot stale again
+            self._stale = False
+            replica = replica_set.choose(None)
+            db = (replica.SessionLocal if replica else SessionLocal)()
+            try:
+                self._snapshot = compute_platform_snapshot(db)
+            except Exception:
+                self._stale = True
+                raise
+            finally:
+                db.close()
+            self.refreshes += 1
+            return self._snapshot
+
+    def mark_stale(self) -> None:
+        """Platform data changed: refresh soon"""
+        self._stale = True
+        self._wake.set()
+
+    def start(self) -> None:
+        """Start the background refresh thread (once per worker)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="platform-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Platform snapshot refresh failed: {e}")
+            if self._wake.wait(settings.PLATFORM_SNAPSHOT_REFRESH_SECONDS):
+                self._wake.clear()
+                # Let a burst of changes settle into one recompute
+                self._stop.wait(settings.PLATFORM_SNAPSHOT_DEBOUNCE_SECONDS)
+
+
+platform_snapshot = PlatformSnapshotService()
+
+
+def _on_platform_commit(upserted, deleted):
+    platform_snapshot.mark_stale()
+
+
+on_commit(Product, _on_platform_commit)
+on_commit(User, _on_platform_commit)
@@ -1,17 +1,27 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, desc, asc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, asc, select, and_, or_, tuple_
 from backend.models.product import Product, ProductCategory
 from backend.models.purchase import Purchase
+from backend.models.tag import Tag, product_tags, parse_tags
 from backend.schemas.product import (
     ProductCreate,
     ProductSearchParams,
     ProductSearchResponse,
+    TagFacet,
 )
-from backend.services.storage_service import storage_service
+from backend.services.storage_service import storage_service, StoredFile
+from backend.services.blob_service import add_blob_reference
+from backend.services.search_index import search_index
+from backend.services.memory_search import memory_search_index
 from backend.core.config import settings
-from fastapi import UploadFile
-from typing import Optional
+from fastapi import HTTPException, UploadFile
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+import base64
+import json
 import math
+import anyio
 
 
 def create_product(
@@ -23,14 +33,25 @@ def create_product(
 ):
     """Create a new product with file upload"""
     # Upload main file to storage (use product-files bucket)
-    file_url, file_size, file_type = storage_service.upload_file(
-        file, file_type="product"
+    stored_file = storage_service.stream_upload(file, file_type="product")
+
+    return create_product_from_stored_file(
+        db, product_data, stored_file, creator_id, image_file
     )
 
+
+def create_product_from_stored_file(
+    db: Session,
+    product_data: ProductCreate,
+    stored_file: StoredFile,
+    creator_id: int,
+    image_file: UploadFile = None,
+):
+    """Create a new product for a file that is already in storage"""
     # Upload image if provided (use product-images bucket)
-    image_url = None
+    stored_image = None
     if image_file:
-        image_url, _, _ = storage_service.upload_file(
+        stored_image = storage_service.stream_upload(
             image_file, file_type="image", validate=False
         )  # Skip validation for images
 
@@ -42,13 +63,19 @@ def create_product(
         category=product_data.category,
         tags=product_data.tags,
         creator_name=product_data.creator_name,
-        file_url=file_url,
-        image_url=image_url,
-        file_size=file_size,
-        file_type=file_type,
+        file_url=stored_file.file_path,
+        image_url=stored_image.file_path if stored_image else None,
+        file_size=stored_file.file_size,
+        file_type=stored_file.file_type,
         creator_id=creator_id,
     )
     db.add(product)
+
+    # Identical uploads share one blob; count this product's references to it
+    add_blob_reference(db, stored_file)
+    if stored_image:
+        add_blob_reference(db, stored_image)
+
     db.commit()
     db.refresh(product)
     return product
@@ -65,19 +92,17 @@ def get_creator_products(db: Session, creator_id: int):
 
 def search_products(db: Session, params: ProductSearchParams) -> ProductSearchResponse:
     """Search and filter products with pagination"""
+    if _use_memory_index(params):
+        offset = _memory_offset(params)
+        result = _memory_search(params, offset)
+        return _memory_search_response(db, params, offset, result)
+
     query = db.query(Product).filter(Product.is_active == True)
 
-    # Apply search filters
+    # Apply search filters (full-text index, see search_index.py)
+    rank = None
     if params.query:
-        search_term = f"%{params.query.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Product.title).like(search_term),
-                func.lower(Product.description).like(search_term),
-                func.lower(Product.tags).like(search_term),
-                func.lower(Product.creator_name).like(search_term),
-            )
-        )
+        query, rank = search_index.apply(query, params.query)
 
     if params.category:
         query = query.filter(Product.category == params.category)
@@ -93,30 +118,304 @@ def search_products(db: Session, params: ProductSearchParams) -> ProductSearchRe
             func.lower(Product.creator_name).like(f"%{params.creator_name.lower()}%")
         )
 
-    if params.tags:
-        # Search for any of the provided tags
-        tag_list = [tag.strip().lower() for tag in params.tags.split(",")]
-        tag_conditions = [func.lower(Product.tags).like(f"%{tag}%") for tag in tag_list]
-        query = query.filter(or_(*tag_conditions))
+    tag_names = parse_tags(params.tags)
+    if tag_names:
+        # Products carrying any of the tags, via the tag name and
+        # (tag_id, product_id) indexes; whole tags only
+        tagged = (
+            select(product_tags.c.product_id)
+            .join(Tag, Tag.id == product_tags.c.tag_id)
+            .where(Tag.name.in_(tag_names))
+        )
+        query = query.filter(Product.id.in_(tagged))
+
+    # Sort on (sort column, id) so every row has a unique position
+    sort_keys = _sort_keys(params, rank)
+    query = query.order_by(
+        *[desc(key.expr) if key.descending else asc(key.expr) for key in sort_keys]
+    )
+
+    # Counting costs as much as the search itself; cursor requests (infinite
+    # scroll) skip it unless asked
+    total = None
+    tag_facets = []
+    if _include_total(params):
+        total = query.order_by(None).count()
+        tag_facets = _tag_facets(db, query)
+
+    if params.cursor:
+        # Keyset: continue after the last row of the previous page, O(page_size)
+        values = _key_values(_read_cursor(params, "k"), sort_keys)
+        query = query.filter(_after_position(sort_keys, values))
+    else:
+        query = query.offset((params.page - 1) * params.page_size)
+
+    if rank is not None:
+        query = query.add_columns(rank)
+    rows = query.limit(params.page_size + 1).all()
+    has_next = len(rows) > params.page_size
+    rows = rows[: params.page_size]
+    if rank is not None:
+        products, ranks = [row[0] for row in rows], [row[1] for row in rows]
+    else:
+        products, ranks = rows, [None] * len(rows)
+
+    next_cursor = None
+    if has_next:
+        next_cursor = _encode_cursor(
+            params, k=[key.value(products[-1], ranks[-1]) for key in sort_keys]
+        )
+
+    return _search_response(
+        products, total, params, tag_facets, has_next=has_next, next_cursor=next_cursor
+    )
+
+
+class _SortKey(NamedTuple):
+    expr: object
+    descending: bool
+    value: Callable  # (product, rank) -> JSON value for the cursor
+    parse: Callable  # JSON value from a cursor -> bind parameter
+
+
+def _same(value):
+    return value
+
 
-    # Apply sorting
-    sort_column = getattr(Product, params.sort_by)
-    if params.sort_order == "desc":
-        query = query.order_by(desc(sort_column))
+def _column_key(name: str, descending: bool) -> _SortKey:
+    if name == "created_at":
+        encode, parse = datetime.isoformat, datetime.fromisoformat
+    elif name == "category":
+        encode, parse = (lambda category: category.name), ProductCategory.__getitem__
     else:
-        query = query.order_by(asc(sort_column))
+        encode, parse = _same, _same
+
+    def value(product, rank):
+        current = getattr(product, name)
+        return None if current is None else encode(current)
+
+    return _SortKey(getattr(Product, name), descending, value, parse)
+
+
+def _sort_keys(params: ProductSearchParams, rank) -> List[_SortKey]:
+    """ORDER BY keys for a search, ending with Product.id as the tie-breaker"""
+    if params.sort_by == "relevance":
+        # Best match first; newest first without a text query
+        keys = [_column_key("created_at", True), _column_key("id", True)]
+        if rank is not None:
+            keys.insert(0, _SortKey(rank, False, lambda product, rank: rank, _same))
+        return keys
+
+    descending = params.sort_order == "desc"
+    return [_column_key(params.sort_by, descending), _column_key("id", descending)]
+
+
+def _after_position(sort_keys: List[_SortKey], values: list):
+    """WHERE clause for rows that sort after the given key values"""
+    exprs = [key.expr for key in sort_keys]
+    directions = {key.descending for key in sort_keys}
+    if len(directions) == 1:
+        # Row-value comparison, answered by a (column, id) index range scan
+        if directions.pop():
+            return tuple_(*exprs) < tuple(values)
+        return tuple_(*exprs) > tuple(values)
+
+    # Mixed directions: (a > x) OR (a = x AND b < y) OR ...
+    alternatives = []
+    for i, key in enumerate(sort_keys):
+        ties = [expr == value for expr, value in zip(exprs[:i], values)]
+        after = key.expr < values[i] if key.descending else key.expr > values[i]
+        alternatives.append(and_(*ties, after))
+    return or_(*alternatives)
+
 
-    # Get total count before pagination
-    total = query.count()
+def _encode_cursor(params: ProductSearchParams, **position) -> str:
+    """Opaque cursor: the sort it belongs to plus a position within it.
 
-    # Apply pagination
-    offset = (params.page - 1) * params.page_size
-    products = query.offset(offset).limit(params.page_size).all()
+    Database searches store the last row's key values (k); the in-memory
+    index stores an offset (n).
+    """
+    payload = {"s": params.sort_by, "o": params.sort_order, **position}
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
 
-    # Calculate pagination metadata
-    total_pages = math.ceil(total / params.page_size)
-    has_next = params.page < total_pages
-    has_prev = params.page > 1
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _read_cursor(params: ProductSearchParams, field: str):
+    """Position stored in params.cursor; 400 if malformed or for another sort"""
+    try:
+        data = base64.urlsafe_b64decode(params.cursor + "=" * (-len(params.cursor) % 4))
+        payload = json.loads(data)
+        if payload["s"] == params.sort_by and payload["o"] == params.sort_order:
+            return payload[field]
+    except (ValueError, KeyError, TypeError):
+        pass
+    raise _invalid_cursor()
+
+
+def _key_values(values, sort_keys: List[_SortKey]) -> list:
+    if not isinstance(values, list) or len(values) != len(sort_keys) or None in values:
+        raise _invalid_cursor()
+    try:
+        return [key.parse(value) for key, value in zip(sort_keys, values)]
+    except (ValueError, KeyError, TypeError):
+        raise _invalid_cursor()
+
+
+def _include_total(params: ProductSearchParams) -> bool:
+    if params.include_total is not None:
+        return params.include_total
+    return not params.cursor
+
+
+def _tag_facets(db: Session, query) -> List[TagFacet]:
+    """Most common tags among all products the search query matches"""
+    if settings.SEARCH_TAG_FACETS <= 0:
+        return []
+    matching = query.with_entities(Product.id).order_by(None).subquery()
+    rows = (
+        db.query(Tag.name, func.count().label("count"))
+        .join(product_tags, product_tags.c.tag_id == Tag.id)
+        .filter(product_tags.c.product_id.in_(select(matching.c.id)))
+        .group_by(Tag.name)
+        .order_by(desc("count"), Tag.name)
+        .limit(settings.SEARCH_TAG_FACETS)
+        .all()
+    )
+    return [TagFacet(tag=name, count=count) for name, count in rows]
+
+
+async def search_products_async(
+    db: AsyncSession, params: ProductSearchParams
+) -> ProductSearchResponse:
+    """search_products for async routes
+
+    The query building is shared with search_products and runs on the async
+    connection (no thread is held while the database works). Ranking in the
+    in-process index is CPU work and runs in a worker thread instead of
+    blocking the event loop.
+    """
+    if _use_memory_index(params):
+        offset = _memory_offset(params)
+        result = await anyio.to_thread.run_sync(_memory_search, params, offset)
+        return await db.run_sync(_memory_search_response, params, offset, result)
+    return await db.run_sync(search_products, params)
+
+
+def check_cursor_pagination(db: Session, page_size: int = 10) -> List[str]:
+    """Follow next_cursor through the active catalog in every sort order
+
+    Returns one message per sort that repeats or skips products; an empty
+    list means each listing visits every product exactly once.
+    """
+    expected = (
+        db.query(func.count(Product.id)).filter(Product.is_active == True).scalar()
+    )
+    problems = []
+    for sort_by in ("created_at", "price", "title", "category", "relevance"):
+        for sort_order in ("desc", "asc"):
+            seen: List[int] = []
+            cursor = None
+            while True:
+                params = ProductSearchParams(
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    page_size=page_size,
+                    cursor=cursor,
+                    include_total=False,
+                )
+                page = search_products(db, params)
+                seen.extend(product.id for product in page.products)
+                cursor = page.next_cursor
+                # A cursor that does not advance would loop forever
+                if cursor is None or len(seen) > expected:
+                    break
+            if len(seen) != expected or len(set(seen)) != len(seen):
+                problems.append(
+                    f"sort_by={sort_by} sort_order={sort_order}: {len(seen)} rows, "
+                    f"{len(set(seen))} distinct, {expected} active products"
+                )
+    return problems
+
+
+def _use_memory_index(params: ProductSearchParams) -> bool:
+    # SEARCH_ENGINE=memory answers text searches once the index is built
+    return bool(
+        params.query
+        and settings.SEARCH_ENGINE == "memory"
+        and memory_search_index.ready
+    )
+
+
+def _memory_offset(params: ProductSearchParams) -> int:
+    if not params.cursor:
+        return (params.page - 1) * params.page_size
+    offset = _read_cursor(params, "n")
+    if not isinstance(offset, int) or offset < 0:
+        raise _invalid_cursor()
+    return offset
+
+
+def _memory_search(params: ProductSearchParams, offset: int):
+    # Ranking happens in process either way, so the total is free here
+    return memory_search_index.search(
+        params.query,
+        category=params.category,
+        min_price=params.min_price,
+        max_price=params.max_price,
+        tags=params.tags,
+        creator_name=params.creator_name,
+        sort_by=params.sort_by,
+        sort_order=params.sort_order,
+        offset=offset,
+        limit=params.page_size,
+        facet_limit=settings.SEARCH_TAG_FACETS,
+    )
+
+
+def _memory_search_response(
+    db: Session, params: ProductSearchParams, offset: int, result
+) -> ProductSearchResponse:
+    """search_products answered by the in-process index (SEARCH_ENGINE=memory)"""
+    # Load only the requested page, in ranked order
+    product_ids = result.product_ids
+    rows = (
+        db.query(Product).filter(Product.id.in_(product_ids)).all()
+        if product_ids
+        else []
+    )
+    by_id = {product.id: product for product in rows}
+    products = [by_id[pid] for pid in product_ids if pid in by_id]
+
+    has_next = offset + params.page_size < result.total
+    next_cursor = (
+        _encode_cursor(params, n=offset + params.page_size) if has_next else None
+    )
+    tag_facets = [TagFacet(tag=tag, count=count) for tag, count in result.tag_facets]
+    return _search_response(
+        products,
+        result.total,
+        params,
+        tag_facets,
+        has_next=has_next,
+        next_cursor=next_cursor,
+    )
+
+
+def _search_response(
+    products,
+    total: Optional[int],
+    params: ProductSearchParams,
+    tag_facets: List[TagFacet],
+    has_next: bool,
+    next_cursor: Optional[str],
+) -> ProductSearchResponse:
+    # Calculate pagination metadata (total is None when it was not counted)
+    total_pages = math.ceil(total / params.page_size) if total is not None else None
+    has_prev = bool(params.cursor) or params.page > 1
 
     return ProductSearchResponse(
         products=products,
@@ -126,6 +425,8 @@ def search_products(db: Session, params: ProductSearchParams) -> ProductSearchRe
         total_pages=total_pages,
         has_next=has_next,
         has_prev=has_prev,
+        next_cursor=next_cursor,
+        tag_facets=tag_facets,
     )
 
 
@@ -148,6 +449,14 @@ def get_product_by_id(db: Session, product_id: int):
     )
 
 
+async def get_product_by_id_async(db: AsyncSession, product_id: int):
+    """get_product_by_id for async routes"""
+    result = await db.execute(
+        select(Product).where(Product.id == product_id, Product.is_active == True)
+    )
+    return result.scalars().first()
+
+
 def get_products_by_category(
     db: Session, category: ProductCategory, page: int = 1, page_size: int = None
 ):
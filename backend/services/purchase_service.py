@@ -1,11 +1,15 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional, List
 from backend.models.purchase import Purchase, PaymentStatus
 from backend.models.product import Product
 from backend.models.user import User
 from backend.core.stripe import StripeService
+from backend.db.replicas import replica_set
+from backend.services.platform_snapshot import platform_snapshot
+from backend.services.sales_rollup import record_sale
 from fastapi import HTTPException, status
 import stripe
 
@@ -101,17 +105,42 @@ class PurchaseService:
         if not purchase:
             raise HTTPException(status_code=404, detail="Purchase not found")
 
+        # The buyer's next reads must see this purchase, whatever the replicas'
+        # lag, also when the webhook and the success redirect race and this
+        # call finds the purchase already completed
+        replica_set.pin(purchase.user_id)
+
         if purchase.payment_status == PaymentStatus.COMPLETED:
             return purchase
 
-        # Update purchase with payment information
-        purchase.stripe_payment_intent_id = payment_intent_id
-        purchase.payment_status = PaymentStatus.COMPLETED
-        purchase.completed_at = datetime.utcnow()
+        # Update purchase with payment information. Conditional, so when the
+        # webhook and the success redirect race only one of them completes
+        # the purchase and counts the sale.
+        completed = (
+            db.query(Purchase)
+            .filter(
+                Purchase.id == purchase.id,
+                Purchase.payment_status != PaymentStatus.COMPLETED,
+            )
+            .update(
+                {
+                    Purchase.stripe_payment_intent_id: payment_intent_id,
+                    Purchase.payment_status: PaymentStatus.COMPLETED,
+                    Purchase.completed_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+        if completed:
+            # Creator analytics rollup, committed together with the purchase
+            record_sale(db, purchase)
 
         db.commit()
         db.refresh(purchase)
 
+        if completed:
+            platform_snapshot.mark_stale()
+
         return purchase
 
     @staticmethod
@@ -161,6 +190,22 @@ class PurchaseService:
 
         return purchase is not None
 
+    @staticmethod
+    async def has_purchased_product_async(
+        db: AsyncSession, user_id: int, product_id: int
+    ) -> bool:
+        """has_purchased_product for async routes"""
+        result = await db.execute(
+            select(Purchase.id)
+            .where(
+                Purchase.user_id == user_id,
+                Purchase.product_id == product_id,
+                Purchase.payment_status == PaymentStatus.COMPLETED,
+            )
+            .limit(1)
+        )
+        return result.first() is not None
+
     @staticmethod
     def get_purchase_by_session(db: Session, session_id: str) -> Optional[Purchase]:
         """Get purchase by Stripe session ID"""
@@ -0,0 +1,278 @@
+"""
+Resumable multipart uploads for large creator files
+
+Protocol:
+1. init     - creator declares filename and total size, gets an upload_id
+2. part N   - each part is streamed to its own file in the staging area;
+              re-sending a part overwrites it, so a failed part is simply retried
+3. complete - once every part is present they are joined into final storage
+              in bounded chunks and the product record can be created
+
+Sessions live under UPLOAD_FOLDER/.multipart/<upload_id>/ and are garbage
+collected once they have been idle for UPLOAD_SESSION_TTL_HOURS.
+"""
+
+import json
+import math
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+from fastapi import UploadFile, HTTPException
+from backend.core.config import settings
+from backend.services.storage_service import storage_service, StoredFile
+
+STAGING_DIRNAME = ".multipart"
+MANIFEST_NAME = "manifest.json"
+COMPLETE_LOCK_NAME = "complete.lock"
+
+# Opportunistic GC runs at most this often per process
+GC_INTERVAL_SECONDS = 3600
+
+
+class _ConcatenatedParts:
+    """Read-only file-like object over a list of part files, in order"""
+
+    def __init__(self, paths: List[Path]):
+        self._paths = list(paths)
+        self._current: Optional[BinaryIO] = None
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            if self._current is None:
+                if not self._paths:
+                    return b""
+                self._current = open(self._paths.pop(0), "rb")
+
+            chunk = self._current.read(size)
+            if chunk:
+                return chunk
+
+            self._current.close()
+            self._current = None
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+
+class ResumableUploadService:
+    def __init__(self):
+        self.staging_path = Path(settings.UPLOAD_FOLDER) / STAGING_DIRNAME
+        self.staging_path.mkdir(parents=True, exist_ok=True)
+        self._last_gc = 0.0
+
+    def init_upload(
+        self,
+        creator_id: int,
+        filename: str,
+        total_size: int,
+        part_size: Optional[int] = None,
+    ) -> dict:
+        """Start a new upload session and return its description"""
+        max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+        if total_size > max_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit",
+            )
+
+        part_size = part_size or settings.UPLOAD_PART_DEFAULT_MB * 1024 * 1024
+        if part_size > settings.UPLOAD_PART_MAX_MB * 1024 * 1024:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part size exceeds {settings.UPLOAD_PART_MAX_MB}MB limit",
+            )
+
+        self._maybe_collect_stale_uploads()
+
+        upload_id = uuid.uuid4().hex
+        session_dir = self.staging_path / upload_id
+        session_dir.mkdir()
+
+        manifest = {
+            "upload_id": upload_id,
+            "creator_id": creator_id,
+            "filename": filename,
+            "total_size": total_size,
+            "part_size": part_size,
+            "part_count": max(1, math.ceil(total_size / part_size)),
+            "created_at": int(time.time()),
+        }
+        (session_dir / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+        return self._describe(session_dir, manifest)
+
+    def upload_part(
+        self, upload_id: str, creator_id: int, part_number: int, file: UploadFile
+    ) -> dict:
+        """Stream one part to the staging area (idempotent per part number)"""
+        session_dir, manifest = self._load_session(upload_id, creator_id)
+
+        if part_number < 1 or part_number > manifest["part_count"]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part number must be between 1 and {manifest['part_count']}",
+            )
+
+        expected_size = self._expected_part_size(manifest, part_number)
+        part_path = self._part_path(session_dir, part_number)
+        # A part of the wrong size never replaces one already received, so a
+        # retry that drops mid-stream keeps the earlier good copy
+        try:
+            storage_service.stream_to_path(
+                file.file,
+                part_path,
+                max_size=expected_size,
+                expected_size=expected_size,
+            )
+        except HTTPException as e:
+            if e.status_code != 400:
+                raise
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part {part_number} must be exactly {expected_size} bytes",
+            )
+
+        # Part activity keeps the session alive for the garbage collector
+        os.utime(session_dir)
+        return self._describe(session_dir, manifest)
+
+    def get_status(self, upload_id: str, creator_id: int) -> dict:
+        """Describe which parts have been received so a client can resume"""
+        session_dir, manifest = self._load_session(upload_id, creator_id)
+        return self._describe(session_dir, manifest)
+
+    def complete_upload(self, upload_id: str, creator_id: int) -> StoredFile:
+        """Join all parts into final storage and remove the session"""
+        session_dir, manifest = self._load_session(upload_id, creator_id)
+
+        missing = self._missing_parts(session_dir, manifest)
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Upload incomplete, missing parts: {missing[:20]}",
+            )
+
+        # Only one completion may join a session
+        lock_path = session_dir / COMPLETE_LOCK_NAME
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+        except FileExistsError:
+            raise HTTPException(status_code=409, detail="Upload is already completing")
+
+        parts = _ConcatenatedParts(
+            [
+                self._part_path(session_dir, number)
+                for number in range(1, manifest["part_count"] + 1)
+            ]
+        )
+        try:
+            stored = storage_service.store_stream(parts, manifest["filename"])
+            if stored.file_size != manifest["total_size"]:
+                if not stored.deduplicated:
+                    # Written by this call, so no product references it yet
+                    storage_service.backend.delete(stored.file_path)
+                raise HTTPException(status_code=500, detail="Joined file size mismatch")
+        except BaseException:
+            # Let the creator retry (or abort) the upload
+            lock_path.unlink(missing_ok=True)
+            raise
+        finally:
+            parts.close()
+
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return stored
+
+    def abort_upload(self, upload_id: str, creator_id: int) -> None:
+        """Discard a session and all of its parts"""
+        session_dir, _ = self._load_session(upload_id, creator_id)
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+    def collect_stale_uploads(self, max_age_seconds: Optional[int] = None) -> int:
+        """Delete sessions that have been idle longer than the TTL"""
+        if max_age_seconds is None:
+            max_age_seconds = settings.UPLOAD_SESSION_TTL_HOURS * 3600
+
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for session_dir in self.staging_path.iterdir():
+            if not session_dir.is_dir():
+                continue
+            try:
+                if session_dir.stat().st_mtime < cutoff:
+                    shutil.rmtree(session_dir, ignore_errors=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+
+        self._last_gc = time.time()
+        if removed:
+            print(f"Removed {removed} stale upload session(s)")
+        return removed
+
+    def _maybe_collect_stale_uploads(self) -> None:
+        if time.time() - self._last_gc > GC_INTERVAL_SECONDS:
+            self.collect_stale_uploads()
+
+    def _load_session(self, upload_id: str, creator_id: int) -> tuple[Path, dict]:
+        # upload_id is a uuid4 hex, reject anything else before touching the disk
+        if len(upload_id) != 32 or not all(c in "0123456789abcdef" for c in upload_id):
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+        session_dir = self.staging_path / upload_id
+        try:
+            manifest = json.loads((session_dir / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+        if manifest["creator_id"] != creator_id:
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+        return session_dir, manifest
+
+    @staticmethod
+    def _part_path(session_dir: Path, part_number: int) -> Path:
+        return session_dir / f"part-{part_number:05d}"
+
+    @staticmethod
+    def _expected_part_size(manifest: dict, part_number: int) -> int:
+        if part_number < manifest["part_count"]:
+            return manifest["part_size"]
+        return manifest["total_size"] - manifest["part_size"] * (
+            manifest["part_count"] - 1
+        )
+
+    def _missing_parts(self, session_dir: Path, manifest: dict) -> List[int]:
+        missing = []
+        for number in range(1, manifest["part_count"] + 1):
+            part_path = self._part_path(session_dir, number)
+            try:
+                size = part_path.stat().st_size
+            except FileNotFoundError:
+                missing.append(number)
+                continue
+            if size != self._expected_part_size(manifest, number):
+                missing.append(number)
+        return missing
+
+    def _describe(self, session_dir: Path, manifest: dict) -> dict:
+        missing = self._missing_parts(session_dir, manifest)
+        return {
+            "upload_id": manifest["upload_id"],
+            "filename": manifest["filename"],
+            "total_size": manifest["total_size"],
+            "part_size": manifest["part_size"],
+            "part_count": manifest["part_count"],
+            "missing_parts": missing,
+            "is_complete": not missing,
+            "expires_at": int(session_dir.stat().st_mtime)
+            + settings.UPLOAD_SESSION_TTL_HOURS * 3600,
+        }
+
+
+resumable_upload_service = ResumableUploadService()
@@ -0,0 +1,136 @@
+"""
+Incrementally maintained creator sales rollups
+
+Creator analytics used to aggregate the whole purchases x products join on
+every dashboard load. They now read creator_sales_daily, one row per
+(product, day) with that day's completed sales and revenue, so a dashboard
+costs O(products x days with sales) whatever the number of purchases.
+creator_sales_hourly holds the same at hour resolution for the sales series
+(backend/services/sales_series.py).
+
+- record_sale() adds one completed purchase to both; complete_purchase calls
+  it in the transaction that marks the purchase completed, so the rollups
+  commit (or roll back) together with the purchase
+- rebuild_sales_rollups() recomputes rows from the purchases table, for the
+  initial backfills (migrations 0005 and 0006), after seeding, or to repair
+  drift: `python -m backend.manage rebuild-rollups [--creator-id N]`
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from backend.models.product import Product
+from backend.models.purchase import PaymentStatus, Purchase
+from backend.models.sales_rollup import CreatorSalesDaily, CreatorSalesHourly
+from backend.models.user import User  # noqa: F401 (Product.creator)
+
+
+def record_sale(db: Session, purchase: Purchase) -> None:
+    """Add a just-completed purchase to its product's day and hour rows"""
+    creator_id = db.query(Product.creator_id).filter(
+        Product.id == purchase.product_id
+    ).scalar()
+    if creator_id is None:
+        return
+    created_at = purchase.created_at or datetime.utcnow()
+    amount = purchase.amount_paid or 0.0
+    for model, bucket in (
+        (CreatorSalesDaily, created_at.date()),
+        (CreatorSalesHourly, created_at.replace(minute=0, second=0, microsecond=0)),
+    ):
+        _add_sale(db, model.__table__, bucket, purchase.product_id, creator_id, amount)
+
+
+def _add_sale(db: Session, table, bucket, product_id: int, creator_id: int, amount):
+    """Upsert one sale into a rollup table keyed by (product_id, bucket)"""
+    bucket_column = "day" if "day" in table.c else "hour"
+    row = {
+        "product_id": product_id,
+        bucket_column: bucket,
+        "creator_id": creator_id,
+        "sales_count": 1,
+        "revenue": amount,
+    }
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        db.execute(
+            upsert(table)
+            .values(**row)
+            .on_conflict_do_update(
+                index_elements=["product_id", bucket_column],
+                set_={
+                    "sales_count": table.c.sales_count + 1,
+                    "revenue": table.c.revenue + amount,
+                },
+            )
+        )
+        return
+
+    updated = db.execute(
+        update(table)
+        .where(table.c.product_id == product_id, table.c[bucket_column] == bucket)
+        .values(
+            sales_count=table.c.sales_count + 1, revenue=table.c.revenue + amount
+        )
+    ).rowcount
+    if not updated:
+        db.execute(insert(table).values(**row))
+
+
+def _hour(db: Session, column):
+    """SQL for a timestamp truncated to the hour, stored the way DateTime
+    stores record_sale's Python datetimes"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+    if dialect == "postgresql":
+        return func.date_trunc("hour", column)
+    raise RuntimeError(f"Sales rollups cannot be rebuilt on {dialect}")
+
+
+def rebuild_sales_rollups(db: Session, creator_id: Optional[int] = None) -> int:
+    """Recompute creator_sales_daily and creator_sales_hourly (one creator's
+    rows, or every row) from completed purchases; returns the number of
+    daily rows written. The caller commits."""
+    written = 0
+    for model, bucket_column, bucket in (
+        (CreatorSalesDaily, "day", func.date(Purchase.created_at)),
+        (CreatorSalesHourly, "hour", _hour(db, Purchase.created_at)),
+    ):
+        table = model.__table__
+        rows = (
+            select(
+                Purchase.product_id,
+                bucket,
+                Product.creator_id,
+                func.count(Purchase.id),
+                func.coalesce(func.sum(Purchase.amount_paid), 0.0),
+            )
+            .join(Product, Purchase.product_id == Product.id)
+            .where(
+                Purchase.payment_status == PaymentStatus.COMPLETED,
+                Purchase.created_at.isnot(None),
+            )
+            .group_by(Purchase.product_id, bucket, Product.creator_id)
+        )
+        clear = delete(table)
+        if creator_id is not None:
+            rows = rows.where(Product.creator_id == creator_id)
+            clear = clear.where(table.c.creator_id == creator_id)
+
+        db.execute(clear)
+        result = db.execute(
+            insert(table).from_select(
+                ["product_id", bucket_column, "creator_id", "sales_count", "revenue"],
+                rows,
+            )
+        )
+        if model is CreatorSalesDaily:
+            written = result.rowcount
+    return written
@@ -0,0 +1,150 @@
+"""
+Time-bucketed sales series for creator charts
+
+get_sales_series() answers "sales and revenue per <granularity> between
+start and end" for a creator (optionally one product) from the sales
+rollups (backend/services/sales_rollup.py), never from raw purchases:
+
+- hour:              creator_sales_hourly, one row per product and hour
+- day, week, month:  creator_sales_daily summed per day in SQL, then folded
+                     into ISO weeks (starting Monday) or calendar months
+
+Either way the query reads one index range (creator_id, bucket) and returns
+at most one row per day or hour, so a 12-month chart costs the same as a
+7-day one. Buckets without sales are filled with zeros, so charts get a
+continuous axis. Times are UTC, like Purchase.created_at.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.models.sales_rollup import CreatorSalesDaily, CreatorSalesHourly
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+# Range used when a request gives no start
+DEFAULT_RANGES = {
+    "hour": timedelta(hours=48),
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=12),
+    "month": timedelta(days=365),
+}
+
+# Longest series one request may ask for
+MAX_BUCKETS = 1000
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the bucket a moment falls in"""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = datetime(moment.year, moment.month, moment.day)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+    """Start of the bucket after the one starting at start"""
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def get_sales_series(
+    db: Session,
+    creator_id: int,
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Sales count and revenue per bucket for [start, end), zero-filled"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity must be one of: {', '.join(GRANULARITIES)}",
+        )
+    # Naive UTC throughout, like the stored timestamps
+    end = _as_utc(end) if end is not None else datetime.utcnow()
+    start = _as_utc(start) if start is not None else end - DEFAULT_RANGES[granularity]
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+
+    buckets = []
+    bucket = bucket_start(start, granularity)
+    while bucket < end:
+        buckets.append(bucket)
+        if len(buckets) > MAX_BUCKETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_BUCKETS} buckets per series; "
+                "narrow the range or use a coarser granularity",
+            )
+        bucket = next_bucket(bucket, granularity)
+
+    if granularity == "hour":
+        model, column = CreatorSalesHourly, CreatorSalesHourly.hour
+        lower, upper = buckets[0], end
+    else:
+        model, column = CreatorSalesDaily, CreatorSalesDaily.day
+        lower, upper = buckets[0].date(), _day_after(end)
+
+    query = db.query(
+        column,
+        func.sum(model.sales_count).label("sales"),
+        func.sum(model.revenue).label("revenue"),
+    ).filter(model.creator_id == creator_id, column >= lower, column < upper)
+    if product_id is not None:
+        query = query.filter(model.product_id == product_id)
+
+    totals = {bucket: [0, 0.0] for bucket in buckets}
+    for moment, sales, revenue in query.group_by(column):
+        if isinstance(moment, date) and not isinstance(moment, datetime):
+            moment = datetime(moment.year, moment.month, moment.day)
+        entry = totals.get(bucket_start(moment, granularity))
+        if entry is not None:
+            entry[0] += sales or 0
+            entry[1] += revenue or 0.0
+
+    series = [
+        {"start": bucket, "sales": sales, "revenue": round(revenue, 2)}
+        for bucket, (sales, revenue) in totals.items()
+    ]
+    return {
+        "granularity": granularity,
+        "start": buckets[0],
+        "end": end,
+        "product_id": product_id,
+        "total_sales": sum(point["sales"] for point in series),
+        "total_revenue": round(sum(point["revenue"] for point in series), 2),
+        "buckets": series,
+    }
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Naive UTC datetime (naive input is taken to be UTC already)"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _day_after(moment: datetime) -> date:
+    """First day not touched by [.., moment)"""
+    day = moment.date()
+    return day if moment == datetime(day.year, day.month, day.day) else (
+        day + timedelta(days=1)
+    )
@@ -0,0 +1,259 @@
+"""
+Full-text search over the product catalog
+
+One interface, one implementation per database:
+
+- SQLite:     an FTS5 table (products_fts) with the products table as external
+              content, kept up to date by triggers on insert, update and soft
+              delete. Ranked with bm25().
+- PostgreSQL: a stored, generated tsvector column (products.search_vector)
+              with a partial GIN index over active products. Ranked with
+              ts_rank_cd().
+- Anything else (or SQLite built without FTS5): the old LIKE scan.
+
+Every word of the query must match (in any of title, description, tags or
+creator name), and each word also matches as a prefix, so "phot" finds
+"photography". Only active products are indexed.
+
+ensure_schema() creates the index objects if they are missing; it runs with
+the migrations (python -m backend.manage migrate). Workers call the
+read-only check_schema() on boot and fall back to LIKE until the objects
+exist.
+"""
+
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import column, func, literal_column, or_, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query
+from backend.db.base import engine
+from backend.db.pool import set_statement_timeout
+from backend.models.product import Product
+
+# Word characters only, so user input can never inject query syntax
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+MAX_QUERY_TERMS = 16
+
+
+def text_terms(value: str) -> List[str]:
+    """Lower-cased words of a text"""
+    return _TERM_PATTERN.findall(value.lower())
+
+
+def query_terms(query_text: str) -> List[str]:
+    """Lower-cased words of a search query"""
+    return text_terms(query_text)[:MAX_QUERY_TERMS]
+
+
+class SearchIndex:
+    """LIKE scan; the fallback and the base for real full-text indexes"""
+
+    name = "like"
+
+    def ensure_schema(self, engine: Engine) -> None:
+        """Create index objects if missing (no-op for the LIKE scan)"""
+
+    def check_schema(self, engine: Engine) -> bool:
+        """Whether the index objects exist, without changing anything"""
+        return True
+
+    def apply(self, query: Query, query_text: str) -> Tuple[Query, Optional[object]]:
+        """Restrict query to matching products; return it with a rank expression.
+
+        The rank sorts best matches first when used with asc(); None means the
+        index cannot rank.
+        """
+        search_term = f"%{query_text.lower()}%"
+        query = query.filter(
+            or_(
+                func.lower(Product.title).like(search_term),
+                func.lower(Product.description).like(search_term),
+                func.lower(Product.tags).like(search_term),
+                func.lower(Product.creator_name).like(search_term),
+            )
+        )
+        return query, None
+
+
+class SQLiteFTS5Index(SearchIndex):
+    """FTS5 external-content table maintained by triggers"""
+
+    name = "sqlite-fts5"
+
+    # Column weights for bm25(): title, description, tags, creator_name
+    WEIGHTS = (10.0, 2.0, 5.0, 3.0)
+
+    SCHEMA = [
+        """
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            title, description, tags, creator_name,
+            content='products', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        # Only active products are indexed. With external content, a row is
+        # removed by replaying the values it was indexed with.
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products
+        WHEN new.is_active BEGIN
+            INSERT INTO products_fts(rowid, title, description, tags, creator_name)
+            VALUES (new.id, new.title, new.description, new.tags, new.creator_name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products
+        WHEN old.is_active BEGIN
+            INSERT INTO products_fts(products_fts, rowid, title, description, tags, creator_name)
+            VALUES ('delete', old.id, old.title, old.description, old.tags, old.creator_name);
+        END
+        """,
+        # One trigger, so the old entry is always removed before the new one
+        # is added (SQLite does not order separate triggers)
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_update
+        AFTER UPDATE OF title, description, tags, creator_name, is_active ON products
+        BEGIN
+            INSERT INTO products_fts(products_fts, rowid, title, description, tags, creator_name)
+            SELECT 'delete', old.id, old.title, old.description, old.tags, old.creator_name
+            WHERE old.is_active;
+            INSERT INTO products_fts(rowid, title, description, tags, creator_name)
+            SELECT new.id, new.title, new.description, new.tags, new.creator_name
+            WHERE new.is_active;
+        END
+        """,
+    ]
+
+    BACKFILL = """
+        INSERT INTO products_fts(rowid, title, description, tags, creator_name)
+        SELECT id, title, description, tags, creator_name
+        FROM products WHERE is_active
+    """
+
+    def __init__(self):
+        self.available = True
+        self._fts = table("products_fts", column("rowid"))
+
+    def _exists(self, connection) -> bool:
+        return bool(
+            connection.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'products_fts'"
+                )
+            ).first()
+        )
+
+    def check_schema(self, engine):
+        with engine.connect() as connection:
+            self.available = self._exists(connection)
+        if not self.available:
+            print("products_fts is missing, product search falls back to LIKE")
+        return self.available
+
+    def ensure_schema(self, engine):
+        with engine.begin() as connection:
+            # Backfilling a large products table may exceed the timeout
+            set_statement_timeout(connection, 0)
+            exists = self._exists(connection)
+            try:
+                if not exists:
+                    connection.execute(text(self.SCHEMA[0]))
+                    connection.execute(text(self.BACKFILL))
+                    print("Created products_fts full-text index")
+                for statement in self.SCHEMA[1:]:
+                    connection.execute(text(statement))
+            except OperationalError as e:
+                # SQLite compiled without FTS5
+                print(f"FTS5 unavailable, product search falls back to LIKE: {e}")
+                self.available = False
+
+    def apply(self, query, query_text):
+        terms = query_terms(query_text)
+        if not self.available or not terms:
+            return super().apply(query, query_text)
+
+        # "term"* : quoted phrase (no operators) with prefix match
+        match = " ".join(f'"{term}"*' for term in terms)
+        fts = literal_column("products_fts")
+        query = query.join(self._fts, self._fts.c.rowid == Product.id).filter(
+            fts.op("MATCH")(match)
+        )
+        # bm25() is lower for better matches
+        return query, func.bm25(fts, *self.WEIGHTS)
+
+
+class PostgresFullTextIndex(SearchIndex):
+    """Generated tsvector column with a partial GIN index"""
+
+    name = "postgres-tsvector"
+
+    # 'simple' keeps words as typed (no stemming) so prefix matches are exact
+    TEXT_CONFIG = "simple"
+
+    SCHEMA = [
+        f"""
+        ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{TEXT_CONFIG}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{TEXT_CONFIG}', coalesce(tags, '')), 'B') ||
+            setweight(to_tsvector('{TEXT_CONFIG}', coalesce(creator_name, '')), 'C') ||
+            setweight(to_tsvector('{TEXT_CONFIG}', coalesce(description, '')), 'D')
+        ) STORED
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_products_search_vector
+        ON products USING GIN (search_vector) WHERE is_active
+        """,
+    ]
+
+    def __init__(self):
+        self.available = True
+
+    def check_schema(self, engine):
+        with engine.connect() as connection:
+            self.available = bool(
+                connection.execute(
+                    text(
+                        "SELECT 1 FROM information_schema.columns "
+                        "WHERE table_name = 'products' AND column_name = 'search_vector'"
+                    )
+                ).first()
+            )
+        if not self.available:
+            print("products.search_vector is missing, product search falls back to LIKE")
+        return self.available
+
+    def ensure_schema(self, engine):
+        with engine.begin() as connection:
+            # Backfilling a large products table may exceed the timeout
+            set_statement_timeout(connection, 0)
+            for statement in self.SCHEMA:
+                connection.execute(text(statement))
+        self.available = True
+
+    def apply(self, query, query_text):
+        terms = query_terms(query_text)
+        if not self.available or not terms:
+            return super().apply(query, query_text)
+
+        tsquery = func.to_tsquery(
+            self.TEXT_CONFIG, " & ".join(f"{term}:*" for term in terms)
+        )
+        vector = literal_column("products.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))
+        # ts_rank_cd() is higher for better matches
+        return query, -func.ts_rank_cd(vector, tsquery)
+
+
+def create_search_index(engine: Engine) -> SearchIndex:
+    """Pick the full-text implementation for the database in use"""
+    if engine.dialect.name == "sqlite":
+        return SQLiteFTS5Index()
+    if engine.dialect.name == "postgresql":
+        return PostgresFullTextIndex()
+    return SearchIndex()
+
+
+search_index = create_search_index(engine)
@@ -0,0 +1,383 @@
+"""
+Storage backends for product files and images
+
+StorageService talks to one of these drivers, selected by
+settings.STORAGE_BACKEND:
+
+- "local": files under UPLOAD_FOLDER on a POSIX volume, downloaded through
+  our own signed /files/... links
+- "s3":    any S3-compatible object store (AWS S3, MinIO, Supabase Storage's
+  S3 endpoint, ...), downloaded through presigned URLs. API pods then need no
+  shared volume and can be scaled horizontally.
+
+Both drivers support streaming puts (bounded memory, size limit, SHA-256
+computed on the way through), streaming/ranged reads and presigned URLs.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+from fastapi import HTTPException
+from backend.core.config import settings
+from backend.core.signing import url_signer, FILE_LINK
+
+
+class ObjectStat(NamedTuple):
+    size: int
+    modified_at: float  # Unix timestamp
+    etag: str
+
+
+def _size_limit_error() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit",
+    )
+
+
+def write_stream_to_path(
+    source: BinaryIO,
+    destination: Path,
+    max_size: Optional[int] = None,
+    expected_size: Optional[int] = None,
+) -> tuple[int, str]:
+    """Copy source to destination in chunks, returning (size, sha256 hex).
+
+    Writes go to a temporary file in the destination directory so the final
+    rename is atomic; the partial file is removed if anything fails, and an
+    existing destination is only replaced by a complete copy (400 when
+    expected_size is given and not met).
+    """
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=".upload-", suffix=".part", dir=destination.parent
+    )
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    # Abort as soon as the limit is crossed, not after the
+                    # whole body has been written
+                    raise _size_limit_error()
+                digest.update(chunk)
+                buffer.write(chunk)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+
+        if expected_size is not None and size != expected_size:
+            raise HTTPException(
+                status_code=400, detail=f"Expected {expected_size} bytes, got {size}"
+            )
+        os.replace(tmp_name, destination)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return size, digest.hexdigest()
+
+
+class _HashingReader:
+    """File-like wrapper that hashes, counts and size-limits what is read"""
+
+    def __init__(self, source: BinaryIO, max_size: Optional[int] = None):
+        self._source = source
+        self._max_size = max_size
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._source.read(size)
+        self.size += len(chunk)
+        if self._max_size is not None and self.size > self._max_size:
+            raise _size_limit_error()
+        self.digest.update(chunk)
+        return chunk
+
+
+class StorageBackend(ABC):
+    """Interface every storage driver implements"""
+
+    # True when objects are plain files the app (or its proxy) can serve
+    is_local: bool = False
+
+    @abstractmethod
+    def put_stream(
+        self, key: str, source: BinaryIO, max_size: Optional[int] = None
+    ) -> tuple[int, str]:
+        """Store source under key in bounded memory, returning (size, sha256 hex)"""
+
+    @abstractmethod
+    def open_range(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Stream bytes [start, end) of an object (end=None reads to EOF)"""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        """Size, modification time and ETag, or None if the object is missing"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an object (missing objects are ignored)"""
+
+    @abstractmethod
+    def presigned_url(self, key: str, expires_in: int = 60) -> str:
+        """Time-limited URL that downloads the object without further auth"""
+
+    def presigned_urls(self, keys: List[str], expires_in: int = 60) -> List[str]:
+        """presigned_url for many keys at once"""
+        return [self.presigned_url(key, expires_in) for key in keys]
+
+    @abstractmethod
+    def move(self, source_key: str, destination_key: str) -> None:
+        """Rename an object, replacing any existing destination"""
+
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """Bump an object's modification time (protects it from GC grace checks)"""
+
+    @abstractmethod
+    def list_keys(self, prefix: str) -> Iterator[tuple[str, float]]:
+        """Yield (key, modified_at) for every object under prefix"""
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of the object, for drivers that have one"""
+        return None
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files under a local directory (UPLOAD_FOLDER)"""
+
+    is_local = True
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put_stream(self, key, source, max_size=None):
+        destination = self.root / key
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        return write_stream_to_path(source, destination, max_size)
+
+    def open_range(self, key, start=0, end=None):
+        chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+        with open(self.root / key, "rb") as file:
+            file.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                to_read = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = file.read(to_read)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def stat(self, key):
+        try:
+            result = (self.root / key).stat()
+        except FileNotFoundError:
+            return None
+        return ObjectStat(
+            result.st_size,
+            result.st_mtime,
+            f"{int(result.st_mtime):x}-{result.st_size:x}",
+        )
+
+    def delete(self, key):
+        (self.root / key).unlink(missing_ok=True)
+
+    def presigned_url(self, key, expires_in=60):
+        # Points at our own secure endpoint (backend/api/secure_files.py)
+        expires_at = int(time.time()) + expires_in
+        token = url_signer.sign(FILE_LINK, key, expires_at)
+
+        base_url = os.getenv("BACKEND_URL", "http://localhost:8000")
+        return f"{base_url}/files/{key}?token={token}&expires={expires_at}"
+
+    def presigned_urls(self, keys, expires_in=60):
+        expires_at = int(time.time()) + expires_in
+        tokens = url_signer.sign_many(FILE_LINK, keys, expires_at)
+
+        base_url = os.getenv("BACKEND_URL", "http://localhost:8000")
+        return [
+            f"{base_url}/files/{key}?token={token}&expires={expires_at}"
+            for key, token in zip(keys, tokens)
+        ]
+
+    def move(self, source_key, destination_key):
+        destination = self.root / destination_key
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.root / source_key, destination)
+
+    def touch(self, key):
+        os.utime(self.root / key)
+
+    def list_keys(self, prefix):
+        base = self.root / prefix
+        if not base.exists():
+            return
+        for path in base.rglob("*"):
+            if path.is_file():
+                try:
+                    modified_at = path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                yield path.relative_to(self.root).as_posix(), modified_at
+
+    def local_path(self, key):
+        return self.root / key
+
+
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """One pooled boto3 client for the whole process (boto3 clients are thread-safe)"""
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                try:
+                    import boto3
+                    from botocore.config import Config
+                except ImportError:
+                    raise RuntimeError(
+                        "STORAGE_BACKEND=s3 requires boto3 (pip install boto3)"
+                    )
+
+                _s3_client = boto3.client(
+                    "s3",
+                    endpoint_url=settings.S3_ENDPOINT_URL or None,
+                    region_name=settings.S3_REGION,
+                    aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+                    aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+                    config=Config(
+                        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": 3, "mode": "standard"},
+                        # MinIO and most self-hosted stores need path-style URLs
+                        s3={"addressing_style": settings.S3_ADDRESSING_STYLE},
+                    ),
+                )
+    return _s3_client
+
+
+class S3StorageBackend(StorageBackend):
+    """S3-compatible object store"""
+
+    def __init__(self, bucket: str):
+        if not bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        self.bucket = bucket
+
+    @property
+    def client(self):
+        return get_s3_client()
+
+    def put_stream(self, key, source, max_size=None):
+        from boto3.s3.transfer import TransferConfig
+
+        reader = _HashingReader(source, max_size)
+        # Multipart upload, one part buffered at a time
+        part_size = max(settings.UPLOAD_CHUNK_SIZE_KB * 1024, 5 * 1024 * 1024)
+        self.client.upload_fileobj(
+            reader,
+            self.bucket,
+            key,
+            Config=TransferConfig(
+                multipart_threshold=part_size,
+                multipart_chunksize=part_size,
+                max_concurrency=1,
+            ),
+        )
+        return reader.size, reader.digest.hexdigest()
+
+    def open_range(self, key, start=0, end=None):
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=byte_range)
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(settings.UPLOAD_CHUNK_SIZE_KB * 1024)
+        finally:
+            body.close()
+
+    def stat(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return ObjectStat(
+            head["ContentLength"],
+            head["LastModified"].timestamp(),
+            head["ETag"].strip('"'),
+        )
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def move(self, source_key, destination_key):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=destination_key,
+            CopySource={"Bucket": self.bucket, "Key": source_key},
+        )
+        self.client.delete_object(Bucket=self.bucket, Key=source_key)
+
+    def touch(self, key):
+        # Copying an object onto itself is the only way to refresh
+        # LastModified. S3 only allows it with REPLACE, which would reset the
+        # Content-Type and user metadata, so carry them over.
+        head = self.client.head_object(Bucket=self.bucket, Key=key)
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={"Bucket": self.bucket, "Key": key},
+            MetadataDirective="REPLACE",
+            ContentType=head.get("ContentType", "binary/octet-stream"),
+            Metadata=head.get("Metadata", {}),
+        )
+
+    def list_keys(self, prefix):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"], item["LastModified"].timestamp()
+
+    def presigned_url(self, key, expires_in=60):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+
+def create_storage_backend() -> StorageBackend:
+    """Build the driver selected by settings.STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.UPLOAD_FOLDER)
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(settings.S3_BUCKET)
+    raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
@@ -1,18 +1,51 @@
-import uuid
-import os
 import time
-import hashlib
+import uuid
 from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Optional
 from fastapi import UploadFile, HTTPException
 from backend.core.config import settings
+from backend.core.file_delivery import guess_media_type
+from backend.services.storage_backends import (
+    StorageBackend,
+    create_storage_backend,
+    write_stream_to_path,
+)
+
+
+# Content-addressed layout: every stored file lives at blobs/ab/cd/<sha256>,
+# so identical uploads share one object. Uploads land under tmp/ first,
+# because the key is only known once the whole stream has been hashed.
+BLOB_PREFIX = "blobs/"
+TEMP_PREFIX = "tmp/"
+
+
+def blob_key_for(sha256: str) -> str:
+    return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+class StoredFile(NamedTuple):
+    """Result of a streamed upload"""
+
+    file_path: str  # Storage key (blobs/ab/cd/<sha256>)
+    file_size: int
+    file_type: str  # File extension
+    sha256: str  # Hex digest of the stored content
+    mime_type: str
+    modified_at: float  # Unix timestamp the blob was written
+    deduplicated: bool = False  # The content was already stored
 
 
 class StorageService:
     def __init__(self):
-        # Use local file storage
+        # Local staging area (resumable upload parts) always lives on disk
         self.local_storage_path = Path(settings.UPLOAD_FOLDER)
         self.local_storage_path.mkdir(parents=True, exist_ok=True)
-        print(f"Using local file storage at: {self.local_storage_path.absolute()}")
+
+        self.backend: StorageBackend = create_storage_backend()
+        if self.backend.is_local:
+            print(f"Using local file storage at: {self.local_storage_path.absolute()}")
+        else:
+            print(f"Using {settings.STORAGE_BACKEND} storage (bucket: {settings.S3_BUCKET})")
 
     def validate_file(self, file: UploadFile) -> None:
         """Flexible file validation - only checks size and basic security"""
@@ -40,65 +73,118 @@ class StorageService:
     def upload_file(
         self, file: UploadFile, file_type: str = "product", validate: bool = True
     ) -> tuple[str, int, str]:
-        """Upload file to local storage and return (file_path, file_size, file_type)"""
+        """Upload file to storage and return (file_path, file_size, file_type)"""
+        stored = self.stream_upload(file, file_type=file_type, validate=validate)
+        return stored.file_path, stored.file_size, stored.file_type
+
+    def stream_upload(
+        self, file: UploadFile, file_type: str = "product", validate: bool = True
+    ) -> StoredFile:
+        """Stream an upload to the storage backend in bounded chunks.
+
+        The size and SHA-256 are computed while the spooled upload is copied.
+        Local storage writes a temporary file and renames it into place
+        atomically; object stores receive a multipart upload one part at a
+        time. Peak memory does not depend on the file size.
+        """
         try:
             if validate:
                 self.validate_file(file)
 
-            # Generate unique filename
-            file_extension = (
-                file.filename.split(".")[-1] if "." in file.filename else ""
-            )
-            unique_filename = (
-                f"{uuid.uuid4()}.{file_extension}"
-                if file_extension
-                else str(uuid.uuid4())
-            )
+            max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024 if validate else None
+            return self.store_stream(file.file, file.filename, max_size)
 
-            # Read file content once
-            file_content = file.file.read()
-            file_size = len(file_content)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
-            # Upload to local storage
-            file_path = self.local_storage_path / unique_filename
-            with open(file_path, "wb") as buffer:
-                buffer.write(file_content)
+    def store_stream(
+        self, source: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> StoredFile:
+        """Store any readable binary stream in the content-addressed layout"""
+        file_extension = filename.split(".")[-1] if "." in filename else ""
 
-            print(f"Upload successful: {unique_filename} ({file_size} bytes)")
-            return unique_filename, file_size, file_extension
+        temp_key = f"{TEMP_PREFIX}{uuid.uuid4()}"
+        file_size, sha256 = self.backend.put_stream(temp_key, source, max_size)
+        blob_key = blob_key_for(sha256)
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
+        deduplicated = False
+        try:
+            if self.backend.exists(blob_key):
+                deduplicated = True
+                # Identical content is already stored: keep a single copy and
+                # refresh it so the garbage collector's grace period restarts
+                self.backend.delete(temp_key)
+                self.backend.touch(blob_key)
+                print(f"Upload deduplicated: {blob_key} ({file_size} bytes)")
+            else:
+                self.backend.move(temp_key, blob_key)
+                print(f"Upload successful: {blob_key} ({file_size} bytes)")
+        except Exception:
+            self.backend.delete(temp_key)
+            raise
+
+        return StoredFile(
+            blob_key,
+            file_size,
+            file_extension,
+            sha256,
+            guess_media_type(filename),
+            time.time(),
+            deduplicated,
+        )
+
+    def stream_to_path(
+        self,
+        source: BinaryIO,
+        destination: Path,
+        max_size: Optional[int] = None,
+        expected_size: Optional[int] = None,
+    ) -> tuple[int, str]:
+        """Copy source to a local path in bounded chunks, returning (size, sha256)"""
+        return write_stream_to_path(source, destination, max_size, expected_size)
 
     def get_signed_url(self, file_path: str, expires_in: int = 60) -> str:
         """Generate time-limited signed URL for secure file download"""
         try:
-            # Verify file exists
-            full_path = self.local_storage_path / file_path
-            if not full_path.exists():
+            # Content-addressed blobs are kept while a product references
+            # them, so only legacy paths need an existence check
+            if not file_path.startswith(BLOB_PREFIX) and not self.backend.exists(
+                file_path
+            ):
                 raise HTTPException(status_code=404, detail="File not found")
 
-            # Create time-limited token
-            current_time = int(time.time())
-            expires_at = current_time + expires_in
-
-            # Create a secure token based on file path and expiration
-            token_data = f"{file_path}:{expires_at}:{settings.JWT_SECRET}"
-            token = hashlib.md5(token_data.encode()).hexdigest()
-
-            # Get base URL from environment or use backend URL
-            base_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-
-            # Return URL that points to our secure endpoint (not static files)
-            signed_url = f"{base_url}/files/{file_path}?token={token}&expires={expires_at}"
+            # Local files get a link to our secure endpoint, object stores
+            # hand out their own presigned URL
+            signed_url = self.backend.presigned_url(file_path, expires_in)
             print(f"Signed URL created for {file_path} (expires in {expires_in}s)")
             return signed_url
 
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Signed URL creation failed: {e}")
             raise HTTPException(
                 status_code=500, detail=f"Failed to generate download URL: {str(e)}"
             )
 
+    def get_signed_urls(
+        self, file_paths: List[str], expires_in: int = 60
+    ) -> List[Optional[str]]:
+        """Signed URLs for many files in one pass (None for missing files)"""
+        # Only legacy paths need an existence check (see get_signed_url)
+        present = [
+            path.startswith(BLOB_PREFIX) or self.backend.exists(path)
+            for path in file_paths
+        ]
+        signed = iter(
+            self.backend.presigned_urls(
+                [path for path, ok in zip(file_paths, present) if ok], expires_in
+            )
+        )
+        print(f"Signed {sum(present)} URL(s) (expires in {expires_in}s)")
+        return [next(signed) if ok else None for ok in present]
+
 
 storage_service = StorageService()
@@ -13,7 +13,7 @@ from backend.schemas.user_profile import (
     UserProfileResponse,
     PublicProfileResponse,
 )
-from backend.core.security import get_password_hash, verify_password
+from backend.core.password_pool import password_pool
 from fastapi import HTTPException, status
 from typing import Optional
 
@@ -128,21 +128,23 @@ def change_user_password(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Verify current password
-    if not verify_password(password_data.current_password, user.hashed_password):
+    if not password_pool.verify(
+        password_data.current_password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
     # Check if new password is different from current
-    if verify_password(password_data.new_password, user.hashed_password):
+    if password_pool.verify(password_data.new_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password",
         )
 
     # Update password
-    user.hashed_password = get_password_hash(password_data.new_password)
+    user.hashed_password = password_pool.hash(password_data.new_password)
     db.commit()
 
     return {"message": "Password updated successfully"}
@@ -1,8 +1,8 @@
 """
-Startup script that runs automatically on Render deployment.
-Creates tables and seeds the database if it's empty.
+One-shot deploy step: migrates the database and seeds it if it's empty.
+Run it once per deploy (python -m backend.manage migrate / seed do the same
+steps separately); API workers only check the schema revision on boot.
 """
-import os
 import sys
 from pathlib import Path
 
@@ -11,18 +11,20 @@ backend_dir = Path(__file__).resolve().parent
 sys.path.insert(0, str(backend_dir.parent))
 
 from sqlalchemy.orm import Session
-from backend.db.base import engine, Base
+from backend.db.base import engine
+from backend.db.schema import upgrade_database
 from backend.db.session import get_db
 from backend.models.user import User
 from backend.models.product import Product
 from backend.models.purchase import Purchase, PaymentStatus
 from backend.core.security import get_password_hash
+from backend.services.sales_rollup import rebuild_sales_rollups
 from datetime import datetime
 
 def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade all database tables via the migrations"""
+    print("Migrating database...")
+    upgrade_database(engine)
     print("Tables created successfully")
 
 def seed_database():
@@ -223,6 +225,11 @@ def seed_database():
                     Purchase.payment_status == PaymentStatus.COMPLETED
                 ).count()
         
+        # Demo purchases are inserted as completed; count them in analytics.
+        # The session does not autoflush, so write them before the rebuild
+        # reads purchases back.
+        db.flush()
+        rebuild_sales_rollups(db)
         db.commit()
         print(f"  Created {purchase_count} demo purchases")
         print(f"\nDatabase seeded successfully!")
@@ -239,28 +246,21 @@ def seed_database():
 
 def main():
     """Main startup function"""
+    print("=" * 60)
+    print("DEPLOY: Initializing Database")
+    print("=" * 60)
+
     try:
-        # Only run in production (on Render)
-        is_production = os.getenv("DATABASE_URL", "").startswith("postgresql")
-        
-        if is_production:
-            print("=" * 60)
-            print("RENDER STARTUP: Initializing Database")
-            print("=" * 60)
-            
-            create_tables()
-            seed_database()
-            
-            print("\n" + "=" * 60)
-            print("Startup completed successfully!")
-            print("=" * 60 + "\n")
-        else:
-            print("Skipping auto-seed (local development mode)")
-            
+        create_tables()
+        seed_database()
     except Exception as e:
         print(f"\nStartup failed: {e}")
-        # Don't exit with error code - let the app start anyway
-        # The database might already be set up
+        # Fail the deploy; workers refuse to start on an old schema anyway
+        sys.exit(1)
+
+    print("\n" + "=" * 60)
+    print("Startup completed successfully!")
+    print("=" * 60 + "\n")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,274 @@
+"""
+Benchmark the async read routes against their sync equivalents
+
+Starts the API in a uvicorn subprocess, with sync copies of the ported
+routes mounted under /sync (get_db + the thread pool, as before the async
+port):
+
+- products:   GET /products?page=2            vs /sync/products?page=2
+- search:     GET /products?query=...         vs /sync/products?query=...
+- product:    GET /products/{id}              vs /sync/products/{id}
+- purchases:  GET /purchase/mypurchases       vs /sync/purchase/mypurchases
+
+and drives each with --concurrency simultaneous clients, reporting
+throughput and p50/p95 latency. By default it uses a scratch SQLite
+database; pass --database-url to measure against PostgreSQL, where each
+query waits on the network and the difference is largest.
+
+Usage:
+    python scripts/bench_async_routes.py --products 5000 --concurrency 16,64,256
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+WORDS = (
+    "sunset photography preset lightroom portrait wedding landscape film "
+    "vintage retro neon font serif script brush texture pattern icon vector"
+).split()
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def populate(product_count, rng):
+    """Products, one buyer with purchases; returns (buyer token, product ids)"""
+    from backend.core.security import create_access_token, get_password_hash
+    from backend.db.base import SessionLocal, engine
+    from backend.db.schema import upgrade_database
+    from backend.models.product import Product, ProductCategory
+    from backend.models.purchase import PaymentStatus, Purchase
+    from backend.models.user import User
+
+    upgrade_database(engine)
+    db = SessionLocal()
+    try:
+        creator = User(
+            email=f"creator-{rng.random()}@bench.local",
+            hashed_password=get_password_hash("bench"),
+            is_creator=True,
+        )
+        buyer = User(
+            email=f"buyer-{rng.random()}@bench.local",
+            hashed_password=get_password_hash("bench"),
+        )
+        db.add_all([creator, buyer])
+        db.flush()
+
+        categories = list(ProductCategory)
+        products = [
+            Product(
+                creator_id=creator.id,
+                creator_name="Bench Creator",
+                title=" ".join(rng.choices(WORDS, k=3)).title(),
+                description=" ".join(rng.choices(WORDS, k=20)),
+                tags=",".join(rng.sample(WORDS, 3)),
+                price=round(rng.uniform(1, 200), 2),
+                category=rng.choice(categories),
+            )
+            for _ in range(product_count)
+        ]
+        db.add_all(products)
+        db.flush()
+        for product in rng.sample(products, min(25, len(products))):
+            db.add(
+                Purchase(
+                    user_id=buyer.id,
+                    product_id=product.id,
+                    amount_paid=product.price,
+                    payment_status=PaymentStatus.COMPLETED,
+                )
+            )
+        db.commit()
+        token = create_access_token({"sub": str(buyer.id), "is_creator": False})
+        return token, [product.id for product in products]
+    finally:
+        db.close()
+
+
+def build_app():
+    """The real app plus sync copies of the ported routes under /sync"""
+    from typing import List, Optional
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+    from backend.core.security import get_current_user
+    from backend.db.session import get_db
+    from backend.main import app
+    from backend.models.product import Product
+    from backend.models.purchase import PaymentStatus, Purchase
+    from backend.models.user import User
+    from backend.schemas.product import (
+        ProductResponse,
+        ProductSearchParams,
+        ProductSearchResponse,
+    )
+    from backend.services.product_service import get_product_by_id, search_products
+
+    @app.get("/sync/products", response_model=ProductSearchResponse)
+    def sync_products(
+        query: Optional[str] = None, page: int = 1, db: Session = Depends(get_db)
+    ):
+        return search_products(db, ProductSearchParams(query=query, page=page))
+
+    @app.get("/sync/products/{product_id}", response_model=ProductResponse)
+    def sync_product(product_id: int, db: Session = Depends(get_db)):
+        product = get_product_by_id(db, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product
+
+    @app.get("/sync/purchase/mypurchases")
+    def sync_my_purchases(
+        db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    ) -> List[int]:
+        rows = (
+            db.query(Purchase, Product, User)
+            .join(Product, Purchase.product_id == Product.id)
+            .join(User, Product.creator_id == User.id)
+            .filter(
+                Purchase.user_id == current_user.id,
+                Purchase.payment_status == PaymentStatus.COMPLETED,
+                Product.is_active == True,
+            )
+            .order_by(Purchase.completed_at.desc())
+            .all()
+        )
+        return [purchase.id for purchase, _, _ in rows]
+
+    return app
+
+
+def serve(port):
+    import uvicorn
+    from backend.db.base import engine
+
+    # Connections opened by the parent before the fork stay with the parent
+    engine.dispose(close=False)
+
+    # Failed requests are counted by the client
+    uvicorn.run(build_app(), host="127.0.0.1", port=port, log_level="critical")
+
+
+async def drive(base_url, paths, headers, concurrency, duration):
+    """Requests/s and per-request latencies for one route at one concurrency"""
+    import httpx
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker(offset):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)], headers=headers)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies, errors
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(base_url, timeout=30):
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--concurrency", default="16,64,256")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="bench-async-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    rng = random.Random(args.seed)
+    token, product_ids = populate(args.products, rng)
+    print(f"{args.products:,} products on {os.environ['DATABASE_URL'].split('://')[0]}")
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = multiprocessing.get_context("fork").Process(target=serve, args=(port,))
+    server.start()
+    try:
+        wait_for(base_url)
+        sample = rng.sample(product_ids, min(200, len(product_ids)))
+        routes = [
+            ("products", ["/products?page=2"], {}),
+            ("search", [f"/products?query={word}" for word in WORDS], {}),
+            ("product", [f"/products/{pid}" for pid in sample], {}),
+            (
+                "purchases",
+                ["/purchase/mypurchases"],
+                {"Authorization": f"Bearer {token}"},
+            ),
+        ]
+        for concurrency in (int(value) for value in args.concurrency.split(",")):
+            print(f"\nconcurrency {concurrency}")
+            for label, paths, headers in routes:
+                for mode in ("sync", "async"):
+                    if mode == "sync":
+                        prefixed = [f"/sync{path}" for path in paths]
+                    else:
+                        prefixed = paths
+                    rate, latencies, errors = asyncio.run(
+                        drive(base_url, prefixed, headers, concurrency, args.duration)
+                    )
+                    print(
+                        f"  {label:<10} {mode:<5} {rate:>8.0f} req/s"
+                        f"   p50 {statistics.median(latencies) * 1000:>8.1f} ms"
+                        f"   p95 {percentile(latencies, 0.95) * 1000:>8.1f} ms"
+                        + (f"   {errors} errors" if errors else "")
+                    )
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Microbenchmark for JWT verification
+
+Reports verifies per second for verify_token's decode step:
+
+- jose / pyjwt, uncached: a full decode and signature check per call
+  (what every authenticated request paid before the claims cache)
+- cached: a ClaimsCache hit for a token that was already verified
+
+Each run verifies --tokens distinct tokens round robin, like a worker
+serving that many signed-in users.
+
+Usage:
+    python scripts/bench_jwt.py --tokens 1000 --seconds 2
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def rate(verify, tokens, seconds):
+    """Verifications per second over roughly `seconds`"""
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for token in tokens:
+            verify(token)
+        count += len(tokens)
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Seconds per run")
+    args = parser.parse_args()
+
+    from backend.core.jwt_backend import ClaimsCache, load_backend
+
+    # Short development secrets make PyJWT warn on every decode
+    warnings.simplefilter("ignore")
+
+    encode, _ = load_backend("jose")
+    expires = datetime.utcnow() + timedelta(hours=1)
+    tokens = [
+        encode({"sub": str(user_id), "is_creator": False, "exp": expires})
+        for user_id in range(1, args.tokens + 1)
+    ]
+
+    results = {}
+    for name in ("jose", "pyjwt"):
+        try:
+            _, decode = load_backend(name)
+        except RuntimeError as e:
+            print(f"{name:<16} skipped: {e}")
+            continue
+        results[name] = rate(decode, tokens, args.seconds)
+
+    cache = ClaimsCache(max_entries=args.tokens)
+    _, decode = load_backend("jose")
+
+    def cached(token):
+        claims = cache.get(token)
+        if claims is None:
+            claims = decode(token)
+            cache.set(token, claims)
+        return claims
+
+    for token in tokens:
+        cached(token)
+    results["cached"] = rate(cached, tokens, args.seconds)
+
+    baseline = results["jose"]
+    print(f"{args.tokens:,} distinct tokens")
+    for name, value in results.items():
+        label = "cached (hit)" if name == "cached" else f"{name} (uncached)"
+        print(f"  {label:<18} {value:>12,.0f} verifies/s   {value / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark product search engines
+
+Fills a scratch SQLite database with synthetic products and compares, for
+each catalog size:
+
+- memory:  the in-process BM25 index (backend/services/memory_search.py)
+- fts5:    the SQLite FTS5 index (backend/services/search_index.py)
+- like:    the old LIKE scan
+
+It reports the in-memory build time and p50/p95 latency of a mixed query
+workload (common and rare words, prefixes, multi-word queries, filters).
+Each search counts all matches and fetches the first page of ids, like the
+/products endpoint does.
+
+Usage:
+    python scripts/bench_search.py --sizes 10000,100000,1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+WORDS = (
+    "sunset photography preset lightroom portrait wedding landscape film "
+    "vintage retro neon font serif script brush texture pattern icon vector "
+    "illustration watercolor ebook guide course python javascript template "
+    "resume invoice notion planner music beat loop sample synth drum video "
+    "transition overlay lut cinematic mockup logo branding poster flyer 3d "
+    "model blender render shader game asset pixel sprite ui kit dashboard"
+).split()
+
+QUERIES = [
+    "photography",
+    "sunset preset",
+    "phot",
+    "lightroom portrait film",
+    "blender shader",
+    "pix",
+    "watercolor texture brush",
+    "invoice template",
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(label, samples):
+    print(
+        f"  {label:<8} p50 {statistics.median(samples) * 1000:>9.2f} ms"
+        f"   p95 {percentile(samples, 0.95) * 1000:>9.2f} ms"
+    )
+
+
+def populate(engine, size, rng):
+    from backend.models.product import Product, ProductCategory
+
+    categories = list(ProductCategory)
+    creators = [f"Creator {i}" for i in range(max(10, size // 50))]
+    # Skewed word frequencies, like real titles
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    insert = Product.__table__.insert()
+    batch = []
+    with engine.begin() as connection:
+        for i in range(size):
+            title_words = rng.choices(WORDS, weights, k=rng.randint(2, 5))
+            batch.append(
+                {
+                    "title": " ".join(title_words).title(),
+                    "description": " ".join(rng.choices(WORDS, weights, k=20)),
+                    "tags": ",".join(rng.sample(WORDS, 3)),
+                    "creator_name": rng.choice(creators),
+                    "price": round(rng.uniform(0, 200), 2),
+                    "category": rng.choice(categories),
+                    "is_active": rng.random() > 0.05,
+                }
+            )
+            if len(batch) == 5000:
+                connection.execute(insert, batch)
+                batch = []
+        if batch:
+            connection.execute(insert, batch)
+
+
+def sql_search(session_factory, index, query_text, category):
+    from backend.models.product import Product
+
+    db = session_factory()
+    try:
+        query = db.query(Product.id).filter(Product.is_active == True)
+        if category is not None:
+            query = query.filter(Product.category == category)
+        query, rank = index.apply(query, query_text)
+        total = query.order_by(None).count()
+        order = rank.asc() if rank is not None else Product.created_at.desc()
+        ids = [row.id for row in query.order_by(order).limit(20)]
+        return total, ids
+    finally:
+        db.close()
+
+
+def bench_size(size, query_count, like_limit, rng):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from backend.db.base import Base
+    from backend.models import purchase, user  # noqa: F401 (register tables)
+    from backend.models.product import ProductCategory
+    from backend.services.memory_search import InMemorySearchIndex
+    from backend.services.search_index import SearchIndex, SQLiteFTS5Index
+
+    workdir = tempfile.mkdtemp(prefix="bench-search-")
+    engine = create_engine(f"sqlite:///{workdir}/bench.db")
+    Base.metadata.create_all(bind=engine)
+    fts = SQLiteFTS5Index()
+    fts.ensure_schema(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    started = time.perf_counter()
+    populate(engine, size, rng)
+    print(f"\n{size:,} products (inserted in {time.perf_counter() - started:.1f}s)")
+
+    memory = InMemorySearchIndex()
+    started = time.perf_counter()
+    memory.build(session_factory)
+    print(f"  memory index built in {time.perf_counter() - started:.2f}s")
+
+    workload = [
+        (rng.choice(QUERIES), rng.choice([None, None, ProductCategory.PHOTOGRAPHY]))
+        for _ in range(query_count)
+    ]
+    engines = [
+        ("memory", lambda q, c: memory.search(q, category=c, limit=20)),
+        ("fts5", lambda q, c: sql_search(session_factory, fts, q, c)),
+        ("like", lambda q, c: sql_search(session_factory, SearchIndex(), q, c)),
+    ]
+    for label, search in engines:
+        # The LIKE scan is linear in the catalog; sample it less at scale
+        runs = workload[:like_limit] if label == "like" else workload
+        samples = []
+        for query_text, category in runs:
+            started = time.perf_counter()
+            search(query_text, category)
+            samples.append(time.perf_counter() - started)
+        report(label, samples)
+
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--like-queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for size in (int(value) for value in args.sizes.split(",")):
+        bench_size(size, args.queries, args.like_queries, rng)
+
+
+if __name__ == "__main__":
+    main()
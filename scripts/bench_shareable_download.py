@@ -0,0 +1,151 @@
+"""
+Benchmark the shareable download proxy: time-to-first-byte and peak RSS
+
+Starts the API in a uvicorn subprocess against a scratch SQLite database and
+upload folder, downloads a large file through /d/{token} and reports the
+server's time-to-first-byte, throughput and peak resident memory (Linux only,
+read from /proc/<pid>/status).
+
+Usage:
+    python scripts/bench_shareable_download.py --size-mb 1024
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def read_status_kb(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def serve(port: int):
+    """Run the API with the shareable download router mounted under /d"""
+    import uvicorn
+    from backend.main import app
+    from backend.api import shareable_download
+
+    app.include_router(shareable_download.router, prefix="/d")
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed(size_mb: int):
+    """Create a creator, one product and its backing file; return (product_id, auth token)"""
+    from backend.db.base import Base, SessionLocal, engine
+    from backend.core.security import create_access_token
+    from backend.models.product import Product
+    from backend.models.purchase import Purchase  # noqa: F401 (mapper registry)
+    from backend.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+
+    file_name = "bench.bin"
+    file_path = os.path.join(os.environ["UPLOAD_FOLDER"], file_name)
+    os.makedirs(os.environ["UPLOAD_FOLDER"], exist_ok=True)
+    with open(file_path, "wb") as bench_file:
+        chunk = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            bench_file.write(chunk)
+
+    db = SessionLocal()
+    try:
+        creator = User(email="bench@example.com", hashed_password="x", is_creator=True)
+        db.add(creator)
+        db.flush()
+        product = Product(
+            creator_id=creator.id,
+            creator_name="bench",
+            title="Bench",
+            price=1.0,
+            file_url=file_name,
+            file_size=size_mb * 1024 * 1024,
+            file_type="bin",
+        )
+        db.add(product)
+        db.commit()
+        token = create_access_token({"sub": str(creator.id), "is_creator": True})
+        return product.id, token
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="vaulture-bench-")
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        UPLOAD_FOLDER=f"{workdir}/uploads",
+        BACKEND_URL=f"http://127.0.0.1:{args.port}",
+        JWT_SECRET=os.environ.get("JWT_SECRET", "bench-secret"),
+    )
+
+    print(f"Creating {args.size_mb}MB test file in {workdir}...")
+    product_id, auth_token = seed(args.size_mb)
+
+    import httpx
+    from backend.core.signing import url_signer, SHARE_LINK
+
+    expires = int(time.time()) + 600
+    share_token = url_signer.sign(SHARE_LINK, str(product_id), expires)
+    url = (
+        f"http://127.0.0.1:{args.port}/d/{share_token}"
+        f"?product={product_id}&expires={expires}&auth_token={auth_token}"
+    )
+
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(args.port)],
+        env=os.environ.copy(),
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{args.port}/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        rss_before = read_status_kb(server.pid, "VmRSS")
+
+        received = 0
+        started = time.perf_counter()
+        first_byte = None
+        with httpx.stream("GET", url, timeout=None) as response:
+            for chunk in response.iter_raw():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                received += len(chunk)
+        elapsed = time.perf_counter() - started
+
+        peak_rss = read_status_kb(server.pid, "VmHWM")
+
+        print(f"Status:              {response.status_code}")
+        print(f"Bytes received:      {received}")
+        print(f"Time to first byte:  {first_byte * 1000:.1f} ms")
+        print(f"Total time:          {elapsed:.2f} s ({received / elapsed / 1e6:.1f} MB/s)")
+        print(f"Server RSS at start: {rss_before / 1024:.1f} MB")
+        print(f"Server peak RSS:     {peak_rss / 1024:.1f} MB")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark signed-link minting and verification
+
+Compares the old per-link MD5 string rebuild with UrlSigner.sign,
+UrlSigner.sign_many (a whole purchase library at once) and
+UrlSigner.verify, and reports operations per second.
+
+Usage:
+    python scripts/bench_url_signer.py --links 100000
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def rate(label: str, count: int, seconds: float):
+    print(f"{label:<28} {count / seconds:>12,.0f} ops/s  ({seconds * 1e6 / count:.2f} us/op)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=100000)
+    args = parser.parse_args()
+
+    from backend.core.config import settings
+    from backend.core.signing import url_signer, FILE_LINK
+
+    paths = [
+        f"blobs/{i % 256:02x}/{i % 251:02x}/{hashlib.sha256(str(i).encode()).hexdigest()}"
+        for i in range(args.links)
+    ]
+    expires = int(time.time()) + 3600
+
+    started = time.perf_counter()
+    for path in paths:
+        hashlib.md5(f"{path}:{expires}:{settings.JWT_SECRET}".encode()).hexdigest()
+    rate("md5 rebuild (old)", args.links, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    tokens = [url_signer.sign(FILE_LINK, path, expires) for path in paths]
+    rate("hmac sign", args.links, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    batch = url_signer.sign_many(FILE_LINK, paths, expires)
+    rate("hmac sign_many", args.links, time.perf_counter() - started)
+    assert batch == tokens
+
+    started = time.perf_counter()
+    for path, token in zip(paths, tokens):
+        url_signer.verify(FILE_LINK, path, token, expires)
+    rate("hmac verify", args.links, time.perf_counter() - started)
+
+    forged = [token[:-1] + ("A" if token[-1] != "A" else "B") for token in tokens]
+    started = time.perf_counter()
+    rejected = sum(
+        not url_signer.verify(FILE_LINK, path, token, expires)
+        for path, token in zip(paths, forged)
+    )
+    rate("hmac verify (forged)", args.links, time.perf_counter() - started)
+    assert rejected == args.links
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,9 @@ source venv/bin/activate
 # Kill any existing processes on port 8000
 lsof -ti:8000 | xargs kill -9 2>/dev/null || true
 
+# Apply pending migrations (workers only check the schema revision)
+python -m backend.manage migrate || exit 1
+
 # Start backend in background
 python -m uvicorn backend.main:app --reload --port 8000 &
 BACKEND_PID=$!
@@ -0,0 +1,66 @@
+"""
+Shared fixtures
+
+Settings are read from the environment when backend is first imported, so
+the test database, upload folder and secrets are pointed at a throwaway
+directory here, before any test module imports the app.
+"""
+
+import os
+import shutil
+import tempfile
+import pytest
+
+_WORKDIR = tempfile.mkdtemp(prefix="vaulture-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_WORKDIR}/test.db",
+    ASYNC_DATABASE_URL="",
+    DATABASE_REPLICA_URLS="",
+    UPLOAD_FOLDER=os.path.join(_WORKDIR, "uploads"),
+    STORAGE_BACKEND="local",
+    SEARCH_ENGINE="database",
+    JWT_SECRET="test-secret",
+    URL_SIGNING_KEYS="",
+    # Hash passwords inline; the seed creates a few accounts
+    PASSWORD_HASH_WORKERS="0",
+)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The test database, migrated to head once per run"""
+    from backend.db.base import engine
+    from backend.db.schema import upgrade_database
+
+    upgrade_database(engine)
+    # Registers every model (and checks the revision, so after the upgrade)
+    import backend.main  # noqa: F401
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """A session on the test database; every table is emptied afterwards"""
+    from backend.db.base import Base, SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def client(db):
+    """TestClient without the lifespan, so no background threads start"""
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    return TestClient(app)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_WORKDIR, ignore_errors=True)
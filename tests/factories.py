@@ -0,0 +1,59 @@
+"""Minimal rows for tests that need a catalog or purchases"""
+
+from datetime import datetime
+from itertools import count
+from backend.models.product import Product, ProductCategory
+from backend.models.purchase import PaymentStatus, Purchase
+from backend.models.user import User
+
+_sequence = count(1)
+
+
+def create_user(db, is_creator: bool = True) -> User:
+    number = next(_sequence)
+    user = User(
+        email=f"user{number}@example.com",
+        hashed_password="x",
+        display_name=f"User {number}",
+        is_creator=is_creator,
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+def create_product(db, creator: User, **fields) -> Product:
+    values = dict(
+        creator_id=creator.id,
+        creator_name=creator.display_name,
+        title=f"Product {next(_sequence)}",
+        price=10.0,
+        category=ProductCategory.OTHER,
+        file_url="blobs/00/00/file",
+        is_active=True,
+    )
+    values.update(fields)
+    product = Product(**values)
+    db.add(product)
+    db.flush()
+    return product
+
+
+def create_purchase(
+    db,
+    buyer: User,
+    product: Product,
+    created_at: datetime,
+    amount_paid: float = 10.0,
+    payment_status: PaymentStatus = PaymentStatus.COMPLETED,
+) -> Purchase:
+    purchase = Purchase(
+        user_id=buyer.id,
+        product_id=product.id,
+        amount_paid=amount_paid,
+        payment_status=payment_status,
+        created_at=created_at,
+    )
+    db.add(purchase)
+    db.flush()
+    return purchase
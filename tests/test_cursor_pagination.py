@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from backend.models.product import ProductCategory
+from backend.schemas.product import ProductSearchParams
+from backend.services.product_service import (
+    _column_key,
+    _encode_cursor,
+    _key_values,
+    _read_cursor,
+    check_cursor_pagination,
+    search_products,
+)
+from tests.factories import create_product, create_user
+
+
+def _params(**fields) -> ProductSearchParams:
+    return ProductSearchParams(**fields)
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor(_params(sort_by="price", sort_order="asc"), k=[9.5, 42])
+    params = _params(sort_by="price", sort_order="asc", cursor=cursor)
+
+    assert "=" not in cursor
+    assert _read_cursor(params, "k") == [9.5, 42]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        # Issued for another sort
+        _encode_cursor(_params(sort_by="title", sort_order="asc"), k=["a", 1]),
+        _encode_cursor(_params(sort_by="price", sort_order="desc"), k=[1.0, 1]),
+        "not base64 json",
+        base64.urlsafe_b64encode(b'["a list"]').decode(),
+        base64.urlsafe_b64encode(json.dumps({"s": "price"}).encode()).decode(),
+    ],
+)
+def test_rejects_foreign_or_malformed_cursors(cursor):
+    params = _params(sort_by="price", sort_order="asc", cursor=cursor)
+
+    with pytest.raises(HTTPException) as error:
+        _read_cursor(params, "k")
+    assert error.value.status_code == 400
+
+
+def test_key_values_parse_typed_columns():
+    keys = [_column_key("created_at", True), _column_key("category", True)]
+    moment = datetime(2024, 2, 29, 23, 59, 59, 123456)
+
+    assert _key_values([moment.isoformat(), "MUSIC"], keys) == [
+        moment,
+        ProductCategory.MUSIC,
+    ]
+
+
+@pytest.mark.parametrize(
+    "values", [["2024-01-01T00:00:00"], ["2024-01-01T00:00:00", None], "x", [1, 2]]
+)
+def test_key_values_reject_bad_positions(values):
+    keys = [_column_key("created_at", True), _column_key("id", True)]
+
+    with pytest.raises(HTTPException) as error:
+        _key_values(values, keys)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def tied_catalog(db):
+    """Products sharing created_at, price, title and category in small groups"""
+    creator = create_user(db)
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    categories = list(ProductCategory)
+    for i in range(23):
+        create_product(
+            db,
+            creator,
+            title=f"Title {i % 4}",
+            price=float(i % 3),
+            category=categories[i % 2],
+            created_at=base + timedelta(seconds=i // 5),
+        )
+    # An inactive product never appears in a listing
+    create_product(db, creator, is_active=False, created_at=base)
+    db.commit()
+    return db
+
+
+def test_every_sort_visits_each_product_once(tied_catalog):
+    assert check_cursor_pagination(tied_catalog, page_size=4) == []
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "price", "title", "category"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_pages_match_offset_pages(tied_catalog, sort_by, sort_order):
+    def listing(**fields):
+        return search_products(
+            tied_catalog,
+            _params(sort_by=sort_by, sort_order=sort_order, page_size=5, **fields),
+        )
+
+    by_offset = []
+    for page in range(1, 6):
+        by_offset.extend(product.id for product in listing(page=page).products)
+
+    by_cursor, cursor = [], None
+    while True:
+        page = listing(cursor=cursor)
+        by_cursor.extend(product.id for product in page.products)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert by_cursor == by_offset
+    assert len(by_cursor) == 23
@@ -0,0 +1,27 @@
+from sqlalchemy import func
+from backend.models.purchase import PaymentStatus, Purchase
+from backend.models.sales_rollup import CreatorSalesDaily, CreatorSalesHourly
+from backend.services.platform_snapshot import platform_snapshot
+from backend.startup import seed_database
+
+
+def test_seed_fills_the_rollups_and_stats(db, client):
+    seed_database()
+
+    completed = db.query(
+        func.count(Purchase.id), func.sum(Purchase.amount_paid)
+    ).filter(Purchase.payment_status == PaymentStatus.COMPLETED).one()
+    for model in (CreatorSalesDaily, CreatorSalesHourly):
+        rollup = db.query(func.sum(model.sales_count), func.sum(model.revenue)).one()
+        assert rollup[0] == completed[0] > 0
+        assert round(rollup[1], 2) == round(completed[1], 2)
+
+    platform_snapshot.mark_stale()
+    response = client.get("/platform/stats")
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total_purchases"] == completed[0]
+    assert stats["total_revenue"] == round(completed[1], 2)
+    assert stats["total_products"] > 0
+    assert stats["total_creators"] == 1
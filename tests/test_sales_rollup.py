@@ -0,0 +1,88 @@
+from datetime import datetime
+from sqlalchemy import select
+from backend.models.purchase import PaymentStatus
+from backend.models.sales_rollup import CreatorSalesDaily, CreatorSalesHourly
+from backend.services.sales_rollup import rebuild_sales_rollups, record_sale
+from tests.factories import create_product, create_purchase, create_user
+
+
+def _rows(db, model):
+    bucket = model.day if model is CreatorSalesDaily else model.hour
+    return sorted(
+        db.execute(
+            select(
+                model.product_id,
+                bucket,
+                model.creator_id,
+                model.sales_count,
+                model.revenue,
+            )
+        ).all()
+    )
+
+
+def test_record_sale_upserts_day_and_hour(db):
+    creator = create_user(db)
+    buyer = create_user(db, is_creator=False)
+    product = create_product(db, creator)
+    for moment, amount in [
+        (datetime(2024, 5, 1, 10, 5), 4.0),
+        (datetime(2024, 5, 1, 10, 55), 6.0),
+        (datetime(2024, 5, 1, 11, 0), 1.0),
+    ]:
+        record_sale(db, create_purchase(db, buyer, product, moment, amount))
+    db.commit()
+
+    assert _rows(db, CreatorSalesDaily) == [
+        (product.id, datetime(2024, 5, 1).date(), creator.id, 3, 11.0)
+    ]
+    assert _rows(db, CreatorSalesHourly) == [
+        (product.id, datetime(2024, 5, 1, 10), creator.id, 2, 10.0),
+        (product.id, datetime(2024, 5, 1, 11), creator.id, 1, 1.0),
+    ]
+
+
+def test_rebuild_matches_recorded_sales(db):
+    creator = create_user(db)
+    buyer = create_user(db, is_creator=False)
+    products = [create_product(db, creator) for _ in range(2)]
+    moments = [datetime(2024, 5, d, h, 30) for d in (1, 2) for h in (0, 23)]
+    for i, moment in enumerate(moments):
+        purchase = create_purchase(db, buyer, products[i % 2], moment, 2.5 * i)
+        record_sale(db, purchase)
+    # Never completed: in neither the live rollup nor a rebuild
+    create_purchase(
+        db, buyer, products[0], moments[0], 99.0, payment_status=PaymentStatus.PENDING
+    )
+    db.commit()
+    recorded = _rows(db, CreatorSalesDaily), _rows(db, CreatorSalesHourly)
+
+    written = rebuild_sales_rollups(db)
+    db.commit()
+
+    assert written == len(recorded[0])
+    assert (_rows(db, CreatorSalesDaily), _rows(db, CreatorSalesHourly)) == recorded
+
+
+def test_rebuild_one_creator_leaves_the_others(db):
+    buyer = create_user(db, is_creator=False)
+    creators = [create_user(db), create_user(db)]
+    moment = datetime(2024, 6, 1, 12)
+    for creator in creators:
+        product = create_product(db, creator)
+        record_sale(db, create_purchase(db, buyer, product, moment, 5.0))
+    db.commit()
+    # Drift in both creators' rows; only the first is repaired
+    for model in (CreatorSalesDaily, CreatorSalesHourly):
+        for row in db.query(model):
+            row.sales_count = 40
+    db.commit()
+
+    rebuild_sales_rollups(db, creator_id=creators[0].id)
+    db.commit()
+
+    counts = {
+        creator_id: sales_count
+        for _, _, creator_id, sales_count, _ in _rows(db, CreatorSalesDaily)
+    }
+    assert counts == {creators[0].id: 1, creators[1].id: 40}
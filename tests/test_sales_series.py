@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from backend.services.sales_rollup import record_sale
+from backend.services.sales_series import (
+    MAX_BUCKETS,
+    bucket_start,
+    get_sales_series,
+    next_bucket,
+)
+from tests.factories import create_product, create_purchase, create_user
+
+HOUR = timedelta(hours=1)
+
+
+@pytest.mark.parametrize(
+    "moment, granularity, expected",
+    [
+        (datetime(2024, 3, 5, 14, 59, 59, 999), "hour", datetime(2024, 3, 5, 14)),
+        (datetime(2024, 3, 5, 23, 59), "day", datetime(2024, 3, 5)),
+        # ISO weeks start on Monday, reaching back across a month and a year
+        (datetime(2024, 3, 3, 23), "week", datetime(2024, 2, 26)),
+        (datetime(2024, 3, 4, 0, 0), "week", datetime(2024, 3, 4)),
+        (datetime(2025, 1, 1, 8), "week", datetime(2024, 12, 30)),
+        (datetime(2024, 2, 29, 23, 59), "month", datetime(2024, 2, 1)),
+    ],
+)
+def test_bucket_start(moment, granularity, expected):
+    assert bucket_start(moment, granularity) == expected
+
+
+@pytest.mark.parametrize(
+    "start, granularity, expected",
+    [
+        (datetime(2024, 3, 10, 23), "hour", datetime(2024, 3, 11, 0)),
+        (datetime(2024, 2, 28), "day", datetime(2024, 2, 29)),
+        (datetime(2024, 12, 30), "week", datetime(2025, 1, 6)),
+        (datetime(2024, 1, 1), "month", datetime(2024, 2, 1)),
+        (datetime(2024, 12, 1), "month", datetime(2025, 1, 1)),
+    ],
+)
+def test_next_bucket(start, granularity, expected):
+    assert next_bucket(start, granularity) == expected
+
+
+@pytest.fixture
+def sales(db):
+    """A creator with sales either side of a month and a year boundary"""
+    creator = create_user(db)
+    other_creator = create_user(db)
+    buyer = create_user(db, is_creator=False)
+    product = create_product(db, creator)
+    second = create_product(db, creator)
+    elsewhere = create_product(db, other_creator)
+    for moment, item, amount in [
+        (datetime(2024, 11, 30, 23, 30), product, 5.0),  # Sat, week of Nov 25
+        (datetime(2024, 12, 1, 0, 15), product, 7.0),  # Sun, same week
+        (datetime(2024, 12, 2, 9, 0), second, 1.5),  # Mon, next week
+        (datetime(2024, 12, 31, 23, 59), product, 2.0),
+        (datetime(2025, 1, 1, 0, 0), product, 3.0),
+        (datetime(2024, 12, 1, 0, 45), elsewhere, 100.0),
+    ]:
+        record_sale(db, create_purchase(db, buyer, item, moment, amount))
+    db.commit()
+    return db, creator, product
+
+
+def _points(series):
+    return [(b["start"], b["sales"], b["revenue"]) for b in series["buckets"]]
+
+
+def test_week_series_spans_month_boundary(sales):
+    db, creator, _ = sales
+    series = get_sales_series(
+        db, creator.id, "week", datetime(2024, 11, 27), datetime(2024, 12, 10)
+    )
+
+    assert series["start"] == datetime(2024, 11, 25)
+    assert _points(series) == [
+        (datetime(2024, 11, 25), 2, 12.0),
+        (datetime(2024, 12, 2), 1, 1.5),
+        (datetime(2024, 12, 9), 0, 0.0),
+    ]
+    assert (series["total_sales"], series["total_revenue"]) == (3, 13.5)
+
+
+def test_month_series_spans_year_boundary(sales):
+    db, creator, product = sales
+    series = get_sales_series(
+        db,
+        creator.id,
+        "month",
+        datetime(2024, 11, 15),
+        datetime(2025, 2, 1),
+        product_id=product.id,
+    )
+
+    assert _points(series) == [
+        (datetime(2024, 11, 1), 1, 5.0),
+        (datetime(2024, 12, 1), 2, 9.0),
+        (datetime(2025, 1, 1), 1, 3.0),
+    ]
+
+
+def test_hour_series_is_half_open(sales):
+    db, creator, _ = sales
+    series = get_sales_series(
+        db, creator.id, "hour", datetime(2024, 12, 31, 23), datetime(2025, 1, 1, 0)
+    )
+
+    # The sale at exactly `end` belongs to the next series
+    assert _points(series) == [(datetime(2024, 12, 31, 23), 1, 2.0)]
+
+
+def test_aware_bounds_are_converted_to_utc(sales):
+    db, creator, _ = sales
+    plus_two = timezone(timedelta(hours=2))
+    series = get_sales_series(
+        db,
+        creator.id,
+        "day",
+        datetime(2025, 1, 1, 0, 0, tzinfo=plus_two),
+        datetime(2025, 1, 2, 2, 0, tzinfo=plus_two),
+    )
+
+    assert _points(series) == [
+        (datetime(2024, 12, 31), 1, 2.0),
+        (datetime(2025, 1, 1), 1, 3.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "granularity, start, end",
+    [
+        ("year", datetime(2024, 1, 1), datetime(2024, 2, 1)),
+        ("day", datetime(2024, 2, 1), datetime(2024, 2, 1)),
+        ("day", datetime(2024, 2, 2), datetime(2024, 2, 1)),
+        ("hour", datetime(2024, 1, 1), datetime(2024, 1, 1, 1) + MAX_BUCKETS * HOUR),
+    ],
+)
+def test_rejects_bad_ranges(db, granularity, start, end):
+    with pytest.raises(HTTPException) as error:
+        get_sales_series(db, 1, granularity, start, end)
+    assert error.value.status_code == 400
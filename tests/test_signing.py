@@ -0,0 +1,110 @@
+import hashlib
+import hmac
+import pytest
+from backend.core import signing
+from backend.core.signing import FILE_LINK, SHARE_LINK, UrlSigner
+
+EXPIRES = 2_000_000_000
+
+
+def test_round_trip():
+    signer = UrlSigner({"k1": b"secret"}, "k1")
+    token = signer.sign(FILE_LINK, "blobs/ab/cd/abcd", EXPIRES)
+
+    assert token.startswith("k1.")
+    assert signer.verify(FILE_LINK, "blobs/ab/cd/abcd", token, EXPIRES)
+
+
+def test_signature_is_standard_hmac_sha256():
+    # Secrets longer than the SHA-256 block are hashed first, as RFC 2104 says
+    for secret in (b"short", b"s" * 200):
+        signer = UrlSigner({"k1": secret}, "k1")
+        expected = hmac.new(secret, b"file\0a/b\x00123", hashlib.sha256).hexdigest()
+        assert signer.sign(FILE_LINK, "a/b", 123) == f"k1.{expected}"
+
+
+def test_expiry():
+    signer = UrlSigner({"k1": b"secret"}, "k1")
+    token = signer.sign(FILE_LINK, "a", 1000)
+
+    assert signer.verify(FILE_LINK, "a", token, 1000, now=999)
+    assert signer.verify(FILE_LINK, "a", token, 1000, now=1000)
+    assert not signer.verify(FILE_LINK, "a", token, 1000, now=1001)
+    # The expiry is signed, so it cannot be pushed back
+    assert not signer.verify(FILE_LINK, "a", token, 2000, now=1001)
+
+
+@pytest.mark.parametrize(
+    "purpose, subject, mangle",
+    [
+        (SHARE_LINK, "a", lambda token: token),
+        (FILE_LINK, "b", lambda token: token),
+        (FILE_LINK, "a", lambda token: token[:-1] + ("0" if token[-1] != "0" else "1")),
+        (FILE_LINK, "a", lambda token: token.split(".", 1)[1]),
+        (FILE_LINK, "a", lambda token: ""),
+    ],
+)
+def test_rejects_other_links(purpose, subject, mangle):
+    signer = UrlSigner({"k1": b"secret"}, "k1")
+    token = signer.sign(FILE_LINK, "a", EXPIRES)
+
+    assert not signer.verify(purpose, subject, mangle(token), EXPIRES)
+
+
+def test_key_rotation():
+    old = UrlSigner({"k1": b"old"}, "k1")
+    rotating = UrlSigner({"k1": b"old", "k2": b"new"}, "k2")
+    retired = UrlSigner({"k2": b"new"}, "k2")
+    old_token = old.sign(FILE_LINK, "a", EXPIRES)
+    new_token = rotating.sign(FILE_LINK, "a", EXPIRES)
+
+    # Links signed before the rotation keep working while k1 is listed
+    assert new_token.startswith("k2.")
+    assert rotating.verify(FILE_LINK, "a", old_token, EXPIRES)
+    assert retired.verify(FILE_LINK, "a", new_token, EXPIRES)
+    assert not retired.verify(FILE_LINK, "a", old_token, EXPIRES)
+    # A key id cannot be swapped onto another key's signature
+    relabelled = "k2." + old_token.split(".", 1)[1]
+    assert not rotating.verify(FILE_LINK, "a", relabelled, EXPIRES)
+
+
+def test_sign_many_matches_sign():
+    signer = UrlSigner({"k1": b"secret", "k2": b"other"}, "k2")
+    subjects = ["a", "b/c", "é"]
+
+    assert signer.sign_many(FILE_LINK, subjects, EXPIRES) == [
+        signer.sign(FILE_LINK, subject, EXPIRES) for subject in subjects
+    ]
+
+
+@pytest.mark.parametrize(
+    "keys, active", [({"k1": b"x"}, "k2"), ({"": b"x"}, ""), ({"a.b": b"x"}, "a.b")]
+)
+def test_invalid_key_configuration(keys, active):
+    with pytest.raises(RuntimeError):
+        UrlSigner(keys, active)
+
+
+def test_from_settings(monkeypatch):
+    monkeypatch.setattr(signing.settings, "URL_SIGNING_KEYS", "k1:old, k2:new")
+    monkeypatch.setattr(signing.settings, "URL_SIGNING_KEY_ID", "k2")
+    signer = UrlSigner.from_settings()
+    old_token = UrlSigner({"k1": b"old"}, "k1").sign(FILE_LINK, "a", EXPIRES)
+
+    assert signer.active_key_id == "k2"
+    assert signer.verify(FILE_LINK, "a", old_token, EXPIRES)
+
+    monkeypatch.setattr(signing.settings, "URL_SIGNING_KEYS", "k1")
+    with pytest.raises(RuntimeError):
+        UrlSigner.from_settings()
+
+
+def test_default_key_is_not_the_jwt_secret():
+    signer = UrlSigner.from_settings()
+    jwt_keyed = UrlSigner(
+        {signing.DEFAULT_KEY_ID: signing.settings.JWT_SECRET.encode()},
+        signing.DEFAULT_KEY_ID,
+    )
+
+    token = signer.sign(FILE_LINK, "a", EXPIRES)
+    assert token != jwt_keyed.sign(FILE_LINK, "a", EXPIRES)